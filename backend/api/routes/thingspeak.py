@@ -1,9 +1,10 @@
 from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
 from typing import Dict, Any, List, Optional
-from datetime import datetime
-import statistics
-import requests
+from datetime import datetime, timezone
+import asyncio
+import httpx
+import numpy as np
 import os
 import sys
 from pathlib import Path
@@ -13,10 +14,20 @@ backend_dir = Path(__file__).resolve().parent.parent.parent
 sys.path.insert(0, str(backend_dir))
 
 from thingspeak_client import (
-    get_latest_feed,
-    get_model_input_dict,
-    get_recommendations,
+    MODEL_KEYS,
+    THINGSPEAK_MAX_RESULTS,
+    Device,
+    fetch_feeds,
+    get_device_registry,
+    sync_channel,
+    to_model_input,
 )
+from services.device_status import get_device_status_monitor
+from services.sensor_poller import get_sensor_poller
+from services.downsampling import downsample
+from services.sensor_analytics import rolling_means, summarize
+from services.sensor_store import get_sensor_store, format_timestamp, parse_timestamp
+from services.insight_rules import soil_recommendations
 
 # Import weather service
 try:
@@ -28,9 +39,15 @@ except ImportError:
 
 router = APIRouter()
 
-# ThingSpeak configuration
-THINGSPEAK_CHANNEL_ID = os.getenv("THINGSPEAK_CHANNEL_ID")
-THINGSPEAK_READ_API_KEY = os.getenv("THINGSPEAK_READ_API_KEY", "")
+# History is served from the local store, synced from ThingSpeak at most this often
+HISTORY_SYNC_INTERVAL = float(os.getenv("THINGSPEAK_STORE_SYNC_INTERVAL", "15"))
+# Most stored readings one history request reads (ranges are meant to be downsampled)
+HISTORY_MAX_ROWS = int(os.getenv("THINGSPEAK_HISTORY_MAX_ROWS", "200000"))
+
+# Reading keys in MODEL_KEYS order (N, P, K, Moisture, pH)
+SENSOR_KEYS = ["nitrogen", "phosphorus", "potassium", "moisture", "ph"]
+
+DEVICE_QUERY = Query(None, description="Sensor device id (see /devices); the default device if omitted")
 
 
 class SensorData(BaseModel):
@@ -41,6 +58,7 @@ class SensorData(BaseModel):
     ph: Optional[float]
     temperature: Optional[float]
     timestamp: Optional[str]
+    data_age_seconds: Optional[float] = None
 
 
 class RecommendationResponse(BaseModel):
@@ -49,6 +67,7 @@ class RecommendationResponse(BaseModel):
     reasoning: str
     soil_health: str
     actions: List[str]
+    data_age_seconds: Optional[float] = None
 
 
 class HistoricalDataResponse(BaseModel):
@@ -57,25 +76,72 @@ class HistoricalDataResponse(BaseModel):
     trends: Dict[str, str]
 
 
+def resolve_device(device_id: Optional[str]) -> Optional[Device]:
+    """The requested device (404 if unknown), or the default device when none is given"""
+    registry = get_device_registry()
+    if device_id is None:
+        return registry.default()
+    device = registry.get(device_id)
+    if device is None:
+        raise HTTPException(status_code=404, detail=f"Unknown device {device_id!r}")
+    return device
+
+
+def weather_location(device: Optional[Device]):
+    """Where to read air temperature for a device: its location, else the default farm"""
+    if device is not None and device.location is not None:
+        return device.location
+    return float(os.getenv("DEFAULT_LATITUDE", "28.6139")), float(os.getenv("DEFAULT_LONGITUDE", "77.2090"))
+
+
+async def latest_sensor_input(device: Optional[Device]):
+    """
+    Model inputs ('N','P','K','Moisture','pH') from a device's newest
+    reading, plus the poller snapshot it came from. Answered from memory
+    while the background poller runs.
+    """
+    if device is None:
+        snapshot = await get_sensor_poller().latest()  # no device configured: an empty snapshot
+        return to_model_input(snapshot["fields"]), snapshot
+    snapshot = await get_sensor_poller().latest(device.channel_id, device.read_key)
+    return to_model_input(snapshot["fields"], device.fields), snapshot
+
+
+@router.get("/devices")
+async def list_devices():
+    """Registered sensor devices and the age of their newest polled reading"""
+    poller = get_sensor_poller()
+    registry = get_device_registry()
+    devices = []
+    for device in registry.all():
+        snapshot = poller.snapshots.get(device.channel_id)
+        created_at = snapshot["created_at"] if snapshot else None
+        devices.append({
+            **device.to_dict(),
+            "default": device.device_id == registry.default_id,
+            "last_update": format_timestamp(created_at) if created_at else None,
+        })
+    return {"devices": devices, "count": len(devices)}
+
+
 @router.get("/current", response_model=SensorData)
-async def get_current_data():
+async def get_current_data(device_id: Optional[str] = DEVICE_QUERY):
     """
     Get the latest sensor data from ThingSpeak (N, P, K, Moisture, pH)
     Temperature comes from weather API
     """
+    device = resolve_device(device_id)
     try:
-        data = get_model_input_dict()
+        data, snapshot = await latest_sensor_input(device)
 
         # Get temperature from weather API (default location or first available)
         temperature = 25.1  # Default dummy temperature
         if WEATHER_SERVICE_AVAILABLE:
             try:
                 weather_service = get_weather_service()
-                # Using default location - you can make this configurable
-                default_lat = float(os.getenv("DEFAULT_LATITUDE", "28.6139"))
-                default_lng = float(os.getenv("DEFAULT_LONGITUDE", "77.2090"))
+                # At the device's location, or the default farm location
                 weather_data = await weather_service.get_current_weather(
-                    default_lat, default_lng
+                    *weather_location(device)
                 )
                 temperature = weather_data.get("current", {}).get("temperature", 25.1)
             except Exception as e:
@@ -89,7 +155,11 @@ async def get_current_data():
             moisture=data.get("Moisture"),
             ph=data.get("pH"),
             temperature=temperature,
-            timestamp=datetime.utcnow().isoformat(),
+            timestamp=(
+                format_timestamp(snapshot["created_at"])
+                if snapshot["created_at"] else datetime.utcnow().isoformat()
+            ),
+            data_age_seconds=snapshot["data_age_seconds"],
         )
     except Exception as e:
         raise HTTPException(
@@ -97,61 +167,132 @@ async def get_current_data():
         )
 
 
-@router.get("/historical")
-async def get_historical_data(results: int = Query(15, ge=1, le=100)):
+def _epoch(value: Optional[datetime]) -> Optional[float]:
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)  # naive times are UTC, like ThingSpeak's
+    return value.timestamp()
+
+
+async def load_history(device: Device, results: int, start: Optional[datetime],
+                       end: Optional[datetime]) -> Dict[str, np.ndarray]:
     """
-    Get historical data from ThingSpeak (last N readings)
+    A device's newest `results` readings in [start, end], oldest first, as columns:
+    {"created_at": epoch seconds (n,), "fields": (n, 5) in SENSOR_KEYS order, NaN if missing}.
+    Reads the local store after an incremental sync; if ThingSpeak is
+    unreachable, whatever the store already holds is served. Without a
+    store, the range is passed to feeds.json.
     """
+    field_numbers = [device.fields[key] for key in MODEL_KEYS]
+    store = get_sensor_store()
+    if store is None:
+        start_at, end_at = _epoch(start), _epoch(end)
+        payload = await fetch_feeds(min(results, THINGSPEAK_MAX_RESULTS), device.channel_id,
+                                    device.read_key, start_at, end_at)
+        # feeds.json range bounds are whole seconds; keep exactly [start, end]
+        feeds = [
+            feed for feed in payload.get("feeds", [])
+            if feed.get("created_at")
+            and (start_at is None or parse_timestamp(feed["created_at"]) >= start_at)
+            and (end_at is None or parse_timestamp(feed["created_at"]) <= end_at)
+        ]
+        return {
+            "created_at": np.array([parse_timestamp(feed["created_at"]) for feed in feeds], dtype=np.float64),
+            "fields": np.array(
+                [[float(feed[f"field{number}"]) if feed.get(f"field{number}") else np.nan
+                  for number in field_numbers]
+                 for feed in feeds],
+                dtype=np.float64,
+            ).reshape(len(feeds), len(SENSOR_KEYS)),
+        }
+
     try:
-        if not THINGSPEAK_CHANNEL_ID:
-            raise HTTPException(
-                status_code=503, detail="ThingSpeak channel not configured"
-            )
+        await sync_channel(store, device.channel_id, device.read_key,
+                           min_interval=HISTORY_SYNC_INTERVAL)
+    except Exception as e:
+        if await asyncio.to_thread(store.cursor, device.channel_id) is None:
+            raise
+        print(f"⚠️ ThingSpeak sync failed, serving stored history: {e}")
 
-        url = f"https://api.thingspeak.com/channels/{THINGSPEAK_CHANNEL_ID}/feeds.json?results={results}"
-        if THINGSPEAK_READ_API_KEY:
-            url += f"&api_key={THINGSPEAK_READ_API_KEY}"
+    history = await asyncio.to_thread(
+        store.read, device.channel_id, _epoch(start), _epoch(end), results, field_numbers,
+    )
+    return {"created_at": history["created_at"], "fields": history["fields"]}
 
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        data = response.json()
 
-        feeds = data.get("feeds", [])
+@router.get("/historical")
+async def get_historical_data(
+    results: Optional[int] = Query(None, ge=1, le=HISTORY_MAX_ROWS,
+                                   description="Newest N readings (default 15 without a range)"),
+    start: Optional[datetime] = Query(None, description="Only readings at or after this time"),
+    end: Optional[datetime] = Query(None, description="Only readings at or before this time"),
+    max_points: Optional[int] = Query(None, ge=3, le=5000,
+                                      description="Downsample each sensor series to about this many points"),
+    downsample_method: str = Query("lttb", alias="downsample", pattern="^(lttb|minmax)$",
+                                   description="lttb (shape-preserving) or minmax (bucket extremes)"),
+    rolling_window: Optional[int] = Query(None, ge=2, le=10000,
+                                          description="Add each sensor's trailing mean over this many readings"),
+    insights: bool = Query(False, description="Add soil recommendations to every reading"),
+    device_id: Optional[str] = DEVICE_QUERY,
+):
+    """
+    Get historical sensor readings, oldest first.
+    Served from the local sensor store, which is synced incrementally from
+    ThingSpeak; without a store the last N readings are fetched directly.
+    With max_points, long ranges are downsampled per sensor (the rows kept
+    are the union of each sensor's selected points). Averages, trends
+    (least-squares slope over the range), percentiles and rolling averages
+    always use every reading in the range.
+    """
+    device = resolve_device(device_id)
+    if device is None:
+        raise HTTPException(
+            status_code=503, detail="ThingSpeak channel not configured"
+        )
+    try:
 
-        # Process feeds (only 5 sensor fields, no temperature)
-        processed_feeds = []
-        for feed in feeds:
-            processed_feeds.append(
-                {
-                    "nitrogen": (
-                        float(feed.get("field1") or 0) if feed.get("field1") else None
-                    ),
-                    "phosphorus": (
-                        float(feed.get("field2") or 0) if feed.get("field2") else None
-                    ),
-                    "potassium": (
-                        float(feed.get("field3") or 0) if feed.get("field3") else None
-                    ),
-                    "moisture": (
-                        float(feed.get("field4") or 0) if feed.get("field4") else None
-                    ),
-                    "ph": (
-                        float(feed.get("field5") or 0) if feed.get("field5") else None
-                    ),
-                    "temperature": None,  # Will be filled from weather API
-                    "timestamp": feed.get("created_at"),
-                }
+        if results is None:
+            results = 15 if start is None and end is None else HISTORY_MAX_ROWS
+        history = await load_history(device, results, start, end)
+        created_at, fields = history["created_at"], history["fields"]
+        # Statistics over every reading in the range, before any downsampling
+        summary = summarize(created_at, fields, SENSOR_KEYS)
+
+        downsampling = None
+        rows = np.arange(created_at.size)
+        if max_points is not None and created_at.size > max_points:
+            rows = downsample(
+                created_at, dict(zip(SENSOR_KEYS, fields.T)), max_points, downsample_method
             )
+            downsampling = {
+                "method": downsample_method,
+                "max_points": max_points,
+                "raw_points": int(created_at.size),
+                "points": int(rows.size),
+            }
+        selected = fields[rows]
+        values = np.where(np.isnan(selected), None, selected.astype(object)).tolist()
+        processed_feeds = []
+        for row, timestamp in zip(values, created_at[rows].tolist()):
+            reading = dict(zip(SENSOR_KEYS, row))
+            reading["temperature"] = None  # Will be filled from weather API
+            reading["timestamp"] = format_timestamp(timestamp)
+            processed_feeds.append(reading)
+        if rolling_window is not None:
+            # Computed over every reading, then sampled at the rows returned
+            rolling = np.round(rolling_means(fields, rolling_window)[rows], 4)
+            rolling = np.where(np.isnan(rolling), None, rolling.astype(object)).tolist()
+            for feed, row in zip(processed_feeds, rolling):
+                feed["rolling_average"] = dict(zip(SENSOR_KEYS, row))
 
         # Get current temperature from weather API
         current_temperature = 25.1  # Default dummy temperature
         if WEATHER_SERVICE_AVAILABLE:
             try:
                 weather_service = get_weather_service()
-                default_lat = float(os.getenv("DEFAULT_LATITUDE", "28.6139"))
-                default_lng = float(os.getenv("DEFAULT_LONGITUDE", "77.2090"))
                 weather_data = await weather_service.get_current_weather(
-                    default_lat, default_lng
+                    *weather_location(device)
                 )
                 current_temperature = weather_data.get("current", {}).get("temperature", 25.1)
                 # Apply current temperature to all recent readings
@@ -166,49 +307,37 @@ async def get_historical_data(results: int = Query(15, ge=1, le=100)):
             for feed in processed_feeds:
                 feed["temperature"] = current_temperature
 
-        # Calculate averages
-        def safe_avg(values):
-            filtered = [v for v in values if v is not None]
-            return statistics.mean(filtered) if filtered else None
-
         averages = {
-            "nitrogen": safe_avg([f["nitrogen"] for f in processed_feeds]),
-            "phosphorus": safe_avg([f["phosphorus"] for f in processed_feeds]),
-            "potassium": safe_avg([f["potassium"] for f in processed_feeds]),
-            "moisture": safe_avg([f["moisture"] for f in processed_feeds]),
-            "ph": safe_avg([f["ph"] for f in processed_feeds]),
+            **summary["average"],
             "temperature": current_temperature,  # Current weather temperature
         }
-
-        # Calculate trends (simple: compare first half vs second half)
-        def calculate_trend(values):
-            filtered = [v for v in values if v is not None]
-            if len(filtered) < 4:
-                return "stable"
-            mid = len(filtered) // 2
-            first_half_avg = statistics.mean(filtered[:mid])
-            second_half_avg = statistics.mean(filtered[mid:])
-            diff_percent = ((second_half_avg - first_half_avg) / first_half_avg) * 100
-
-            if diff_percent > 5:
-                return "increasing"
-            elif diff_percent < -5:
-                return "decreasing"
-            else:
-                return "stable"
-
         trends = {
-            "nitrogen": calculate_trend([f["nitrogen"] for f in processed_feeds]),
-            "phosphorus": calculate_trend([f["phosphorus"] for f in processed_feeds]),
-            "potassium": calculate_trend([f["potassium"] for f in processed_feeds]),
-            "moisture": calculate_trend([f["moisture"] for f in processed_feeds]),
-            "ph": calculate_trend([f["ph"] for f in processed_feeds]),
+            **summary["trends"],
             "temperature": "stable",  # Weather temperature doesn't trend with sensor data
         }
 
-        return {"data": processed_feeds, "average": averages, "trends": trends}
+        if insights:
+            # All readings are evaluated in one batched rule pass
+            recommendations = soil_recommendations(
+                [f["nitrogen"] for f in processed_feeds],
+                [f["phosphorus"] for f in processed_feeds],
+                [f["potassium"] for f in processed_feeds],
+                [f["moisture"] for f in processed_feeds],
+                [f["ph"] for f in processed_feeds],
+                [f["temperature"] for f in processed_feeds],
+            )
+            for feed, recommendation in zip(processed_feeds, recommendations):
+                feed["insights"] = recommendation
 
-    except requests.HTTPError as he:
+        return {
+            "data": processed_feeds,
+            "average": averages,
+            "trends": trends,
+            "statistics": summary["statistics"],
+            "downsampling": downsampling,
+        }
+
+    except httpx.HTTPStatusError as he:
         raise HTTPException(status_code=502, detail=f"ThingSpeak API error: {str(he)}")
     except Exception as e:
         raise HTTPException(
@@ -217,14 +346,15 @@ async def get_historical_data(results: int = Query(15, ge=1, le=100)):
 
 
 @router.get("/recommendations", response_model=RecommendationResponse)
-async def get_smart_recommendations():
+async def get_smart_recommendations(device_id: Optional[str] = DEVICE_QUERY):
     """
     Get intelligent crop and fertilizer recommendations based on current sensor data
     Temperature from weather API, other sensors from ThingSpeak
     """
+    device = resolve_device(device_id)
     try:
         # Get current sensor data (N, P, K, Moisture, pH)
-        data = get_model_input_dict()
+        data, snapshot = await latest_sensor_input(device)
         N = data.get("N")
         P = data.get("P")
         K = data.get("K")
@@ -236,177 +366,20 @@ async def get_smart_recommendations():
         if WEATHER_SERVICE_AVAILABLE:
             try:
                 weather_service = get_weather_service()
-                default_lat = float(os.getenv("DEFAULT_LATITUDE", "28.6139"))
-                default_lng = float(os.getenv("DEFAULT_LONGITUDE", "77.2090"))
                 weather_data = await weather_service.get_current_weather(
-                    default_lat, default_lng
+                    *weather_location(device)
                 )
                 temp = weather_data.get("current", {}).get("temperature", 25.1)
             except Exception as e:
                 # Weather API is optional - use default temperature if unavailable
                 pass
 
-        # Default values if data is missing
-        N = N if N is not None else 0
-        P = P if P is not None else 0
-        K = K if K is not None else 0
-        moisture = moisture if moisture is not None else 0
-        ph = ph if ph is not None else 7.0
-
-        # Fertilizer Recommendation Logic
-        fertilizer_rec = ""
-        actions = []
-
-        if N < 30:
-            fertilizer_rec = "High-Nitrogen Fertilizer (Urea or Ammonium Nitrate)"
-            actions.append(
-                f"Apply Urea at 50-75 kg/acre to boost nitrogen levels (Currently: {N:.1f} kg/ha)"
-            )
-        elif N > 80:
-            fertilizer_rec = "Reduce Nitrogen Application"
-            actions.append(
-                f"Nitrogen levels are high ({N:.1f} kg/ha). Skip nitrogen fertilizers this cycle"
-            )
-
-        if P < 15:
-            if fertilizer_rec:
-                fertilizer_rec += " + High-Phosphorus Fertilizer (DAP or SSP)"
-            else:
-                fertilizer_rec = (
-                    "High-Phosphorus Fertilizer (DAP or Single Super Phosphate)"
-                )
-            actions.append(
-                f"Apply DAP at 40-60 kg/acre for phosphorus boost (Currently: {P:.1f} kg/ha)"
-            )
-        elif P > 60:
-            actions.append(
-                f"Phosphorus levels are optimal ({P:.1f} kg/ha). No additional P needed"
-            )
-
-        if K < 20:
-            if fertilizer_rec:
-                fertilizer_rec += " + Potassium Fertilizer (MOP)"
-            else:
-                fertilizer_rec = "Potassium Fertilizer (Muriate of Potash)"
-            actions.append(
-                f"Apply MOP at 30-50 kg/acre for potassium (Currently: {K:.1f} kg/ha)"
-            )
-        elif K > 70:
-            actions.append(
-                f"Potassium levels are excellent ({K:.1f} kg/ha). Maintain current practices"
-            )
-
-        if not fertilizer_rec:
-            fertilizer_rec = "Balanced NPK Fertilizer (10-26-26 or 15-15-15)"
-            actions.append(
-                "All nutrient levels are optimal. Use balanced NPK for maintenance"
-            )
-
-        # Crop Recommendation Logic
-        crop_suggestion = ""
-        reasoning = ""
-
-        # High N, moderate P,K -> Leafy crops
-        if N > 40 and P < 40 and K < 40:
-            crop_suggestion = "Leafy Vegetables (Spinach, Lettuce, Cabbage)"
-            reasoning = (
-                "High nitrogen supports vigorous leaf growth. Ideal for leafy crops."
-            )
-
-        # High P, High K -> Fruiting crops
-        elif P > 30 and K > 30:
-            crop_suggestion = "Fruiting Crops (Tomatoes, Peppers, Eggplant)"
-            reasoning = (
-                "High phosphorus and potassium promote flowering and fruit development."
-            )
-
-        # Low N, High P -> Root crops
-        elif N < 40 and P > 25:
-            crop_suggestion = "Root Vegetables (Potatoes, Carrots, Radish)"
-            reasoning = (
-                "Moderate nitrogen with good phosphorus supports root development."
-            )
-
-        # Balanced nutrients -> Grains
-        elif 30 <= N <= 70 and 15 <= P <= 50 and 20 <= K <= 60:
-            crop_suggestion = "Cereals (Wheat, Rice, Maize)"
-            reasoning = "Balanced nutrient profile is ideal for grain crops."
-
-        # High overall nutrients -> Heavy feeders
-        elif N > 60 and P > 40 and K > 50:
-            crop_suggestion = "Heavy Feeders (Pumpkin, Squash, Cucumber)"
-            reasoning = "Rich soil nutrients can support high-demand crops."
-
-        # Default fallback
-        else:
-            crop_suggestion = "Legumes (Beans, Peas, Lentils)"
-            reasoning = (
-                "Legumes can fix nitrogen and improve soil health for future crops."
-            )
-
-        # Soil Health Assessment
-        soil_health = "Good"
-        health_factors = []
-
-        # Check pH
-        if 6.0 <= ph <= 7.5:
-            health_factors.append("pH is optimal")
-        elif ph < 5.5:
-            soil_health = "Acidic - Needs Lime"
-            health_factors.append(
-                f"pH is too acidic ({ph:.1f}). Apply lime to raise pH"
-            )
-            actions.append(
-                "Apply agricultural lime at 200-300 kg/acre to neutralize acidity"
-            )
-        elif ph > 8.0:
-            soil_health = "Alkaline - Needs Sulfur"
-            health_factors.append(
-                f"pH is too alkaline ({ph:.1f}). Apply sulfur to lower pH"
-            )
-            actions.append(
-                "Apply elemental sulfur at 50-100 kg/acre to reduce alkalinity"
-            )
-
-        # Check moisture
-        if moisture < 30:
-            health_factors.append("Soil moisture is low - Increase irrigation")
-            actions.append(
-                f"Increase irrigation frequency. Current moisture: {moisture:.1f}%"
-            )
-        elif moisture > 80:
-            health_factors.append("Soil moisture is high - Risk of waterlogging")
-            actions.append(
-                f"Reduce irrigation or improve drainage. Current moisture: {moisture:.1f}%"
-            )
-        else:
-            health_factors.append("Moisture levels are optimal")
-
-        # Check temperature
-        if temp < 15:
-            health_factors.append("Soil temperature is low - Growth may be slow")
-        elif temp > 35:
-            health_factors.append("Soil temperature is high - Consider mulching")
-            actions.append("Apply organic mulch to regulate soil temperature")
-        else:
-            health_factors.append("Temperature is favorable for crop growth")
-
-        # Overall nutrient status
-        avg_nutrient = (N + P + K) / 3
-        if avg_nutrient > 50:
-            health_factors.append("Overall nutrient levels are rich")
-        elif avg_nutrient < 30:
-            soil_health = "Nutrient Deficient"
-            health_factors.append("Overall nutrient levels are low")
-
-        reasoning += " " + ". ".join(health_factors) + "."
-
+        # Fertilizer, crop and soil health rules (see services/insight_rules.py)
+        recommendation = soil_recommendations(
+            [N], [P], [K], [moisture], [ph], [temp]
+        )[0]
         return RecommendationResponse(
-            fertilizer_recommendation=fertilizer_rec,
-            crop_suggestion=crop_suggestion,
-            reasoning=reasoning.strip(),
-            soil_health=soil_health,
-            actions=actions if actions else ["Continue monitoring soil conditions"],
+            **recommendation, data_age_seconds=snapshot["data_age_seconds"]
         )
 
     except Exception as e:
@@ -416,38 +389,30 @@ async def get_smart_recommendations():
 
 
 @router.get("/device-status")
-async def get_device_status():
+async def get_device_status(device_id: Optional[str] = DEVICE_QUERY):
     """
-    Get the status of the connected ThingSpeak device
+    Get the status of the connected ThingSpeak device: "active" while its
+    newest entry is within THINGSPEAK_STALE_FACTOR update intervals, else
+    "stale" ("inactive" if the channel has no entries)
     """
+    device = resolve_device(device_id)
     try:
-        if not THINGSPEAK_CHANNEL_ID:
+        if device is None:
             return {"connected": False, "message": "No device configured"}
 
-        # Try to fetch latest data to check if device is active
-        data = get_model_input_dict()
-
-        # Check if we got any valid data
-        has_data = any(
-            data.get(key) is not None
-            for key in ["N", "P", "K", "Moisture", "pH", "temp"]
-        )
-
-        return {
-            "connected": has_data,
-            "device_id": THINGSPEAK_CHANNEL_ID,
-            "device_name": "AgroTech Sensor Node #1",
-            "last_update": datetime.utcnow().isoformat(),
-            "status": "active" if has_data else "inactive",
-            "message": (
-                "Device is actively sending data"
-                if has_data
-                else "No recent data from device"
-            ),
-        }
+        return await get_device_status_monitor().current(device)
 
     except Exception as e:
         return {
             "connected": False,
             "message": f"Error checking device status: {str(e)}",
         }
+
+
+@router.get("/devices/status")
+async def get_fleet_status():
+    """
+    Status of every registered device from the in-memory last-entry times,
+    which a background task refreshes in bulk (no upstream calls here)
+    """
+    return get_device_status_monitor().fleet()
@@ -79,6 +79,14 @@ def verify_password(password: str, hashed: str) -> bool:
     """Verify password against hash"""
     return hash_password(password) == hashed
 
+def get_farm_locations() -> List[str]:
+    """Registered farm locations of active users (used by the weather prefetcher)"""
+    return [
+        user["farm_location"]
+        for user in users_db.values()
+        if user.get("is_active", True) and user.get("farm_location")
+    ]
+
 def create_access_token(user_id: str) -> str:
     """Create access token for user"""
     token = secrets.token_urlsafe(32)
@@ -1,10 +1,24 @@
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
-import httpx
 import os
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import asyncio
+import time
+
+import numpy as np
+
+from services.weather import get_weather_service
+from services.crop_calendar import get_crop_calendar_service, ical_lines
+from services.climatology import daily_statistics, describe_day
+from services.synthetic_weather import get_synthetic_weather
+from services.insight_rules import (
+    WEATHER_ADVISORY_RULES,
+    CROP_ADVISORY_RULES,
+    WEATHER_ALERT_RULES,
+    WEATHER_ALERTS,
+)
 
 router = APIRouter()
 
@@ -19,11 +33,18 @@ class WeatherResponse(BaseModel):
     forecast: List[Dict[str, Any]]
     agricultural_advisory: List[str]
     timestamp: datetime
+    # Set when stale last-known-good data was served because OpenWeatherMap was unavailable
+    data_age_seconds: Optional[float] = None
 
 class CropCalendarRequest(BaseModel):
     crop_name: str
     location: str
     planting_date: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+
+class CropCalendarBatchRequest(BaseModel):
+    fields: List[CropCalendarRequest]
 
 @router.get("/current", response_model=WeatherResponse)
 async def get_current_weather(
@@ -49,7 +70,8 @@ async def get_current_weather(
             current_weather=weather_data['current'],
             forecast=weather_data['forecast'],
             agricultural_advisory=advisory,
-            timestamp=datetime.now()
+            timestamp=datetime.now(),
+            data_age_seconds=weather_data.get('data_age_seconds')
         )
         
     except Exception as e:
@@ -64,6 +86,8 @@ async def get_weather_forecast(
     """
     Get extended weather forecast
     """
+    if days < 1:
+        raise HTTPException(status_code=400, detail="Forecast days must be at least 1")
     if days > 14:
         raise HTTPException(status_code=400, detail="Maximum 14 days forecast available")
     
@@ -100,7 +124,8 @@ async def get_agricultural_advisory(
             "crop_type": crop_type,
             "advisory": advisory,
             "weather_summary": weather_data['current'],
-            "timestamp": datetime.now()
+            "timestamp": datetime.now(),
+            "data_age_seconds": weather_data.get('data_age_seconds')
         }
         
     except Exception as e:
@@ -112,12 +137,8 @@ async def get_crop_calendar(request: CropCalendarRequest):
     Get crop-specific calendar and weather recommendations
     """
     try:
-        # Generate crop calendar based on location and crop
-        calendar_data = generate_crop_calendar(
-            request.crop_name, 
-            request.location, 
-            request.planting_date
-        )
+        # Stage dates follow accumulated thermal time at the field's location
+        calendar_data = (await generate_crop_calendars([request]))[0]
         
         return {
             "crop": request.crop_name,
@@ -126,9 +147,50 @@ async def get_crop_calendar(request: CropCalendarRequest):
             "timestamp": datetime.now()
         }
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Calendar error: {str(e)}")
+
+@router.post("/crop-calendar/batch")
+async def get_crop_calendars(request: CropCalendarBatchRequest):
+    """
+    Get crop calendars for many fields and crops in one call
+    """
+    try:
+        calendars = await generate_crop_calendars(request.fields)
+        
+        return {
+            "calendars": [
+                {"crop": field.crop_name, "location": field.location, "calendar": calendar}
+                for field, calendar in zip(request.fields, calendars)
+            ],
+            "timestamp": datetime.now()
+        }
+        
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Calendar error: {str(e)}")
 
+@router.post("/crop-calendar/ical")
+async def export_crop_calendars(request: CropCalendarBatchRequest):
+    """
+    Export crop calendars for many fields as a streamed iCalendar (.ics) feed
+    """
+    try:
+        calendars = await generate_crop_calendars(request.fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Calendar error: {str(e)}")
+    
+    return StreamingResponse(
+        ical_lines(calendars, [field.location for field in request.fields]),
+        media_type="text/calendar; charset=utf-8",
+        headers={"Content-Disposition": 'attachment; filename="crop-calendar.ics"'}
+    )
+
 @router.get("/alerts")
 async def get_weather_alerts(
     latitude: float = Query(...),
@@ -155,7 +217,14 @@ async def get_weather_alerts(
         raise HTTPException(status_code=500, detail=f"Alerts error: {str(e)}")
 
 async def fetch_weather_data(latitude: float, longitude: float) -> Optional[Dict[str, Any]]:
-    """Fetch weather data from OpenWeatherMap API (free tier)"""
+    """
+    Fetch current weather and the next 24 hours of forecast from OpenWeatherMap.
+
+    Uses the shared WeatherService, so both calls go out concurrently over its
+    pooled client and results are cached per location for every route (and
+    for /weather/* in main.py). `data_age_seconds` is set when the service
+    fell back to last-known-good data.
+    """
     
     # Using OpenWeatherMap free API (you'll need to sign up for API key)
     api_key = os.getenv("OPENWEATHER_API_KEY", "demo_key")
@@ -165,198 +234,123 @@ async def fetch_weather_data(latitude: float, longitude: float) -> Optional[Dict
         return get_mock_weather_data(latitude, longitude)
     
     try:
-        async with httpx.AsyncClient() as client:
-            # Current weather
-            current_url = f"http://api.openweathermap.org/data/2.5/weather"
-            current_params = {
-                "lat": latitude,
-                "lon": longitude,
-                "appid": api_key,
-                "units": "metric"
-            }
-            
-            # Forecast
-            forecast_url = f"http://api.openweathermap.org/data/2.5/forecast"
-            forecast_params = {
-                "lat": latitude,
-                "lon": longitude,
-                "appid": api_key,
-                "units": "metric"
-            }
-            
-            current_response = await client.get(current_url, params=current_params)
-            forecast_response = await client.get(forecast_url, params=forecast_params)
-            
-            if current_response.status_code != 200 or forecast_response.status_code != 200:
-                return get_mock_weather_data(latitude, longitude)
-            
-            current_data = current_response.json()
-            forecast_data = forecast_response.json()
-            
-            return {
-                "current": {
-                    "temperature": current_data["main"]["temp"],
-                    "humidity": current_data["main"]["humidity"],
-                    "pressure": current_data["main"]["pressure"],
-                    "weather": current_data["weather"][0]["description"],
-                    "wind_speed": current_data["wind"]["speed"],
-                    "visibility": current_data.get("visibility", 0) / 1000,  # Convert to km
-                    "uv_index": 5,  # Mock UV index
-                    "rainfall": current_data.get("rain", {}).get("1h", 0)
-                },
-                "forecast": [
-                    {
-                        "date": item["dt_txt"],
-                        "temperature": item["main"]["temp"],
-                        "humidity": item["main"]["humidity"],
-                        "weather": item["weather"][0]["description"],
-                        "rainfall": item.get("rain", {}).get("3h", 0)
-                    }
-                    for item in forecast_data["list"][:8]  # Next 24 hours (8 x 3-hour intervals)
-                ]
-            }
+        # Quota, circuit breaker and last-known-good fallback are handled by the
+        # service; anything it cannot serve falls through to the mock data
+        payloads = await get_weather_service().get_weather_payloads(latitude, longitude)
+        weather_data = format_weather_payloads(payloads["current"], payloads["forecast"])
+        weather_data["data_age_seconds"] = payloads["data_age_seconds"]
+        return weather_data
             
     except Exception as e:
         print(f"Weather API error: {e}")
         return get_mock_weather_data(latitude, longitude)
 
-def get_mock_weather_data(latitude: float, longitude: float) -> Dict[str, Any]:
-    """Return mock weather data for demo purposes"""
-    
-    import random
+def format_weather_payloads(current_data: Dict[str, Any], forecast_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Current conditions and the next 24 hours from OpenWeatherMap-format payloads"""
     
     return {
         "current": {
-            "temperature": round(random.uniform(20, 35), 1),
-            "humidity": random.randint(40, 80),
-            "pressure": random.randint(1005, 1025),
-            "weather": random.choice(["Clear sky", "Partly cloudy", "Overcast", "Light rain"]),
-            "wind_speed": round(random.uniform(2, 8), 1),
-            "visibility": round(random.uniform(8, 15), 1),
-            "uv_index": random.randint(3, 8),
-            "rainfall": round(random.uniform(0, 5), 1)
+            "temperature": current_data["main"]["temp"],
+            "humidity": current_data["main"]["humidity"],
+            "pressure": current_data["main"]["pressure"],
+            "weather": current_data["weather"][0]["description"],
+            "wind_speed": current_data["wind"]["speed"],
+            "visibility": current_data.get("visibility", 0) / 1000,  # Convert to km
+            "uv_index": 5,  # Mock UV index
+            "rainfall": current_data.get("rain", {}).get("1h", 0)
         },
         "forecast": [
             {
-                "date": (datetime.now() + timedelta(hours=i*3)).strftime("%Y-%m-%d %H:%M:%S"),
-                "temperature": round(random.uniform(18, 33), 1),
-                "humidity": random.randint(35, 85),
-                "weather": random.choice(["Clear", "Cloudy", "Rain", "Drizzle"]),
-                "rainfall": round(random.uniform(0, 3), 1)
+                "date": item["dt_txt"],
+                "temperature": item["main"]["temp"],
+                "humidity": item["main"]["humidity"],
+                "weather": item["weather"][0]["description"],
+                "rainfall": item.get("rain", {}).get("3h", 0)
             }
-            for i in range(8)
+            for item in forecast_data["list"][:8]  # Next 24 hours (8 x 3-hour intervals)
         ]
     }
 
+def get_mock_weather_data(latitude: float, longitude: float) -> Dict[str, Any]:
+    """Return synthetic weather for demo purposes (stable for a given place and hour)"""
+    
+    weather = get_synthetic_weather()
+    now = int(time.time())
+    first_slot = (now // 10800 + 1) * 10800  # Next 3-hour boundary, as OpenWeatherMap does
+    return format_weather_payloads(
+        weather.current_payload(latitude, longitude, now),
+        weather.forecast_payload(latitude, longitude, first_slot, 8),
+    )
+
 async def fetch_extended_forecast(latitude: float, longitude: float, days: int) -> List[Dict[str, Any]]:
-    """Fetch extended weather forecast"""
-    
-    # For demo, generate mock extended forecast
-    forecast = []
-    for i in range(days):
-        date = datetime.now() + timedelta(days=i)
-        forecast.append({
-            "date": date.strftime("%Y-%m-%d"),
-            "temperature_max": round(random.uniform(25, 35), 1),
-            "temperature_min": round(random.uniform(15, 25), 1),
-            "humidity": random.randint(40, 80),
-            "weather": random.choice(["Sunny", "Partly cloudy", "Cloudy", "Rainy", "Stormy"]),
-            "rainfall": round(random.uniform(0, 20), 1),
-            "wind_speed": round(random.uniform(3, 12), 1)
-        })
-    
-    return forecast
+    """
+    Fetch an extended (up to 14 day) daily forecast.
+
+    The 5-day OpenWeatherMap forecast is blended into day-of-year climatology
+    built from the weather history recorded for the location (see
+    services/climatology.py); results are cached per location by the shared
+    WeatherService.
+    """
+    api_key = os.getenv("OPENWEATHER_API_KEY", "demo_key")
+    if api_key == "demo_key":
+        return get_mock_extended_forecast(latitude, longitude, days)
+
+    try:
+        return await get_weather_service().get_extended_forecast(latitude, longitude, days)
+    except Exception as e:
+        print(f"Extended forecast error: {e}")
+        return get_mock_extended_forecast(latitude, longitude, days)
+
+def get_mock_extended_forecast(latitude: float, longitude: float, days: int) -> List[Dict[str, Any]]:
+    """Return a synthetic extended forecast for demo purposes (daily summaries of synthetic hours)"""
+    
+    weather = get_synthetic_weather()
+    tz_offset = round(longitude / 15) * 3600
+    today = (datetime.now(timezone.utc) + timedelta(seconds=tz_offset)).date()
+    start = int(datetime(today.year, today.month, today.day, tzinfo=timezone.utc).timestamp()) - tz_offset
+    hourly = weather.hourly(latitude, longitude, start, days * 24)
+    
+    local_days, daily = daily_statistics(
+        np.arange(days * 24) + start // 3600,
+        np.column_stack([hourly["temp"], hourly["humidity"], hourly["rain"], hourly["wind_speed"]]),
+        tz_offset=tz_offset,
+    )
+    return [
+        {
+            "date": (today + timedelta(days=i)).strftime("%Y-%m-%d"),
+            "temperature_max": round(float(daily["temperature_max"][i]), 1),
+            "temperature_min": round(float(daily["temperature_min"][i]), 1),
+            "humidity": round(float(daily["humidity"][i])),
+            "weather": describe_day(float(daily["rainfall"][i]), float(daily["humidity"][i])),
+            "rainfall": round(float(daily["rainfall"][i]), 1),
+            "wind_speed": round(float(daily["wind_speed"][i]), 1),
+            "source": "synthetic"
+        }
+        for i in range(len(local_days))
+    ]
 
 def generate_agricultural_advisory(weather_data: Dict[str, Any]) -> List[str]:
-    """Generate agricultural advisory based on weather conditions"""
-    
-    advisory = []
+    """Generate agricultural advisory based on weather conditions (see insight_rules)"""
     current = weather_data['current']
-    
-    # Temperature advisories
-    if current['temperature'] > 35:
-        advisory.append("High temperature alert: Increase irrigation frequency and provide shade for sensitive crops")
-    elif current['temperature'] < 15:
-        advisory.append("Low temperature warning: Protect crops from frost damage, consider row covers")
-    
-    # Humidity advisories
-    if current['humidity'] > 80:
-        advisory.append("High humidity: Monitor for fungal diseases, ensure good air circulation")
-    elif current['humidity'] < 40:
-        advisory.append("Low humidity: Increase irrigation and consider mulching to retain soil moisture")
-    
-    # Rainfall advisories
-    if current['rainfall'] > 10:
-        advisory.append("Heavy rainfall expected: Ensure proper drainage, avoid field operations")
-    elif current['rainfall'] == 0 and current['humidity'] < 50:
-        advisory.append("Dry conditions: Plan irrigation schedule, check soil moisture levels")
-    
-    # Wind advisories
-    if current['wind_speed'] > 10:
-        advisory.append("Strong winds: Secure tall crops, check for wind damage, avoid pesticide spraying")
-    
-    # UV advisories
-    if current['uv_index'] > 7:
-        advisory.append("High UV index: Protect workers, consider crop shading for sensitive plants")
-    
-    # General advisories
-    if not advisory:
-        advisory.append("Weather conditions are favorable for normal agricultural activities")
-    
-    return advisory
+    return WEATHER_ADVISORY_RULES.evaluate_one(
+        temperature=current['temperature'],
+        humidity=current['humidity'],
+        rainfall=current['rainfall'],
+        wind_speed=current['wind_speed'],
+        uv_index=current['uv_index'],
+    )["advisory"]
 
 def generate_crop_specific_advisory(weather_data: Dict[str, Any], crop_type: str) -> List[str]:
-    """Generate crop-specific weather advisory"""
-    
-    advisory = generate_agricultural_advisory(weather_data)
+    """Generate crop-specific weather advisory (general advisory plus CROP_ADVISORIES)"""
     current = weather_data['current']
-    
-    crop_specific = {
-        "rice": {
-            "temperature": {
-                "high": "High temperature may affect grain filling - ensure adequate water supply",
-                "low": "Cool weather may slow growth - monitor for diseases"
-            },
-            "rainfall": {
-                "high": "Excess water may cause lodging - improve drainage",
-                "low": "Maintain standing water in fields"
-            }
-        },
-        "wheat": {
-            "temperature": {
-                "high": "Heat stress during grain filling - irrigate frequently",
-                "low": "Favorable for wheat growth - monitor for rust diseases"
-            },
-            "rainfall": {
-                "high": "Excess moisture may cause fungal diseases",
-                "low": "Supplemental irrigation may be needed"
-            }
-        },
-        "cotton": {
-            "temperature": {
-                "high": "Optimal temperature for cotton growth",
-                "low": "Cool weather may delay flowering"
-            },
-            "rainfall": {
-                "high": "Excess moisture may affect fiber quality",
-                "low": "Cotton is drought tolerant but monitor soil moisture"
-            }
-        }
-    }
-    
-    crop_lower = crop_type.lower()
-    if crop_lower in crop_specific:
-        if current['temperature'] > 30:
-            advisory.append(crop_specific[crop_lower]['temperature']['high'])
-        elif current['temperature'] < 20:
-            advisory.append(crop_specific[crop_lower]['temperature']['low'])
-        
-        if current['rainfall'] > 5:
-            advisory.append(crop_specific[crop_lower]['rainfall']['high'])
-        elif current['rainfall'] == 0:
-            advisory.append(crop_specific[crop_lower]['rainfall']['low'])
-    
-    return advisory
+    return CROP_ADVISORY_RULES.evaluate_one(
+        temperature=current['temperature'],
+        humidity=current['humidity'],
+        rainfall=current['rainfall'],
+        wind_speed=current['wind_speed'],
+        uv_index=current['uv_index'],
+        crop=crop_type.lower(),
+    )["advisory"]
 
 def generate_general_advisory(weather_data: Dict[str, Any]) -> List[str]:
     """Generate general agricultural advisory"""
@@ -378,91 +372,40 @@ def generate_general_advisory(weather_data: Dict[str, Any]) -> List[str]:
     
     return advisory
 
-def generate_crop_calendar(crop_name: str, location: str, planting_date: Optional[str] = None) -> Dict[str, Any]:
-    """Generate crop calendar with key agricultural activities"""
-    
-    if planting_date:
-        start_date = datetime.strptime(planting_date, "%Y-%m-%d")
-    else:
-        start_date = datetime.now()
-    
-    # Crop growth cycles (in days)
-    crop_cycles = {
-        "rice": {"total": 120, "transplanting": 20, "flowering": 60, "maturity": 120},
-        "wheat": {"total": 130, "germination": 7, "tillering": 45, "flowering": 90, "maturity": 130},
-        "cotton": {"total": 180, "germination": 10, "flowering": 60, "boll_formation": 120, "harvest": 180},
-        "maize": {"total": 110, "germination": 7, "tasseling": 60, "maturity": 110},
-        "sugarcane": {"total": 365, "germination": 30, "tillering": 90, "grand_growth": 240, "maturity": 365}
-    }
-    
-    crop_lower = crop_name.lower()
-    if crop_lower not in crop_cycles:
-        return {"error": "Crop not found in database"}
-    
-    cycle = crop_cycles[crop_lower]
-    calendar = {
-        "crop": crop_name,
-        "total_duration": f"{cycle['total']} days",
-        "key_stages": []
-    }
-    
-    for stage, days in cycle.items():
-        if stage != "total":
-            stage_date = start_date + timedelta(days=days)
-            calendar["key_stages"].append({
-                "stage": stage.replace("_", " ").title(),
-                "date": stage_date.strftime("%Y-%m-%d"),
-                "days_from_planting": days
-            })
-    
-    # Add general recommendations
-    calendar["recommendations"] = [
-        "Monitor weather conditions regularly",
-        "Maintain proper irrigation schedule",
-        "Apply fertilizers at recommended stages",
-        "Monitor for pests and diseases",
-        "Harvest at optimal maturity"
-    ]
+async def generate_crop_calendars(requests: List[CropCalendarRequest]) -> List[Dict[str, Any]]:
+    """Generate crop calendars with stage dates from growing degree days (see services/crop_calendar)"""
+    
+    service = get_crop_calendar_service()
+    if len(requests) > service.max_fields:
+        raise ValueError(f"Maximum {service.max_fields} fields per request")
+    
+    fields = []
+    for request in requests:
+        try:
+            planting_date = datetime.strptime(request.planting_date, "%Y-%m-%d").date() if request.planting_date else None
+        except ValueError:
+            raise ValueError(f"Invalid planting_date {request.planting_date!r}, expected YYYY-MM-DD")
+        fields.append({
+            "crop_name": request.crop_name,
+            "location": request.location,
+            "latitude": request.latitude,
+            "longitude": request.longitude,
+            "planting_date": planting_date,
+        })
     
-    return calendar
+    return await service.calendars(fields)
 
 async def fetch_weather_alerts(latitude: float, longitude: float) -> List[Dict[str, Any]]:
-    """Fetch weather alerts and warnings"""
-    
-    # For demo purposes, return mock alerts
-    import random
+    """Weather alerts and warnings for the next 24 hours (see WEATHER_ALERT_RULES)"""
     
-    possible_alerts = [
-        {
-            "type": "temperature",
-            "severity": "medium",
-            "message": "High temperature expected over the next 3 days",
-            "action": "Increase irrigation frequency"
-        },
-        {
-            "type": "rainfall",
-            "severity": "high",
-            "message": "Heavy rainfall warning for next 24 hours",
-            "action": "Ensure field drainage and avoid harvesting"
-        },
-        {
-            "type": "wind",
-            "severity": "low",
-            "message": "Strong winds expected",
-            "action": "Secure tall crops and avoid spraying"
-        },
-        {
-            "type": "drought",
-            "severity": "medium",
-            "message": "No rainfall expected for next 7 days",
-            "action": "Plan irrigation schedule carefully"
-        }
-    ]
-    
-    # Randomly select 0-2 alerts for demo
-    num_alerts = random.randint(0, 2)
-    alerts = random.sample(possible_alerts, num_alerts)
-    
-    return alerts
-
-import random
\ No newline at end of file
+    weather_data = await fetch_weather_data(latitude, longitude)
+    current = weather_data['current']
+    forecast = weather_data['forecast']
+    
+    alert_types = WEATHER_ALERT_RULES.evaluate_one(
+        max_temperature=max([item['temperature'] for item in forecast] + [current['temperature']]),
+        rainfall_24h=sum(item['rainfall'] for item in forecast),
+        wind_speed=current['wind_speed'],
+        humidity=current['humidity'],
+    )["alerts"]
+    return [dict(WEATHER_ALERTS[alert_type]) for alert_type in alert_types]
@@ -0,0 +1,122 @@
+"""
+Benchmark: vectorized forecast aggregation vs the previous per-day Python loop
+
+Run from the backend directory:
+    python -m benchmarks.forecast_aggregation [--locations 1 100 1000] [--repeat 5]
+"""
+import argparse
+import random
+import time
+from datetime import datetime
+from typing import Any, Dict, List
+
+from services.forecast_aggregation import (
+    aggregate_daily,
+    aggregate_daily_arrays,
+    forecast_to_arrays,
+)
+
+CONDITIONS = [("Clear", "clear sky"), ("Clouds", "scattered clouds"),
+              ("Rain", "light rain"), ("Snow", "light snow")]
+
+
+def make_payload(rng: random.Random, start: int = 1700000000) -> Dict[str, Any]:
+    """Synthetic 5-day / 3-hour forecast shaped like OpenWeatherMap's /forecast"""
+    items = []
+    for i in range(40):
+        main, description = rng.choice(CONDITIONS)
+        item = {
+            "dt": start + i * 10800,
+            "main": {"temp": round(rng.uniform(5, 38), 2), "humidity": rng.randint(20, 100)},
+            "weather": [{"main": main, "description": description}],
+            "wind": {"speed": round(rng.uniform(0, 15), 2)},
+        }
+        if main == "Rain":
+            item["rain"] = {"3h": round(rng.uniform(0, 8), 2)}
+        elif main == "Snow":
+            item["snow"] = {"3h": round(rng.uniform(0, 4), 2)}
+        items.append(item)
+    return {"city": {"name": "Bench", "timezone": 19800}, "list": items}
+
+
+def legacy_aggregate(data: Dict[str, Any], days: int) -> List[Dict[str, Any]]:
+    """Daily aggregation as previously done in WeatherService._format_forecast"""
+    forecasts = []
+    tz_offset = data.get("city", {}).get("timezone", 0)
+    daily_forecasts = {}
+    for item in data.get("list", []):
+        date = datetime.utcfromtimestamp(item["dt"] + tz_offset).date()
+        if date not in daily_forecasts:
+            daily_forecasts[date] = []
+        daily_forecasts[date].append(item)
+
+    for date, day_forecasts in list(daily_forecasts.items())[:days]:
+        temps = [item["main"]["temp"] for item in day_forecasts]
+        humidity_vals = [item["main"]["humidity"] for item in day_forecasts]
+        conditions = [item["weather"][0]["main"] for item in day_forecasts]
+        main_condition = max(set(conditions), key=conditions.count)
+        precipitation = sum(item.get("rain", {}).get("3h", 0) +
+                            item.get("snow", {}).get("3h", 0) for item in day_forecasts)
+        avg_wind_ms = sum(item["wind"]["speed"] for item in day_forecasts) / len(day_forecasts)
+        forecasts.append({
+            "date": date.isoformat(),
+            "temperature": {"min": min(temps), "max": max(temps), "avg": sum(temps) / len(temps)},
+            "humidity": {"min": min(humidity_vals), "max": max(humidity_vals),
+                         "avg": sum(humidity_vals) / len(humidity_vals)},
+            "condition": main_condition,
+            "precipitation": precipitation,
+            "wind_speed": round(avg_wind_ms * 3.6, 1),
+        })
+    return forecasts
+
+
+def check_equivalent(payloads: List[Dict[str, Any]], days: int) -> None:
+    """Numeric fields must match the legacy implementation"""
+    for legacy, vectorized in zip((legacy_aggregate(p, days) for p in payloads),
+                                  aggregate_daily(payloads, days)):
+        assert len(legacy) == len(vectorized)
+        for old, new in zip(legacy, vectorized):
+            assert old["date"] == new["date"]
+            # Rounded to 0.1 km/h; summation order may flip a half-way case
+            assert abs(old["wind_speed"] - new["wind_speed"]) <= 0.1 + 1e-9
+            assert abs(old["precipitation"] - new["precipitation"]) < 1e-9
+            for field in ("temperature", "humidity"):
+                for stat in ("min", "max", "avg"):
+                    assert abs(old[field][stat] - new[field][stat]) < 1e-9
+
+
+def best_of(repeat: int, fn) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--locations", type=int, nargs="+", default=[1, 100, 1000])
+    parser.add_argument("--days", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    # "vectorized" is aggregate_daily as called in production: it includes flattening
+    # the JSON payloads into arrays, and takes the plain loop path for one payload;
+    # "reduce only" is the grouped reduction on columns that were already built
+    print(f"{'locations':>10} {'legacy ms':>12} {'vectorized ms':>14} {'speedup':>8} "
+          f"{'reduce only ms':>15}")
+    for count in args.locations:
+        payloads = [make_payload(rng) for _ in range(count)]
+        check_equivalent(payloads, args.days)
+        cols = forecast_to_arrays(payloads)
+        legacy = best_of(args.repeat, lambda: [legacy_aggregate(p, args.days) for p in payloads])
+        vectorized = best_of(args.repeat, lambda: aggregate_daily(payloads, args.days))
+        reduce_only = best_of(args.repeat, lambda: aggregate_daily_arrays(cols, count, args.days))
+        print(f"{count:>10} {legacy * 1000:>12.2f} {vectorized * 1000:>14.2f} "
+              f"{legacy / vectorized:>7.1f}x {reduce_only * 1000:>15.2f}")
+
+
+if __name__ == "__main__":
+    main()
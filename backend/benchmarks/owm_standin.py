@@ -0,0 +1,170 @@
+"""
+Local OpenWeatherMap stand-in for offline load testing
+
+Serves /data/2.5/weather and /data/2.5/forecast in OpenWeatherMap's format
+from the seeded synthetic weather generator (services/synthetic_weather.py),
+so every run with the same --seed sees the same weather for a given place
+and hour. Latency, error rate and a per-minute quota (429 with Retry-After)
+are configurable.
+
+Run from the backend directory:
+    python -m benchmarks.owm_standin [--port 8090] [--latency-ms 80] [--error-rate 0.01]
+                                     [--quota-per-minute 60] [--seed 42]
+
+Then point the backend at it:
+    OPENWEATHER_BASE_URL=http://127.0.0.1:8090/data/2.5
+"""
+import argparse
+import asyncio
+import random
+import time
+import zlib
+from typing import Dict, List, Optional
+
+from fastapi import FastAPI, Query
+from fastapi.responses import JSONResponse
+
+from services.synthetic_weather import SyntheticWeather
+
+SLOT_SECONDS = 10800
+
+
+class StandInConfig:
+    def __init__(self, latency_ms: float = 80.0, jitter_ms: float = 20.0,
+                 error_rate: float = 0.0, quota_per_minute: int = 0,
+                 unknown_cities: Optional[List[str]] = None, seed: Optional[int] = None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.quota_per_minute = quota_per_minute  # 0 = unlimited
+        self.unknown_cities = unknown_cities if unknown_cities is not None else ["atlantis"]
+        self.seed = seed
+
+
+def city_coordinates(query: str) -> Dict[str, float]:
+    """Stable pseudo-coordinates for a city query"""
+    digest = zlib.crc32(query.encode("utf-8"))
+    return {
+        "lat": round((digest % 14000) / 100 - 60, 4),
+        "lon": round(((digest // 14000) % 36000) / 100 - 180, 4),
+    }
+
+
+def create_app(config: Optional[StandInConfig] = None) -> FastAPI:
+    config = config or StandInConfig()
+    rng = random.Random(config.seed)
+    synthetic = SyntheticWeather(seed=config.seed if config.seed is not None else 0)
+    stats = {"requests": 0, "ok": 0, "errors": 0, "rate_limited": 0, "not_found": 0}
+    window = {"start": time.monotonic(), "count": 0}
+
+    app = FastAPI(title="OpenWeatherMap stand-in")
+
+    async def gate() -> Optional[JSONResponse]:
+        """Apply latency, quota and injected errors; return an error response or None"""
+        stats["requests"] += 1
+        delay = config.latency_ms + rng.uniform(-config.jitter_ms, config.jitter_ms)
+        await asyncio.sleep(max(0.0, delay) / 1000)
+
+        if config.quota_per_minute > 0:
+            now = time.monotonic()
+            if now - window["start"] >= 60:
+                window["start"], window["count"] = now, 0
+            window["count"] += 1
+            if window["count"] > config.quota_per_minute:
+                stats["rate_limited"] += 1
+                retry_after = max(1, int(60 - (now - window["start"])) + 1)
+                return JSONResponse(
+                    status_code=429,
+                    content={"cod": 429, "message": "Your account is temporary blocked due to exceeding of requests limitation"},
+                    headers={"Retry-After": str(retry_after)},
+                )
+
+        if rng.random() < config.error_rate:
+            stats["errors"] += 1
+            return JSONResponse(status_code=500, content={"cod": 500, "message": "Internal error"})
+        return None
+
+    def locate(lat: Optional[float], lon: Optional[float], q: Optional[str]):
+        """Resolve the request location; returns (coord, city name) or a 404 response"""
+        if q is not None:
+            name = q.split(",")[0].strip()
+            if name.casefold() in config.unknown_cities or not name:
+                stats["not_found"] += 1
+                return JSONResponse(status_code=404, content={"cod": "404", "message": "city not found"})
+            return city_coordinates(q.casefold()), name.title()
+        if lat is None or lon is None:
+            return JSONResponse(status_code=400, content={"cod": "400", "message": "Nothing to geocode"})
+        return {"lat": lat, "lon": lon}, None
+
+    @app.get("/data/2.5/weather")
+    async def weather(lat: Optional[float] = None, lon: Optional[float] = None,
+                      q: Optional[str] = None, appid: Optional[str] = None,
+                      units: str = "metric"):
+        error = await gate()
+        if error is not None:
+            return error
+        located = locate(lat, lon, q)
+        if isinstance(located, JSONResponse):
+            return located
+        coord, name = located
+
+        data = synthetic.current_payload(coord["lat"], coord["lon"], int(time.time()), name)
+        stats["ok"] += 1
+        return data
+
+    @app.get("/data/2.5/forecast")
+    async def forecast(lat: Optional[float] = None, lon: Optional[float] = None,
+                       q: Optional[str] = None, cnt: int = Query(40, ge=1, le=40),
+                       appid: Optional[str] = None, units: str = "metric"):
+        error = await gate()
+        if error is not None:
+            return error
+        located = locate(lat, lon, q)
+        if isinstance(located, JSONResponse):
+            return located
+        coord, name = located
+
+        # Like OpenWeatherMap, the first slot is the next 3-hour boundary
+        first_slot = (int(time.time()) // SLOT_SECONDS + 1) * SLOT_SECONDS
+        data = synthetic.forecast_payload(coord["lat"], coord["lon"], first_slot, cnt, name)
+        stats["ok"] += 1
+        return data
+
+    @app.get("/stats")
+    async def get_stats():
+        return dict(stats)
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency-ms", type=float, default=80.0)
+    parser.add_argument("--jitter-ms", type=float, default=20.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of 500 responses")
+    parser.add_argument("--quota-per-minute", type=int, default=0,
+                        help="Answer 429 with Retry-After beyond this many calls per minute (0 = unlimited)")
+    parser.add_argument("--unknown-city", action="append", default=None,
+                        help="City name answered with 404 (repeatable; default: atlantis)")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="Seed for the synthetic weather and injected latency/errors")
+    args = parser.parse_args()
+
+    config = StandInConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        quota_per_minute=args.quota_per_minute,
+        unknown_cities=[c.casefold() for c in (args.unknown_city or ["atlantis"])],
+        seed=args.seed,
+    )
+
+    import uvicorn
+
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Concurrency benchmark: ThingSpeak reads from async handlers, old vs new client
+
+Starts a local ThingSpeak stand-in (stdlib threaded HTTP server with a fixed
+latency, in a child process so it does not compete for the GIL) and issues concurrent feed reads the way route handlers do:
+
+    blocking  sync requests.get called directly in the coroutine (the original routes)
+    threads   sync requests.get in asyncio.to_thread (the interim coalesced client)
+    async     pooled httpx.AsyncClient (thingspeak_client.fetch_feeds)
+
+Each request reads a different channel so nothing is coalesced. Reports
+throughput, latency percentiles and the worst event-loop stall seen by a
+10 ms ticker while the requests run. On a single core, httpcore's pool
+bookkeeping grows with the number of busy connections, so async latency
+degrades past a few dozen concurrent reads; compare --concurrency 20 and 50.
+
+Run from the backend directory:
+    python -m benchmarks.thingspeak_load [--requests 200] [--concurrency 50] [--latency-ms 100]
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Awaitable, Callable, Dict, List
+
+import requests
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+
+def get_feeds(base_url: str, results: int, channel_id: str) -> Dict[str, Any]:
+    """The original blocking feeds.json read the routes used before the pooled client"""
+    r = requests.get(f"{base_url}/channels/{channel_id}/feeds.json?results={results}", timeout=10)
+    r.raise_for_status()
+    return r.json()
+
+
+def serve_standin(latency_ms: float, port_queue) -> None:
+    """Serve /channels/<id>/feeds.json on a free local port until terminated"""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like api.thingspeak.com
+        disable_nagle_algorithm = True  # headers and body go out as separate writes
+
+        def do_GET(self):
+            time.sleep(latency_ms / 1000)
+            body = json.dumps({
+                "channel": {"id": self.path.split("/")[2], "last_entry_id": 1},
+                "feeds": [{
+                    "created_at": "2024-01-01T00:00:00Z", "entry_id": 1,
+                    "field1": "40", "field2": "20", "field3": "30", "field4": "55", "field5": "6.8",
+                }],
+            }).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        request_queue_size = 256  # the default backlog of 5 drops concurrent connects
+
+    server = Server(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    port_queue.put(server.server_address[1])
+    server.serve_forever()
+
+
+def start_standin(latency_ms: float):
+    """Start the stand-in in a child process; returns (process, port)"""
+    port_queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=serve_standin, args=(latency_ms, port_queue), daemon=True)
+    process.start()
+    return process, port_queue.get(timeout=10)
+
+
+async def measure(name: str, call: Callable[[int], Awaitable[None]],
+                  requests: int, concurrency: int) -> Dict[str, float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    max_stall = 0.0
+    done = asyncio.Event()
+
+    async def ticker():
+        nonlocal max_stall
+        while not done.is_set():
+            before = time.perf_counter()
+            await asyncio.sleep(0.01)
+            max_stall = max(max_stall, time.perf_counter() - before - 0.01)
+
+    async def one(i: int):
+        async with semaphore:
+            start = time.perf_counter()
+            await call(i)
+            latencies.append(time.perf_counter() - start)
+
+    tick = asyncio.create_task(ticker())
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await tick
+
+    result = {
+        "throughput_rps": requests / elapsed,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "max_loop_stall_ms": max_stall * 1000,
+    }
+    print(f"{name:>9}: {result['throughput_rps']:7.1f} req/s  p50 {result['p50_ms']:7.1f} ms  "
+          f"p95 {result['p95_ms']:7.1f} ms  max loop stall {result['max_loop_stall_ms']:7.1f} ms")
+    return result
+
+
+async def run(args: argparse.Namespace) -> None:
+    standin, port = start_standin(args.latency_ms)
+    # Configure before thingspeak_client reads its environment
+    base_url = f"http://127.0.0.1:{port}"
+    os.environ["THINGSPEAK_BASE_URL"] = base_url
+    os.environ["THINGSPEAK_HTTP_MAX_CONNECTIONS"] = str(args.concurrency)
+    os.environ["THINGSPEAK_HTTP_MAX_KEEPALIVE"] = str(args.concurrency)
+
+    import thingspeak_client
+
+    await thingspeak_client.start()
+    print(f"{args.requests} reads, concurrency {args.concurrency}, upstream latency {args.latency_ms:.0f} ms")
+
+    async def blocking(i: int):
+        get_feeds(base_url, 1, str(i))
+
+    async def threads(i: int):
+        await asyncio.to_thread(get_feeds, base_url, 1, str(i))
+
+    async def pooled(i: int):
+        await thingspeak_client.fetch_feeds(1, channel_id=str(i))
+
+    await measure("blocking", blocking, args.requests, args.concurrency)
+    await measure("threads", threads, args.requests, args.concurrency)
+    await measure("async", pooled, args.requests, args.concurrency)
+
+    await thingspeak_client.aclose()
+    standin.terminate()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=100.0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
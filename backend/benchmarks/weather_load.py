@@ -0,0 +1,99 @@
+"""
+Load test: WeatherService cache, coalescing and quota against the local stand-in
+
+Start the stand-in first, then run from the backend directory:
+    python -m benchmarks.owm_standin --latency-ms 80 --quota-per-minute 600 &
+    python -m benchmarks.weather_load [--requests 2000] [--concurrency 50] [--locations 100]
+
+Requests are spread over `--locations` random points (forecast for a
+`--forecast-share` fraction of them, current weather otherwise). Reports
+latency percentiles, throughput and how many calls reached the stand-in.
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+from typing import List, Tuple
+
+import httpx
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+
+async def run(args: argparse.Namespace) -> None:
+    # Configure before the service module reads its environment
+    os.environ["OPENWEATHER_BASE_URL"] = args.base_url
+    os.environ.setdefault("OPENWEATHER_API_KEY", "standin")
+    os.environ["WEATHER_CACHE_DB"] = ""
+    os.environ["WEATHER_API_RATE_LIMIT"] = str(args.rate_limit)
+
+    from services.weather import WeatherService
+
+    rng = random.Random(args.seed)
+    locations: List[Tuple[float, float]] = [
+        (round(rng.uniform(8, 35), 4), round(rng.uniform(68, 97), 4)) for _ in range(args.locations)
+    ]
+    service = WeatherService()
+    await service.start()
+
+    stand_in_url = args.base_url.split("/data/")[0]
+    async with httpx.AsyncClient() as probe:
+        before = (await probe.get(f"{stand_in_url}/stats")).json()
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies: List[float] = []
+    failures = 0
+
+    async def one(i: int) -> None:
+        nonlocal failures
+        lat, lng = locations[rng.randrange(len(locations))]
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                if rng.random() < args.forecast_share:
+                    await service.get_weather_forecast(lat, lng)
+                else:
+                    await service.get_current_weather(lat, lng)
+            except Exception:
+                failures += 1
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(args.requests)))
+    elapsed = time.perf_counter() - started
+
+    async with httpx.AsyncClient() as probe:
+        after = (await probe.get(f"{stand_in_url}/stats")).json()
+    await service.aclose()
+
+    print(f"requests        {args.requests} ({failures} failed) in {elapsed:.2f}s "
+          f"= {args.requests / elapsed:.0f} req/s")
+    print(f"latency ms      p50 {percentile(latencies, 0.5) * 1000:.1f}  "
+          f"p95 {percentile(latencies, 0.95) * 1000:.1f}  p99 {percentile(latencies, 0.99) * 1000:.1f}")
+    print(f"stand-in calls  {after['requests'] - before['requests']} "
+          f"(429: {after['rate_limited'] - before['rate_limited']}, "
+          f"500: {after['errors'] - before['errors']})")
+    cache = service.cache_stats()
+    print(f"cache           hit ratio {cache['hit_ratio']}  size {cache['size']}")
+    print(f"coalescing      {service.flight_stats()}")
+    print(f"upstream        {service.upstream_stats()}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8090/data/2.5")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--locations", type=int, default=100)
+    parser.add_argument("--forecast-share", type=float, default=0.3)
+    parser.add_argument("--rate-limit", type=float, default=600, help="Client quota, calls/minute")
+    parser.add_argument("--seed", type=int, default=1)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,25 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from contextlib import asynccontextmanager
 from datetime import datetime
+import json
 import os
 from dotenv import load_dotenv, find_dotenv
 from pydantic import BaseModel
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 
 # Load environment variables from nearest .env file (search upward) for robustness
 load_dotenv(find_dotenv())
 
 # Import services
 from services.chatbot import get_chatbot, health_check as chatbot_health_check
-from services.weather import get_weather_service
+from services.weather import get_weather_service, CityNotFoundError
+from services.prefetch import WeatherPrefetcher
+from services.sensor_store import get_sensor_store
+from services.sensor_poller import get_sensor_poller
+from services.device_status import get_device_status_monitor
+import thingspeak_client
 
 
 # Models for requests
@@ -31,25 +38,85 @@ class WeatherCityRequest(BaseModel):
     city: str
 
 
+class WeatherBatchRequest(BaseModel):
+    locations: List[WeatherRequest]
+    stream: bool = False
+
+
 # Global service instances
 chatbot_service = None
 weather_service = None
+weather_prefetcher = None
+sensor_poller = None
+device_status_monitor = None
+
+
+def get_prefetch_locations():
+    """
+    Farm locations to keep warm: the ThingSpeak default, sensor devices and
+    registered farms ("lat,lng" or a place name, which the prefetcher
+    geocodes). Farms come from the users router's in-memory users_db, which
+    is not mounted yet, so until it is only the default and device locations
+    are prefetched.
+    """
+    from api.routes.users import get_farm_locations
+
+    default_location = "{},{}".format(
+        os.getenv("DEFAULT_LATITUDE", "28.6139"), os.getenv("DEFAULT_LONGITUDE", "77.2090")
+    )
+    device_locations = [
+        "{},{}".format(*device.location)
+        for device in thingspeak_client.get_device_registry().all()
+        if device.location is not None
+    ]
+    return [default_location] + device_locations + get_farm_locations()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    global chatbot_service, weather_service
+    global chatbot_service, weather_service, weather_prefetcher, sensor_poller, device_status_monitor
     print("Starting up Agrotech API...")
 
-    # Initialize services
+    # Initialize services; each has its own block so one failing (e.g. no
+    # OpenWeather key in demo mode) does not keep the others from starting
     try:
         chatbot_service = get_chatbot()
-        weather_service = get_weather_service()
         print("✅ Chatbot Service initialized")
+    except Exception as e:
+        print(f"⚠️ Warning: Chatbot initialization error: {e}")
+
+    try:
+        await thingspeak_client.start()
+        print("✅ ThingSpeak client initialized")
+        sensor_store = get_sensor_store()
+        if sensor_store:
+            print(f"✅ Sensor history store at {sensor_store.path}")
+        if os.getenv("THINGSPEAK_POLL_ENABLED", "true").lower() == "true":
+            sensor_poller = get_sensor_poller()
+            sensor_poller.start()
+            print("✅ ThingSpeak poller started")
+    except Exception as e:
+        print(f"⚠️ Warning: ThingSpeak initialization error: {e}")
+
+    try:
+        if os.getenv("THINGSPEAK_STATUS_ENABLED", "true").lower() == "true":
+            device_status_monitor = get_device_status_monitor()
+            device_status_monitor.start()
+            print("✅ Device status monitor started")
+    except Exception as e:
+        print(f"⚠️ Warning: Device status monitor initialization error: {e}")
+
+    try:
+        weather_service = get_weather_service()
+        await weather_service.start()
         print("✅ Weather Service initialized")
+        if os.getenv("WEATHER_PREFETCH_ENABLED", "true").lower() == "true":
+            weather_prefetcher = WeatherPrefetcher(weather_service, get_prefetch_locations)
+            weather_prefetcher.start()
+            print("✅ Weather prefetcher started")
     except Exception as e:
-        print(f"⚠️ Warning: Service initialization error: {e}")
+        print(f"⚠️ Warning: Weather service initialization error: {e}")
 
     print("🚀 Agrotech API is ready!")
 
@@ -57,6 +124,17 @@ async def lifespan(app: FastAPI):
 
     # Shutdown
     print("Shutting down Agrotech API...")
+    if sensor_poller:
+        await sensor_poller.stop()
+    if device_status_monitor:
+        await device_status_monitor.stop()
+    if weather_prefetcher:
+        await weather_prefetcher.stop()
+    if weather_service:
+        await weather_service.aclose()
+    await thingspeak_client.aclose()
+    if get_sensor_store():
+        get_sensor_store().close()
     print("👋 Goodbye!")
 
 
@@ -85,9 +163,11 @@ app.add_middleware(
 )
 
 # Include routers
-from api.routes import thingspeak
+from api.routes import thingspeak, weather
+from thingspeak_client import flight_stats as thingspeak_flight_stats
 
 app.include_router(thingspeak.router, prefix="/api/thingspeak", tags=["ThingSpeak"])
+app.include_router(weather.router, prefix="/api/weather", tags=["Weather"])
 # app.include_router(crops.router, prefix="/api/crops", tags=["Crop Recommendation"])
 
 
@@ -150,6 +230,35 @@ async def get_weather_forecast(lat: float, lng: float, days: int = 5):
         raise HTTPException(status_code=500, detail=f"Weather forecast error: {str(e)}")
 
 
+@app.post("/weather/batch", tags=["Weather"])
+async def get_weather_batch(request: WeatherBatchRequest):
+    """
+    Get current weather for many coordinates in one call.
+    With stream=true, results are sent as NDJSON lines as each location completes.
+    """
+    if not weather_service:
+        raise HTTPException(status_code=503, detail="Weather service not available")
+    if len(request.locations) > weather_service.batch_max_locations:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Maximum {weather_service.batch_max_locations} locations per batch",
+        )
+
+    locations = [(loc.lat, loc.lng) for loc in request.locations]
+
+    if request.stream:
+        async def ndjson_lines():
+            async for result in weather_service.iter_current_weather_batch(locations):
+                yield json.dumps(result) + "\n"
+
+        return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
+    try:
+        return await weather_service.get_current_weather_batch(locations)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Weather batch error: {str(e)}")
+
+
 @app.get("/weather/city/{city}", tags=["Weather"])
 async def get_weather_by_city(city: str):
     """Get current weather by city name"""
@@ -159,6 +268,25 @@ async def get_weather_by_city(city: str):
 
         weather_data = await weather_service.get_weather_by_city(city)
         return weather_data
+    except CityNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Weather error: {str(e)}")
+
+
+@app.get("/weather/agro-metrics", tags=["Weather"])
+async def get_agro_metrics(lat: float, lng: float, crop: Optional[str] = None,
+                           base_temp: Optional[float] = None):
+    """
+    Growing degree days, chill hours and rolling rainfall accumulated for a location.
+    GDD uses base_temp if given, else the crop's base temperature.
+    """
+    if not weather_service:
+        raise HTTPException(status_code=503, detail="Weather service not available")
+    try:
+        return await weather_service.get_agro_metrics(lat, lng, crop, base_temp)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Weather error: {str(e)}")
 
@@ -205,6 +333,16 @@ async def health_check():
             "chatbot_service": "ready" if chatbot_service else "not_initialized",
             "weather_service": "ready" if weather_service else "not_initialized",
         },
+        "weather_cache": weather_service.cache_stats() if weather_service else None,
+        "weather_upstream": weather_service.upstream_stats() if weather_service else None,
+        "weather_prefetch": weather_prefetcher.stats() if weather_prefetcher else None,
+        "sensor_store": get_sensor_store().stats() if get_sensor_store() else None,
+        "sensor_poller": sensor_poller.stats() if sensor_poller else None,
+        "device_status": device_status_monitor.stats() if device_status_monitor else None,
+        "request_coalescing": {
+            "weather": weather_service.flight_stats() if weather_service else None,
+            "thingspeak": thingspeak_flight_stats(),
+        },
         "api_info": {"total_endpoints": len(app.routes), "environment": "development"},
     }
 
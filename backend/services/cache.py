@@ -0,0 +1,80 @@
+"""
+Bounded in-memory TTL cache with stale-while-revalidate support
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+# Lookup states returned by TTLCache.get
+FRESH = "fresh"
+STALE = "stale"
+MISS = "miss"
+
+
+class TTLCache:
+    """
+    LRU cache whose entries are fresh for `ttl` seconds and may then be served
+    for a further `stale_ttl` seconds while the caller refreshes them in the
+    background. Expired entries are kept (until evicted by LRU) so they can be
+    read back as last-known-good data with `peek`.
+    """
+
+    def __init__(self, max_size: int = 5000, ttl: float = 600.0, stale_ttl: float = 300.0):
+        self.max_size = max(1, max_size)
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Tuple[Optional[Any], str]:
+        """Return (value, state) where state is FRESH, STALE or MISS"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None, MISS
+
+        value, stored_at = entry
+        age = time.time() - stored_at
+        if age < self.ttl:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value, FRESH
+        if age < self.ttl + self.stale_ttl:
+            self._entries.move_to_end(key)
+            self.stale_hits += 1
+            return value, STALE
+
+        self.misses += 1
+        return None, MISS
+
+    def peek(self, key: Hashable) -> Optional[Tuple[Any, float]]:
+        """Return (value, stored_at) regardless of age, without touching stats or LRU order"""
+        return self._entries.get(key)
+
+    def set(self, key: Hashable, value: Any, stored_at: Optional[float] = None) -> None:
+        """Insert or replace an entry, evicting the least recently used ones when full"""
+        self._entries[key] = (value, stored_at if stored_at is not None else time.time())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "stale_ttl_seconds": self.stale_ttl,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round((self.hits + self.stale_hits) / lookups, 4) if lookups else None,
+        }
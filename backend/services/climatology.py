@@ -0,0 +1,216 @@
+"""
+Day-of-year climatology from recorded hourly history, and an extended-range
+forecast that blends the 5-day forecast into it.
+
+Hourly samples are reduced to daily statistics and binned by day of year in
+one vectorized pass, then smoothed with a circular moving window so that a
+sparse history (a single season, say) still gives a value for nearby dates.
+Past the end of the real forecast each day is a blend of the last forecast
+days (persistence) and the climatology for that date, with the forecast's
+weight decaying exponentially.
+"""
+import math
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+HOURS_PER_DAY = 24
+DAYS_PER_YEAR = 366
+
+# Daily statistics kept per day of year; _FIELDS are the ones extended forecasts blend
+_FIELDS = ("temperature_max", "temperature_min", "humidity", "rainfall", "wind_speed")
+_DAILY_FIELDS = _FIELDS + ("temperature_mean",)
+
+
+class DailyClimatology:
+    """Smoothed daily normals indexed by day of year (0-365)"""
+
+    def __init__(self, normals: Dict[str, np.ndarray], days_observed: np.ndarray):
+        self.normals = normals
+        self.days_observed = days_observed  # recorded days inside each smoothing window
+
+    @property
+    def total_days(self) -> int:
+        return int(self.days_observed.max()) if self.days_observed.size else 0
+
+    def at(self, day: date) -> Optional[Dict[str, float]]:
+        """Normals for a calendar date, or None if no recorded day is close enough"""
+        index = day.timetuple().tm_yday - 1
+        if self.days_observed[index] == 0:
+            return None
+        return {field: float(values[index]) for field, values in self.normals.items()}
+
+def day_of_year(dates: np.ndarray) -> np.ndarray:
+    """Zero-based day of year for datetime64[D] dates (the climatology row index)"""
+    return (dates - dates.astype("datetime64[Y]")).astype(np.int64)
+
+
+def daily_statistics(hours: np.ndarray, values: np.ndarray, tz_offset: int = 0,
+                     min_hours_per_day: int = 18) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Reduce hourly samples to local calendar days.
+
+    Args:
+        hours: Hours since the epoch (UTC), ascending
+        values: Rows of (temperature °C, humidity %, rain mm, wind m/s)
+        tz_offset: Seconds east of UTC, so days follow the local calendar
+        min_hours_per_day: Days with fewer recorded hours are left out
+
+    Returns:
+        (local days since the epoch, dict of daily columns: temperature_max,
+        temperature_min, temperature_mean, humidity, rainfall, wind_speed in km/h)
+    """
+    if hours.size == 0:
+        return np.empty(0, dtype=np.int64), {field: np.empty(0) for field in _DAILY_FIELDS}
+
+    local_day = (hours * 3600 + tz_offset) // 86400
+    boundary = np.r_[True, local_day[1:] != local_day[:-1]]
+    starts = np.flatnonzero(boundary)
+    counts = np.diff(np.append(starts, hours.size))
+    complete = counts >= min_hours_per_day
+
+    temperature, humidity, rain, wind = (values[:, column] for column in range(4))
+    daily = {
+        "temperature_max": np.maximum.reduceat(temperature, starts),
+        "temperature_min": np.minimum.reduceat(temperature, starts),
+        "temperature_mean": np.add.reduceat(temperature, starts) / counts,
+        "humidity": _nanmean_reduceat(humidity, starts),
+        # Scale to a full day when a few hours are missing
+        "rainfall": np.add.reduceat(rain, starts) * HOURS_PER_DAY / counts,
+        "wind_speed": _nanmean_reduceat(wind, starts) * 3.6,  # km/h
+    }
+    return local_day[starts][complete], {field: column[complete] for field, column in daily.items()}
+
+
+def build_climatology(hours: np.ndarray, values: np.ndarray, tz_offset: int = 0,
+                      window_days: int = 15, min_hours_per_day: int = 18) -> DailyClimatology:
+    """
+    Climatology from hourly samples (see daily_statistics for the arguments).
+
+    Args:
+        window_days: Half-width of the circular smoothing window
+    """
+    days, daily = daily_statistics(hours, values, tz_offset, min_hours_per_day)
+    if days.size == 0:
+        return DailyClimatology(
+            {field: np.full(DAYS_PER_YEAR, np.nan) for field in _DAILY_FIELDS},
+            np.zeros(DAYS_PER_YEAR, dtype=np.int64),
+        )
+
+    day_index = day_of_year(np.datetime64(0, "D") + days)
+
+    # Circular moving sums over day of year: tile three years and convolve
+    kernel = np.ones(2 * window_days + 1)
+
+    def smoothed(per_day: np.ndarray) -> np.ndarray:
+        tiled = np.concatenate([per_day, per_day, per_day])
+        return np.convolve(tiled, kernel, mode="same")[DAYS_PER_YEAR:2 * DAYS_PER_YEAR]
+
+    observed = np.zeros(DAYS_PER_YEAR)
+    np.add.at(observed, day_index, 1)
+    days_observed = np.rint(smoothed(observed)).astype(np.int64)
+
+    normals = {}
+    for field, column in daily.items():
+        valid = ~np.isnan(column)
+        sums = np.zeros(DAYS_PER_YEAR)
+        weights = np.zeros(DAYS_PER_YEAR)
+        np.add.at(sums, day_index[valid], column[valid])
+        np.add.at(weights, day_index[valid], 1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            normals[field] = smoothed(sums) / smoothed(weights)
+    return DailyClimatology(normals, days_observed)
+
+
+def _nanmean_reduceat(column: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    valid = ~np.isnan(column)
+    totals = np.add.reduceat(np.where(valid, column, 0.0), starts)
+    counts = np.add.reduceat(valid.astype(np.int64), starts)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return totals / counts
+
+
+def describe_day(rainfall: float, humidity: float) -> str:
+    """Short description for an estimated day"""
+    if rainfall >= 10:
+        return "Rainy"
+    if rainfall >= 2:
+        return "Light rain"
+    if humidity >= 75:
+        return "Cloudy"
+    if humidity >= 55:
+        return "Partly cloudy"
+    return "Sunny"
+
+
+def extended_forecast(daily_forecast: List[Dict[str, Any]],
+                      climatology: Optional[DailyClimatology], start: date,
+                      days: int, decay_days: float = 3.0) -> List[Dict[str, Any]]:
+    """
+    Daily forecast for `days` days from `start`.
+
+    Days covered by `daily_forecast` (as produced by aggregate_daily) are
+    taken as is. Later days start from the mean of the last two forecast days
+    and move towards the climatology with weight exp(-n / decay_days), n days
+    past the forecast; without climatology for a date the persistence value
+    is used alone, and without any forecast the climatology is. Each day's
+    `source` is "forecast", "blended", "persistence" or "climatology".
+    """
+    by_date = {day["date"]: day for day in daily_forecast}
+    tail = [_forecast_values(day) for day in daily_forecast[-2:]]
+    anchor = None
+    last_forecast = start - timedelta(days=1)
+    if tail:
+        anchor = {field: float(np.mean([values[field] for values in tail])) for field in _FIELDS}
+        last_forecast = date.fromisoformat(daily_forecast[-1]["date"])
+
+    result = []
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        forecast_day = by_date.get(day.isoformat())
+        if forecast_day is not None:
+            values = _forecast_values(forecast_day)
+            weather = forecast_day["description"].capitalize()
+            source = "forecast"
+        else:
+            normals = climatology.at(day) if climatology is not None else None
+            if anchor is None and normals is None:
+                continue
+            if normals is None:
+                values, source = dict(anchor), "persistence"
+            elif anchor is None:
+                values, source = normals, "climatology"
+            else:
+                weight = math.exp(-(day - last_forecast).days / decay_days)
+                values = {field: weight * anchor[field] + (1 - weight) * normals[field]
+                          if not math.isnan(normals[field]) else anchor[field]
+                          for field in _FIELDS}
+                source = "blended"
+            weather = describe_day(values["rainfall"], np.nan_to_num(values["humidity"]))
+
+        result.append({
+            "date": day.isoformat(),
+            "temperature_max": _rounded(values["temperature_max"], 1),
+            "temperature_min": _rounded(values["temperature_min"], 1),
+            "humidity": _rounded(values["humidity"], None),
+            "weather": weather,
+            "rainfall": _rounded(values["rainfall"], 1),
+            "wind_speed": _rounded(values["wind_speed"], 1),
+            "source": source,
+        })
+    return result
+
+
+def _rounded(value: float, digits: Optional[int]) -> Optional[float]:
+    return None if math.isnan(value) else round(value, digits)
+
+
+def _forecast_values(day: Dict[str, Any]) -> Dict[str, float]:
+    return {
+        "temperature_max": day["temperature"]["max"],
+        "temperature_min": day["temperature"]["min"],
+        "humidity": day["humidity"]["avg"],
+        "rainfall": day["precipitation"],
+        "wind_speed": day["wind_speed"],
+    }
@@ -0,0 +1,288 @@
+"""
+Weather-aware crop calendars: growth stages timed by accumulated thermal time.
+
+Each stage is reached when the growing degree days (GDD) accumulated since
+planting reach its threshold. Daily temperatures come from the weather
+history, the extended forecast and climatology (see
+WeatherService.get_daily_temperatures); days with no temperature at all
+accrue the crop's typical daily GDD, so without any weather data the
+calendar falls back to the nominal day offsets.
+
+Calendars for many fields are computed together: temperatures are fetched
+once per grid cell and stage dates for all fields come from one cumulative
+sum over a (fields x days) matrix. Results are memoized per
+(crop, grid cell, planting date).
+"""
+import asyncio
+import hashlib
+import math
+import os
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from services.cache import TTLCache, FRESH
+from services.weather_history import CROP_BASE_TEMPERATURES
+
+# Nominal stage offsets in days (reached at `gdd_per_day` GDD per day) per crop
+CROP_CALENDARS = {
+    "rice": {"gdd_per_day": 15.0, "stages": [("transplanting", 20), ("flowering", 60), ("maturity", 120)]},
+    "wheat": {"gdd_per_day": 13.0, "stages": [("germination", 7), ("tillering", 45), ("flowering", 90), ("maturity", 130)]},
+    "cotton": {"gdd_per_day": 8.0, "stages": [("germination", 10), ("flowering", 60), ("boll_formation", 120), ("harvest", 180)]},
+    "maize": {"gdd_per_day": 14.0, "stages": [("germination", 7), ("tasseling", 60), ("maturity", 110)]},
+    "sugarcane": {"gdd_per_day": 14.0, "stages": [("germination", 30), ("tillering", 90), ("grand_growth", 240), ("maturity", 365)]},
+}
+
+RECOMMENDATIONS = [
+    "Monitor weather conditions regularly",
+    "Maintain proper irrigation schedule",
+    "Apply fertilizers at recommended stages",
+    "Monitor for pests and diseases",
+    "Harvest at optimal maturity",
+]
+
+# Temperatures are looked up this far past the nominal season length
+HORIZON_FACTOR = 1.5
+MAX_HORIZON_DAYS = 550
+
+
+def stage_days(temperatures: np.ndarray, bases: np.ndarray, rates: np.ndarray,
+               thresholds: List[np.ndarray]) -> List[np.ndarray]:
+    """
+    Days from planting at which each field reaches each GDD threshold.
+
+    Args:
+        temperatures: (fields, days) daily mean °C from planting day, NaN if unknown
+        bases: Base temperature per field
+        rates: GDD per day assumed for unknown days, per field
+        thresholds: Ascending GDD thresholds per field
+
+    Thresholds beyond the temperature horizon are extrapolated at `rates`.
+    """
+    gdd = np.clip(temperatures - bases[:, None], 0.0, None)
+    gdd = np.where(np.isnan(temperatures), rates[:, None], gdd)
+    accumulated = np.cumsum(gdd, axis=1)
+    horizon = temperatures.shape[1]
+
+    result = []
+    for row, required in enumerate(thresholds):
+        # Day d (1-based) is the first whose accumulated total reaches the threshold
+        days = np.searchsorted(accumulated[row], required, side="left") + 1
+        beyond = days > horizon
+        if beyond.any():
+            reached = accumulated[row, -1] if horizon else 0.0
+            days[beyond] = horizon + np.ceil((required[beyond] - reached) / rates[row]).astype(np.int64)
+        result.append(days)
+    return result
+
+
+class CropCalendarService:
+    def __init__(self):
+        self.cache = TTLCache(
+            max_size=int(os.getenv("CROP_CALENDAR_CACHE_MAX_ENTRIES", "10000")),
+            ttl=float(os.getenv("CROP_CALENDAR_CACHE_TTL", "3600")),
+            stale_ttl=0,
+        )
+        self.max_fields = int(os.getenv("CROP_CALENDAR_MAX_FIELDS", "500"))
+
+    @staticmethod
+    def _weather_service():
+        """The shared WeatherService, or None in demo mode (no OpenWeatherMap key)"""
+        if os.getenv("OPENWEATHER_API_KEY", "demo_key") == "demo_key":
+            return None
+        from services.weather import get_weather_service
+
+        return get_weather_service()
+
+    async def _resolve(self, weather, field: Dict[str, Any]) -> Optional[Tuple[float, float]]:
+        """Field coordinates, geocoding its location name if needed"""
+        if field.get("latitude") is not None and field.get("longitude") is not None:
+            return field["latitude"], field["longitude"]
+        if weather is None or not field.get("location"):
+            return None
+        try:
+            return await weather.geocode_city(field["location"])
+        except Exception as e:
+            print(f"Crop calendar: could not locate {field['location']!r}: {e}")
+            return None
+
+    async def calendars(self, fields: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Crop calendars for many fields.
+
+        Args:
+            fields: Dicts with crop_name, planting_date (date, default today) and
+                either latitude/longitude or a location name
+
+        Returns:
+            One calendar per field, in order; unknown crops get {"error": ...}
+        """
+        weather = self._weather_service()
+        coordinates = await asyncio.gather(*(self._resolve(weather, field) for field in fields))
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(fields)
+        pending: Dict[Optional[Tuple[int, int]], List[Tuple[int, str, date, Tuple]]] = {}
+        today = datetime.now(timezone.utc).date()
+        for i, (field, point) in enumerate(zip(fields, coordinates)):
+            crop = field["crop_name"].lower()
+            if crop not in CROP_CALENDARS:
+                results[i] = {"error": "Crop not found in database"}
+                continue
+            planting = field.get("planting_date") or today
+            cell = weather.grid_cell(*point) if weather is not None and point is not None else None
+            key = (crop, cell, planting.isoformat(), today.isoformat())
+            cached, state = self.cache.get(key)
+            if state == FRESH:
+                results[i] = {**cached, "crop": field["crop_name"]}
+            else:
+                pending.setdefault(cell, []).append((i, crop, planting, key))
+
+        if pending:
+            temperatures = await asyncio.gather(*(
+                self._cell_temperatures(weather, cell, items, coordinates[items[0][0]])
+                for cell, items in pending.items()
+            ))
+            rows = [row for cell_rows in temperatures for row in cell_rows]
+            items = [item for cell_items in pending.values() for item in cell_items]
+            for (i, crop, planting, key), calendar in zip(items, self._build(items, rows)):
+                self.cache.set(key, calendar)
+                # Cached per normalized crop; echo the name as the caller gave it
+                results[i] = {**calendar, "crop": fields[i]["crop_name"]}
+        return results
+
+    async def _cell_temperatures(self, weather, cell, items, point) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Per-item (temperatures, sources) over its horizon, fetched once for the cell"""
+        horizons = [_horizon(crop) for _, crop, _, _ in items]
+        start = min(planting for _, _, planting, _ in items)
+        end = max(planting + timedelta(days=h) for (_, _, planting, _), h in zip(items, horizons))
+        span = (end - start).days
+
+        temperatures = np.full(span, np.nan)
+        sources = np.full(span, "", dtype=object)
+        if cell is not None:
+            try:
+                temperatures, sources = await weather.get_daily_temperatures(*point, start, span)
+            except Exception as e:
+                print(f"Crop calendar: no temperatures for {cell}, using nominal timing: {e}")
+
+        rows = []
+        for (_, _, planting, _), horizon in zip(items, horizons):
+            offset = (planting - start).days
+            rows.append((temperatures[offset:offset + horizon], sources[offset:offset + horizon]))
+        return rows
+
+    def _build(self, items, rows) -> List[Dict[str, Any]]:
+        """Stage dates for all pending items in one pass"""
+        width = max(len(temperatures) for temperatures, _ in rows)
+        matrix = np.full((len(rows), width), np.nan)
+        for row, (temperatures, _) in enumerate(rows):
+            matrix[row, :len(temperatures)] = temperatures
+        crops = [crop for _, crop, _, _ in items]
+        bases = np.array([CROP_BASE_TEMPERATURES[crop] for crop in crops])
+        rates = np.array([CROP_CALENDARS[crop]["gdd_per_day"] for crop in crops])
+        thresholds = [
+            np.array([days for _, days in CROP_CALENDARS[crop]["stages"]], dtype=np.float64) * rate
+            for crop, rate in zip(crops, rates.tolist())
+        ]
+        reached = stage_days(matrix, bases, rates, thresholds)
+
+        calendars = []
+        for (_, crop, planting, _), (_, sources), required, days in zip(items, rows, thresholds, reached):
+            stages = CROP_CALENDARS[crop]["stages"]
+            days = days.tolist()
+            season = sources[:days[-1]]
+            counts: Dict[str, int] = {}
+            for source in season.tolist():
+                label = source or "nominal"
+                counts[label] = counts.get(label, 0) + 1
+            if len(season) < days[-1]:
+                counts["nominal"] = counts.get("nominal", 0) + days[-1] - len(season)
+            calendars.append({
+                "crop": crop,
+                "planting_date": planting.isoformat(),
+                "total_duration": f"{days[-1]} days",
+                "base_temperature": CROP_BASE_TEMPERATURES[crop],
+                "key_stages": [
+                    {
+                        "stage": name.replace("_", " ").title(),
+                        "date": (planting + timedelta(days=day)).isoformat(),
+                        "days_from_planting": day,
+                        "gdd_required": round(gdd, 1),
+                    }
+                    for (name, _), day, gdd in zip(stages, days, required.tolist())
+                ],
+                "temperature_days": counts,
+                "recommendations": list(RECOMMENDATIONS),
+            })
+        return calendars
+
+    def stats(self) -> Dict[str, Any]:
+        return self.cache.stats()
+
+
+def _horizon(crop: str) -> int:
+    return min(MAX_HORIZON_DAYS, math.ceil(CROP_CALENDARS[crop]["stages"][-1][1] * HORIZON_FACTOR))
+
+
+def _ical_text(value: str) -> str:
+    return (value.replace("\\", "\\\\").replace(";", "\\;")
+            .replace(",", "\\,").replace("\n", "\\n"))
+
+
+def _ical_line(line: str) -> str:
+    """Fold a content line at 75 octets (RFC 5545 3.1) and terminate it with CRLF"""
+    parts, current, size = [], [], 0
+    for char in line:
+        width = len(char.encode("utf-8"))
+        if size + width > 75:
+            parts.append("".join(current))
+            current, size = [" "], 1
+        current.append(char)
+        size += width
+    parts.append("".join(current))
+    return "\r\n".join(parts) + "\r\n"
+
+
+def ical_lines(calendars: List[Dict[str, Any]], labels: List[str]) -> Iterator[str]:
+    """iCalendar (RFC 5545) content lines, one all-day event per stage"""
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    yield _ical_line("BEGIN:VCALENDAR")
+    yield _ical_line("VERSION:2.0")
+    yield _ical_line("PRODID:-//Agrotech//Crop Calendar//EN")
+    yield _ical_line("CALSCALE:GREGORIAN")
+    for calendar, label in zip(calendars, labels):
+        if "error" in calendar:
+            continue
+        crop = calendar["crop"].title()
+        for stage in calendar["key_stages"]:
+            day = date.fromisoformat(stage["date"])
+            uid = hashlib.sha1(
+                "|".join([label, calendar["crop"], calendar["planting_date"], stage["stage"]]).encode("utf-8")
+            ).hexdigest()
+            summary = f"{crop}: {stage['stage']}"
+            description = (
+                f"{label} - day {stage['days_from_planting']} after planting, "
+                f"{stage['gdd_required']} GDD above {calendar['base_temperature']} °C"
+            )
+            yield _ical_line("BEGIN:VEVENT")
+            yield _ical_line(f"UID:{uid}@agrotech")
+            yield _ical_line(f"DTSTAMP:{stamp}")
+            yield _ical_line(f"DTSTART;VALUE=DATE:{day.strftime('%Y%m%d')}")
+            yield _ical_line(f"DTEND;VALUE=DATE:{(day + timedelta(days=1)).strftime('%Y%m%d')}")
+            yield _ical_line(f"SUMMARY:{_ical_text(summary)}")
+            yield _ical_line(f"DESCRIPTION:{_ical_text(description)}")
+            yield _ical_line("END:VEVENT")
+    yield _ical_line("END:VCALENDAR")
+
+
+# Global crop calendar service instance
+_crop_calendar_service: Optional[CropCalendarService] = None
+
+
+def get_crop_calendar_service() -> CropCalendarService:
+    """Get or create global crop calendar service instance"""
+    global _crop_calendar_service
+    if _crop_calendar_service is None:
+        _crop_calendar_service = CropCalendarService()
+    return _crop_calendar_service
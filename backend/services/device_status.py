@@ -0,0 +1,201 @@
+"""
+Fleet-wide sensor device status from ThingSpeak last-entry metadata
+"""
+import asyncio
+import os
+import time
+from typing import Any, Callable, Dict, Optional
+
+import thingspeak_client
+from services.sensor_poller import get_sensor_poller
+from services.sensor_store import format_timestamp, parse_timestamp
+
+# A device is stale once its newest entry is this many update intervals old
+STALE_FACTOR = float(os.getenv("THINGSPEAK_STALE_FACTOR", "3"))
+
+STATUS_MESSAGES = {
+    "active": "Device is actively sending data",
+    "stale": "Device has missed its expected updates",
+    "inactive": "No data from device",
+    "unknown": "Device status could not be checked yet",
+}
+
+
+class DeviceStatusMonitor:
+    """
+    Keeps the last-entry time of every registered device's channel in
+    memory, refreshed in bulk by a background task, so the status of the
+    whole fleet is one lookup with no upstream I/O.
+
+    Each refresh reads feeds/last.json once per distinct channel (one small
+    entry instead of a feed page), at most THINGSPEAK_POLL_CONCURRENCY at a
+    time. Staleness is computed at lookup time against each device's own
+    update interval; a newer entry seen by the sensor poller counts too.
+    """
+
+    def __init__(self, registry_provider: Callable[[], Any] = thingspeak_client.get_device_registry,
+                 interval: Optional[float] = None, concurrency: Optional[int] = None,
+                 stale_factor: float = STALE_FACTOR):
+        self.registry_provider = registry_provider
+        self.interval = interval or float(os.getenv("THINGSPEAK_STATUS_INTERVAL", "60"))
+        self.concurrency = concurrency or int(os.getenv("THINGSPEAK_POLL_CONCURRENCY", "10"))
+        self.stale_factor = stale_factor
+        # channel_id -> {"entry_id", "created_at", "checked_at", "error"}
+        self.last_entries: Dict[str, Dict[str, Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.refreshes = 0
+        self.checks = 0
+        self.failures = 0
+        self.last_refresh: Optional[float] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️ Device status refresh failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def refresh(self) -> None:
+        """Re-read the last entry of every registered channel"""
+        channels = {device.channel_id: device.read_key for device in self.registry_provider().all()}
+        semaphore = asyncio.Semaphore(max(1, self.concurrency))
+
+        async def check(channel_id: str, read_key: str) -> None:
+            async with semaphore:
+                await self.check(channel_id, read_key)
+
+        await asyncio.gather(*(check(channel_id, read_key) for channel_id, read_key in channels.items()))
+        for channel_id in set(self.last_entries) - set(channels):
+            del self.last_entries[channel_id]
+        self.refreshes += 1
+        self.last_refresh = time.time()
+
+    async def check(self, channel_id: str, read_key: Optional[str] = None) -> Dict[str, Any]:
+        """Read one channel's last entry now; on failure the previous entry is kept"""
+        self.checks += 1
+        previous = self.last_entries.get(channel_id)
+        try:
+            entry = await thingspeak_client.fetch_last_entry(channel_id, read_key)
+        except Exception as e:
+            self.failures += 1
+            print(f"ThingSpeak status check failed for channel {channel_id}: {e}")
+            observed = {**(previous or {"entry_id": None, "created_at": None}), "error": str(e)}
+        else:
+            observed = {
+                "entry_id": entry.get("entry_id") if entry else None,
+                "created_at": parse_timestamp(entry["created_at"]) if entry else None,
+                "error": None,
+            }
+        observed["checked_at"] = time.time()
+        self.last_entries[channel_id] = observed
+        return observed
+
+    def _newest(self, channel_id: str) -> Optional[Dict[str, Any]]:
+        """This monitor's last entry of a channel, or the poller's snapshot if that is newer"""
+        observed = self.last_entries.get(channel_id)
+        snapshot = get_sensor_poller().snapshots.get(channel_id)
+        if snapshot and snapshot["created_at"] and (
+            observed is None or (observed["created_at"] or 0) < snapshot["created_at"]
+        ):
+            return {
+                "entry_id": snapshot["entry_id"],
+                "created_at": snapshot["created_at"],
+                "checked_at": snapshot["fetched_at"],
+                "error": None,
+            }
+        return observed
+
+    def status(self, device, now: Optional[float] = None) -> Dict[str, Any]:
+        """One device's status from memory"""
+        now = now or time.time()
+        observed = self._newest(device.channel_id)
+        created_at = observed["created_at"] if observed else None
+        age = now - created_at if created_at else None
+        if observed is None or (age is None and observed["error"]):
+            status = "unknown"
+        elif age is None:
+            status = "inactive"
+        elif age <= device.update_interval * self.stale_factor:
+            status = "active"
+        else:
+            status = "stale"
+        return {
+            "device_id": device.device_id,
+            "device_name": device.name,
+            "channel_id": device.channel_id,
+            "connected": status == "active",
+            "status": status,
+            "message": STATUS_MESSAGES[status],
+            "last_update": format_timestamp(created_at) if created_at else None,
+            "last_entry_id": observed["entry_id"] if observed else None,
+            "data_age_seconds": round(age, 1) if age is not None else None,
+            "expected_interval_seconds": device.update_interval,
+            "checked_at": format_timestamp(observed["checked_at"]) if observed else None,
+            "error": observed["error"] if observed else None,
+        }
+
+    async def current(self, device) -> Dict[str, Any]:
+        """
+        One device's status; its channel is checked on demand if it has not
+        been seen yet, or its entry is out of date while the monitor is not running.
+        """
+        observed = self.last_entries.get(device.channel_id)
+        if observed is None or (not self.running and time.time() - observed["checked_at"] >= self.interval):
+            await self.check(device.channel_id, device.read_key)
+        return self.status(device)
+
+    def fleet(self) -> Dict[str, Any]:
+        """Every registered device's status, with counts per status"""
+        now = time.time()
+        devices = [self.status(device, now) for device in self.registry_provider().all()]
+        counts = {status: 0 for status in STATUS_MESSAGES}
+        for device in devices:
+            counts[device["status"]] += 1
+        return {
+            "devices": devices,
+            "count": len(devices),
+            "summary": counts,
+            "refreshed_at": format_timestamp(self.last_refresh) if self.last_refresh else None,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "interval": self.interval,
+            "channels": len(self.last_entries),
+            "refreshes": self.refreshes,
+            "checks": self.checks,
+            "failures": self.failures,
+        }
+
+
+# Global device status monitor instance
+_device_status_monitor: Optional[DeviceStatusMonitor] = None
+
+
+def get_device_status_monitor() -> DeviceStatusMonitor:
+    """Get or create global device status monitor instance"""
+    global _device_status_monitor
+    if _device_status_monitor is None:
+        _device_status_monitor = DeviceStatusMonitor()
+    return _device_status_monitor
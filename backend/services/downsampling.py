@@ -0,0 +1,88 @@
+"""
+Downsampling of long sensor series for charts.
+
+Both methods pick a subset of the original samples (nothing is averaged
+away, so spikes survive) and return their indices in ascending order:
+
+    lttb    Largest-Triangle-Three-Buckets: keeps the points that best
+            preserve the visual shape of the line
+    minmax  the minimum and maximum of each bucket: keeps the full range
+            of values, good for noisy signals
+
+Missing values (NaN) are skipped. Buckets hold equal numbers of samples.
+"""
+from typing import Dict
+
+import numpy as np
+
+METHODS = ("lttb", "minmax")
+
+
+def lttb(x: np.ndarray, y: np.ndarray, points: int) -> np.ndarray:
+    """Indices of `points` samples chosen by Largest-Triangle-Three-Buckets"""
+    valid = np.flatnonzero(~np.isnan(y))
+    n = valid.size
+    if points >= n:
+        return valid
+    if points < 3:
+        return valid[[0, n - 1][:points]]
+    xs, ys = x[valid], y[valid]
+
+    # First and last points are kept; the rest is split into points - 2 buckets
+    edges = np.linspace(1, n - 1, points - 1).astype(np.int64)
+    starts, ends = edges[:-1], edges[1:]
+    # Averages of each bucket, used as the third triangle corner for the bucket before it
+    sums_x = np.add.reduceat(xs[:n - 1], starts)
+    sums_y = np.add.reduceat(ys[:n - 1], starts)
+    counts = ends - starts
+    mean_x = np.append(sums_x / counts, xs[-1])
+    mean_y = np.append(sums_y / counts, ys[-1])
+
+    selected = np.empty(points, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for bucket, (start, end) in enumerate(zip(starts.tolist(), ends.tolist())):
+        cx, cy = mean_x[bucket + 1], mean_y[bucket + 1]
+        ax, ay = xs[a], ys[a]
+        area = np.abs((ax - cx) * (ys[start:end] - ay) - (ax - xs[start:end]) * (cy - ay))
+        a = start + int(np.argmax(area))
+        selected[bucket + 1] = a
+    return valid[selected]
+
+
+def minmax(x: np.ndarray, y: np.ndarray, points: int) -> np.ndarray:
+    """Indices of the minimum and maximum of points // 2 buckets (at most `points` samples)"""
+    valid = np.flatnonzero(~np.isnan(y))
+    n = valid.size
+    if points >= n:
+        return valid
+    ys = y[valid]
+    size = -(-n // max(1, points // 2))  # samples per bucket, rounded up
+    buckets = -(-n // size)
+    # Pad the last bucket with NaN and reduce all buckets at once
+    grid = np.full(buckets * size, np.nan)
+    grid[:n] = ys
+    grid = grid.reshape(buckets, size)
+    offsets = np.arange(buckets) * size
+    picked = np.concatenate([offsets + np.nanargmin(grid, axis=1), offsets + np.nanargmax(grid, axis=1)])
+    return valid[np.unique(picked)]
+
+
+def downsample(x: np.ndarray, columns: Dict[str, np.ndarray], points: int,
+               method: str = "lttb") -> np.ndarray:
+    """
+    Row indices to keep, at most `points`: the budget is split evenly
+    across the columns and the union of each column's picks is kept, so
+    every column retains its own peaks and shape.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown downsampling method {method!r}; use one of {', '.join(METHODS)}")
+    pick = lttb if method == "lttb" else minmax
+    if not columns:
+        return np.arange(x.size)
+    share = max(3, points // len(columns))
+    rows = np.unique(np.concatenate([pick(x, y, share) for y in columns.values()]))
+    if rows.size > points:
+        # Budgets under 3 per column still pick 3 each; thin the union evenly, keeping both ends
+        rows = rows[np.unique(np.linspace(0, rows.size - 1, max(points, 1)).round().astype(np.int64))]
+    return rows
@@ -0,0 +1,189 @@
+"""
+Vectorized daily aggregation of OpenWeatherMap 3-hour forecast payloads.
+
+All slots of all payloads are flattened into NumPy arrays once, grouped by
+(location, local calendar day) and reduced with ufunc.reduceat, so many
+locations are aggregated in a single pass instead of one Python loop per day.
+A single payload (40 slots) is cheaper to aggregate in plain Python than to
+convert, so aggregate_daily takes a loop path for that case; both paths
+return identical summaries.
+"""
+from typing import Any, Dict, List
+
+import numpy as np
+
+SECONDS_PER_DAY = 86400
+
+
+def forecast_to_arrays(payloads: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """
+    Flatten forecast payloads into column arrays.
+
+    Returns a dict with `location` (payload index), `local_day` (days since the
+    epoch in the city's timezone), `temp`, `humidity`, `wind` (m/s),
+    `precipitation` (rain + snow mm per slot), `condition` (integer codes into
+    `condition_names`, numbered in order of first appearance) and `description`.
+    """
+    slot_lists = [payload.get("list", []) for payload in payloads]
+    counts = np.fromiter((len(slots) for slots in slot_lists), dtype=np.int64, count=len(payloads))
+    tz_offsets = np.fromiter(
+        (payload.get("city", {}).get("timezone", 0) for payload in payloads),
+        dtype=np.int64, count=len(payloads),
+    )
+    items = [item for slots in slot_lists for item in slots]
+    # One pass over the slots for the numeric fields, converted in a single call
+    numeric = np.array(
+        [(item["dt"], item["main"]["temp"], item["main"]["humidity"], item["wind"]["speed"])
+         for item in items],
+        dtype=np.float64,
+    ).reshape(len(items), 4)
+    weathers = [item["weather"][0] for item in items]
+
+    condition_index: Dict[str, int] = {}
+    condition = [condition_index.setdefault(w["main"], len(condition_index)) for w in weathers]
+
+    local_ts = numeric[:, 0].astype(np.int64) + np.repeat(tz_offsets, counts)
+    humidity = numeric[:, 2]
+    if np.array_equal(humidity, np.floor(humidity)):
+        # OpenWeatherMap reports humidity as whole percent; keep it integral
+        humidity = humidity.astype(np.int64)
+    return {
+        "location": np.repeat(np.arange(len(payloads), dtype=np.int64), counts),
+        "local_day": local_ts // SECONDS_PER_DAY,
+        "temp": numeric[:, 1],
+        "humidity": humidity,
+        "wind": numeric[:, 3],
+        "precipitation": _precipitation(items),
+        "condition": np.asarray(condition, dtype=np.int64),
+        "condition_names": np.asarray(list(condition_index), dtype=object),
+        "description": np.asarray([w["description"] for w in weathers], dtype=object),
+    }
+
+
+def _precipitation(items: List[Dict[str, Any]]) -> np.ndarray:
+    """Rain + snow per slot; most slots have neither, so only those with data are visited"""
+    precipitation = np.zeros(len(items), dtype=np.float64)
+    wet = [i for i, item in enumerate(items) if "rain" in item or "snow" in item]
+    if wet:
+        precipitation[wet] = [
+            (items[i].get("rain") or {}).get("3h", 0) + (items[i].get("snow") or {}).get("3h", 0)
+            for i in wet
+        ]
+    return precipitation
+
+
+def aggregate_daily(payloads: List[Dict[str, Any]], days: int) -> List[List[Dict[str, Any]]]:
+    """
+    Aggregate forecast payloads into daily summaries, one list per payload.
+
+    Slots are grouped by local calendar day (in forecast order, as returned by
+    OpenWeatherMap) and the first `days` days of each location are kept. Each
+    summary has temperature and humidity min/max/avg, the dominant condition
+    (ties go to the condition seen first that day), the first slot's
+    description, total precipitation and the average wind speed in km/h.
+    """
+    if len(payloads) == 1:
+        return [_aggregate_single(payloads[0], days)]
+    return aggregate_daily_arrays(forecast_to_arrays(payloads), len(payloads), days)
+
+
+def _aggregate_single(payload: Dict[str, Any], days: int) -> List[Dict[str, Any]]:
+    """aggregate_daily for one payload, as a plain loop over its slots"""
+    tz_offset = payload.get("city", {}).get("timezone", 0)
+    groups: Dict[int, List[Dict[str, Any]]] = {}
+    for item in payload.get("list", []):
+        groups.setdefault((int(item["dt"]) + tz_offset) // SECONDS_PER_DAY, []).append(item)
+
+    results = []
+    for local_day in sorted(groups)[:max(days, 0)]:
+        slots = groups[local_day]
+        temps = [item["main"]["temp"] for item in slots]
+        humidity = [item["main"]["humidity"] for item in slots]
+        tally: Dict[str, int] = {}
+        for item in slots:
+            condition = item["weather"][0]["main"]
+            tally[condition] = tally.get(condition, 0) + 1
+        # max keeps the first maximum, i.e. the condition seen first that day
+        dominant = max(tally, key=tally.get)
+        precipitation = 0.0
+        for item in slots:
+            if "rain" in item or "snow" in item:
+                precipitation += (item.get("rain") or {}).get("3h", 0) + (item.get("snow") or {}).get("3h", 0)
+        wind = sum(item["wind"]["speed"] for item in slots) / len(slots)
+        results.append({
+            "date": str(np.datetime64(local_day, "D")),
+            "temperature": {"min": min(temps), "max": max(temps), "avg": sum(temps) / len(temps)},
+            "humidity": {"min": min(humidity), "max": max(humidity),
+                         "avg": sum(humidity) / len(humidity)},
+            "condition": dominant,
+            "description": slots[0]["weather"][0]["description"],
+            "precipitation": precipitation,
+            "wind_speed": round(wind * 3.6, 1),  # km/h
+        })
+    return results
+
+
+def aggregate_daily_arrays(cols: Dict[str, np.ndarray], locations: int,
+                           days: int) -> List[List[Dict[str, Any]]]:
+    """aggregate_daily over columns already built by forecast_to_arrays"""
+    results: List[List[Dict[str, Any]]] = [[] for _ in range(locations)]
+    location, local_day = cols["location"], cols["local_day"]
+    if location.size == 0 or days <= 0:
+        return results
+
+    # Slots normally arrive sorted; only sort (stably) when they do not
+    day_offset = local_day - local_day.min()
+    sort_key = location * (int(day_offset.max()) + 1) + day_offset
+    if np.any(sort_key[1:] < sort_key[:-1]):
+        order = np.argsort(sort_key, kind="stable")
+        cols = {name: (col[order] if name != "condition_names" else col)
+                for name, col in cols.items()}
+        location, local_day = cols["location"], cols["local_day"]
+
+    boundary = np.empty(location.size, dtype=bool)
+    boundary[0] = True
+    boundary[1:] = (location[1:] != location[:-1]) | (local_day[1:] != local_day[:-1])
+    starts = np.flatnonzero(boundary)
+    group_of_slot = np.cumsum(boundary) - 1
+    counts = np.diff(np.append(starts, location.size))
+
+    group_location = location[starts]
+    # Rank of each day within its location, to keep only the first `days`
+    first_group = np.flatnonzero(np.r_[True, group_location[1:] != group_location[:-1]])
+    location_start = np.repeat(first_group, np.diff(np.append(first_group, starts.size)))
+    keep = np.flatnonzero((np.arange(starts.size) - location_start) < days)
+
+    temp, humidity = cols["temp"], cols["humidity"]
+    temp_min = np.minimum.reduceat(temp, starts)[keep].tolist()
+    temp_max = np.maximum.reduceat(temp, starts)[keep].tolist()
+    temp_avg = (np.add.reduceat(temp, starts) / counts)[keep].tolist()
+    humidity_min = np.minimum.reduceat(humidity, starts)[keep].tolist()
+    humidity_max = np.maximum.reduceat(humidity, starts)[keep].tolist()
+    humidity_avg = (np.add.reduceat(humidity, starts) / counts)[keep].tolist()
+    precipitation = np.add.reduceat(cols["precipitation"], starts)[keep].tolist()
+    wind_kmh = np.round(np.add.reduceat(cols["wind"], starts) / counts * 3.6, 1)[keep].tolist()
+
+    # Dominant condition: count (group, condition) pairs and take the argmax;
+    # ties go to the condition whose first slot in that day comes earliest
+    shape = (starts.size, cols["condition_names"].size)
+    tally = np.zeros(shape, dtype=np.int64)
+    np.add.at(tally, (group_of_slot, cols["condition"]), 1)
+    first_seen = np.full(shape, location.size, dtype=np.int64)
+    np.minimum.at(first_seen, (group_of_slot, cols["condition"]), np.arange(location.size))
+    score = tally * (location.size + 1) - first_seen
+    dominant = cols["condition_names"][score.argmax(axis=1)[keep]].tolist()
+
+    description = cols["description"][starts[keep]].tolist()
+    dates = (np.datetime64(0, "D") + local_day[starts[keep]]).astype(str).tolist()
+
+    for i, g in enumerate(group_location[keep].tolist()):
+        results[g].append({
+            "date": dates[i],
+            "temperature": {"min": temp_min[i], "max": temp_max[i], "avg": temp_avg[i]},
+            "humidity": {"min": humidity_min[i], "max": humidity_max[i], "avg": humidity_avg[i]},
+            "condition": dominant[i],
+            "description": description[i],
+            "precipitation": precipitation[i],
+            "wind_speed": wind_kmh[i],  # km/h
+        })
+    return results
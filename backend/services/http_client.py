@@ -0,0 +1,70 @@
+"""
+Shared pooled HTTP clients for upstream APIs (OpenWeatherMap, ThingSpeak)
+"""
+import os
+from typing import Optional
+
+import httpx
+
+# HTTP/2 needs the optional `h2` package; fall back to HTTP/1.1 keep-alive without it
+try:
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def create_async_client(
+    env_prefix: str,
+    timeout: float = 10.0,
+    max_connections: int = 100,
+    max_keepalive_connections: int = 20,
+    keepalive_expiry: float = 30.0,
+    base_url: Optional[str] = None,
+) -> httpx.AsyncClient:
+    """
+    Build a long-lived, keep-alive AsyncClient whose pool limits and timeouts
+    can be overridden from the environment, e.g. for env_prefix="WEATHER_HTTP":
+
+        WEATHER_HTTP_TIMEOUT, WEATHER_HTTP_CONNECT_TIMEOUT,
+        WEATHER_HTTP_MAX_CONNECTIONS, WEATHER_HTTP_MAX_KEEPALIVE,
+        WEATHER_HTTP_KEEPALIVE_EXPIRY, WEATHER_HTTP_HTTP2
+    """
+    total_timeout = _env_float(f"{env_prefix}_TIMEOUT", timeout)
+    connect_timeout = _env_float(f"{env_prefix}_CONNECT_TIMEOUT", min(5.0, total_timeout))
+    limits = httpx.Limits(
+        max_connections=_env_int(f"{env_prefix}_MAX_CONNECTIONS", max_connections),
+        max_keepalive_connections=_env_int(
+            f"{env_prefix}_MAX_KEEPALIVE", max_keepalive_connections
+        ),
+        keepalive_expiry=_env_float(f"{env_prefix}_KEEPALIVE_EXPIRY", keepalive_expiry),
+    )
+    http2 = os.getenv(f"{env_prefix}_HTTP2", "false").lower() == "true"
+    if http2 and not HTTP2_AVAILABLE:
+        print(f"⚠️ {env_prefix}_HTTP2 requested but 'h2' is not installed; using HTTP/1.1")
+        http2 = False
+
+    kwargs = {}
+    if base_url:
+        kwargs["base_url"] = base_url
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(total_timeout, connect=connect_timeout),
+        limits=limits,
+        http2=http2,
+        **kwargs,
+    )
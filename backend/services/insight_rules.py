@@ -0,0 +1,543 @@
+"""
+Declarative, batch-evaluated rules for agricultural insights and advisories.
+
+Each rule table is a list of dicts evaluated in order, like the if/elif chains
+it replaces:
+
+    {
+        "group": "temperature",               # optional: first match wins in a group (elif)
+        "when": [("temperature", ">", 35)],   # predicates, all must hold ([] = always / else)
+        "set": {"irrigation_recommendation": "high"},   # later rules overwrite earlier ones
+        "append": {"alerts": "Heat stress risk - ensure adequate irrigation"},
+    }
+
+Predicates are (field, op, value) with op one of <, <=, >, >=, ==, !=,
+contains, not_contains; ("any", [predicates]) for an OR; and
+(list_name, "is_empty") / (list_name, "not_empty") to test what earlier rules
+appended. Messages may be format templates using input fields, e.g.
+"Currently: {N:.1f} kg/ha".
+
+A RuleSet compiles every predicate to a NumPy mask, so thousands of records
+(forecast days, sensor readings, locations) are evaluated with one array
+operation per rule instead of one Python branch per record.
+"""
+import string
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+_COMPARATORS = {
+    "<": np.less,
+    "<=": np.less_equal,
+    ">": np.greater,
+    ">=": np.greater_equal,
+    "==": np.equal,
+    "!=": np.not_equal,
+}
+
+
+class _Columns:
+    """Input columns with cached numeric/text conversions for one evaluation"""
+
+    def __init__(self, columns: Dict[str, Sequence[Any]], size: int):
+        self.columns = columns
+        self.size = size
+        self.counts: Dict[str, np.ndarray] = {}
+        self._numeric: Dict[str, np.ndarray] = {}
+        self._text: Dict[str, Tuple[List[str], np.ndarray]] = {}
+
+    def numeric(self, field: str) -> np.ndarray:
+        if field not in self._numeric:
+            values = self.columns[field]
+            if isinstance(values, np.ndarray) and values.dtype.kind in "fiub":
+                array = values.astype(np.float64, copy=False)
+            else:
+                array = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+            self._numeric[field] = array
+        return self._numeric[field]
+
+    def text(self, field: str) -> Tuple[List[str], np.ndarray]:
+        """(unique values, inverse index): text tests run once per distinct value"""
+        if field not in self._text:
+            codes: Dict[str, int] = {}
+            inverse = [codes.setdefault("" if v is None else str(v), len(codes))
+                       for v in self.columns[field]]
+            self._text[field] = (list(codes), np.asarray(inverse, dtype=np.int64))
+        return self._text[field]
+
+    def text_test(self, field: str, test: Callable[[str], bool]) -> np.ndarray:
+        uniques, inverse = self.text(field)
+        return np.array([test(u) for u in uniques], dtype=bool)[inverse]
+
+
+def _compile_predicate(predicate) -> Callable[[_Columns], np.ndarray]:
+    if predicate[0] == "any":
+        parts = [_compile_predicate(p) for p in predicate[1]]
+
+        def any_of(cols: _Columns) -> np.ndarray:
+            mask = np.zeros(cols.size, dtype=bool)
+            for part in parts:
+                mask |= part(cols)
+            return mask
+        return any_of
+
+    field, op = predicate[0], predicate[1]
+    if op == "is_empty":
+        return lambda cols: cols.counts[field] == 0
+    if op == "not_empty":
+        return lambda cols: cols.counts[field] > 0
+
+    value = predicate[2]
+    if op == "contains":
+        return lambda cols: cols.text_test(field, lambda text: value in text)
+    if op == "not_contains":
+        return lambda cols: cols.text_test(field, lambda text: value not in text)
+    if op in ("==", "!=") and isinstance(value, str):
+        equal = op == "=="
+        return lambda cols: cols.text_test(field, lambda text: (text == value) == equal)
+    if op in _COMPARATORS:
+        compare = _COMPARATORS[op]
+        return lambda cols: compare(cols.numeric(field), value)
+    raise ValueError(f"Unknown rule operator: {op}")
+
+
+def _template_fields(template: str) -> List[str]:
+    return [name for _, name, _, _ in string.Formatter().parse(template) if name]
+
+
+class RuleSet:
+    def __init__(self, rules: Iterable[Dict[str, Any]], defaults: Optional[Dict[str, Any]] = None,
+                 lists: Iterable[str] = ()):
+        """
+        Args:
+            rules: Rule dicts, in evaluation order
+            defaults: Scalar outputs and their values when no rule sets them
+            lists: Names of list outputs that rules append messages to
+        """
+        self.defaults = dict(defaults or {})
+        self.lists = list(lists)
+        self.rules = []
+        for rule in rules:
+            self.rules.append({
+                "group": rule.get("group"),
+                "when": [_compile_predicate(p) for p in rule.get("when", [])],
+                "set": dict(rule.get("set", {})),
+                "append": [
+                    (name, template, _template_fields(template))
+                    for name, template in rule.get("append", {}).items()
+                ],
+            })
+
+    def evaluate_columns(self, columns: Dict[str, Sequence[Any]]
+                         ) -> Tuple[Dict[str, List[Any]], Dict[str, List[List[str]]]]:
+        """
+        Evaluate all records given as equal-length input columns.
+
+        Returns:
+            (scalar outputs as {name: values}, list outputs as {name: per-record lists})
+        """
+        size = len(next(iter(columns.values()))) if columns else 0
+        cols = _Columns(columns, size)
+        cols.counts = {name: np.zeros(size, dtype=np.int64) for name in self.lists}
+        outputs = {name: np.full(size, default, dtype=object)
+                   for name, default in self.defaults.items()}
+        fired = np.zeros((len(self.rules), size), dtype=bool)
+        claimed: Dict[str, np.ndarray] = {}
+
+        for index, rule in enumerate(self.rules):
+            mask = np.ones(size, dtype=bool)
+            for predicate in rule["when"]:
+                mask &= predicate(cols)
+            if rule["group"] is not None:
+                taken = claimed.setdefault(rule["group"], np.zeros(size, dtype=bool))
+                mask &= ~taken
+                taken |= mask
+            fired[index] = mask
+            if not mask.any():
+                continue
+            for name, value in rule["set"].items():
+                outputs[name][mask] = value
+            for name, _, _ in rule["append"]:
+                cols.counts[name][mask] += 1
+
+        messages = self._messages(cols, fired)
+        return {name: values.tolist() for name, values in outputs.items()}, messages
+
+    def _messages(self, cols: _Columns, fired: np.ndarray) -> Dict[str, List[List[str]]]:
+        """
+        Build the list outputs. Records that fired the same rules share their
+        messages, so lists are assembled once per distinct rule signature and
+        only templated messages are formatted per record.
+        """
+        size = fired.shape[1]
+        if size == 0 or not self.rules:
+            return {name: [[] for _ in range(size)] for name in self.lists}
+
+        if len(self.rules) <= 64:
+            weights = np.left_shift(np.uint64(1), np.arange(len(self.rules), dtype=np.uint64))
+            signatures = weights @ fired.astype(np.uint64)
+        else:
+            packed = np.ascontiguousarray(np.packbits(fired, axis=0).T)
+            signatures = packed.view(np.dtype((np.void, packed.shape[1]))).ravel()
+        _, first, inverse = np.unique(signatures, return_index=True, return_inverse=True)
+        inverse = inverse.ravel()
+        order = np.argsort(inverse, kind="stable")
+        members_of = np.split(order, np.cumsum(np.bincount(inverse))[:-1])
+
+        messages: Dict[str, List[Any]] = {name: [None] * size for name in self.lists}
+        values: Dict[str, List[float]] = {}
+        for representative, members in zip(first.tolist(), members_of):
+            appends = [append for index in np.flatnonzero(fired[:, representative]).tolist()
+                       for append in self.rules[index]["append"]]
+            members = members.tolist()
+            if not any(fields for _, _, fields in appends):
+                shared: Dict[str, List[str]] = {name: [] for name in self.lists}
+                for name, template, _ in appends:
+                    shared[name].append(template)
+                for name, texts in shared.items():
+                    target = messages[name]
+                    for i in members:
+                        target[i] = texts.copy()
+                continue
+
+            for _, _, fields in appends:
+                for field in fields:
+                    if field not in values:
+                        values[field] = cols.numeric(field).tolist()
+            for i in members:
+                record: Dict[str, List[str]] = {name: [] for name in self.lists}
+                for name, template, fields in appends:
+                    record[name].append(template.format(
+                        **{field: values[field][i] for field in fields}
+                    ) if fields else template)
+                for name, texts in record.items():
+                    messages[name][i] = texts
+        return messages
+
+    def evaluate(self, columns: Dict[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+        """Evaluate all records and return one output dict per record"""
+        outputs, messages = self.evaluate_columns(columns)
+        names = list(outputs) + list(messages)
+        rows = zip(*outputs.values(), *messages.values())
+        return [dict(zip(names, row)) for row in rows]
+
+    def evaluate_one(self, **values: Any) -> Dict[str, Any]:
+        """Evaluate a single record given as keyword arguments"""
+        return self.evaluate({name: [value] for name, value in values.items()})[0]
+
+
+# Weather insights (WeatherService._get_agricultural_insights).
+# Inputs: temperature, humidity, wind_speed, weather_condition (lowercase), precipitation
+WEATHER_INSIGHT_RULES = RuleSet(
+    defaults={
+        "irrigation_recommendation": "normal",
+        "field_work_suitability": "suitable",
+        "disease_risk": "low",
+    },
+    lists=["recommendations", "alerts"],
+    rules=[
+        # Temperature-based recommendations
+        {"group": "temperature", "when": [("temperature", "<", 5)],
+         "set": {"field_work_suitability": "poor"},
+         "append": {"alerts": "Frost risk - protect sensitive crops"}},
+        {"group": "temperature", "when": [("temperature", ">", 35)],
+         "set": {"irrigation_recommendation": "high"},
+         "append": {"alerts": "Heat stress risk - ensure adequate irrigation"}},
+        {"group": "temperature", "when": [("temperature", ">", 30)],
+         "set": {"irrigation_recommendation": "increased"}},
+        # Humidity-based recommendations
+        {"group": "humidity", "when": [("humidity", ">", 80)],
+         "set": {"disease_risk": "high"},
+         "append": {"recommendations": "High humidity increases fungal disease risk"}},
+        {"group": "humidity", "when": [("humidity", "<", 30)],
+         "set": {"irrigation_recommendation": "increased"},
+         "append": {"recommendations": "Low humidity may require additional watering"}},
+        # Wind-based recommendations
+        {"group": "wind", "when": [("wind_speed", ">", 10)],
+         "set": {"field_work_suitability": "poor"},
+         "append": {"recommendations": "Strong winds - avoid spraying operations"}},
+        {"group": "wind", "when": [("wind_speed", ">", 5)],
+         "append": {"recommendations": "Moderate winds - good for drying conditions"}},
+        # Weather condition based recommendations
+        {"group": "condition", "when": [("weather_condition", "contains", "rain")],
+         "set": {"irrigation_recommendation": "reduced", "field_work_suitability": "poor"}},
+        {"group": "condition", "when": [("weather_condition", "contains", "snow")],
+         "set": {"field_work_suitability": "unsuitable"},
+         "append": {"alerts": "Snow conditions - protect crops if needed"}},
+        {"group": "condition", "when": [("any", [("weather_condition", "contains", "clear"),
+                                                 ("weather_condition", "contains", "sun")])],
+         "append": {"recommendations": "Clear weather - good for field operations"}},
+        {"when": [("weather_condition", "contains", "rain"), ("precipitation", ">", 10)],
+         "append": {"alerts": "Heavy rainfall - check for waterlogging"}},
+        # Combined conditions
+        {"when": [("temperature", ">", 25), ("humidity", ">", 70)],
+         "set": {"disease_risk": "high"},
+         "append": {"recommendations": "Hot and humid - monitor for pest and disease activity"}},
+        {"when": [("temperature", "<", 10), ("humidity", ">", 80)],
+         "set": {"disease_risk": "medium"},
+         "append": {"recommendations": "Cool and humid - watch for fungal diseases"}},
+    ],
+)
+
+# Crop-specific advisory messages (api/routes/weather.py)
+CROP_ADVISORIES = {
+    "rice": {
+        "temperature": {
+            "high": "High temperature may affect grain filling - ensure adequate water supply",
+            "low": "Cool weather may slow growth - monitor for diseases"
+        },
+        "rainfall": {
+            "high": "Excess water may cause lodging - improve drainage",
+            "low": "Maintain standing water in fields"
+        }
+    },
+    "wheat": {
+        "temperature": {
+            "high": "Heat stress during grain filling - irrigate frequently",
+            "low": "Favorable for wheat growth - monitor for rust diseases"
+        },
+        "rainfall": {
+            "high": "Excess moisture may cause fungal diseases",
+            "low": "Supplemental irrigation may be needed"
+        }
+    },
+    "cotton": {
+        "temperature": {
+            "high": "Optimal temperature for cotton growth",
+            "low": "Cool weather may delay flowering"
+        },
+        "rainfall": {
+            "high": "Excess moisture may affect fiber quality",
+            "low": "Cotton is drought tolerant but monitor soil moisture"
+        }
+    }
+}
+
+# General advisory (api/routes/weather.py::generate_agricultural_advisory).
+# Inputs: temperature, humidity, rainfall, wind_speed, uv_index
+_GENERAL_ADVISORY_RULES = [
+    # Temperature advisories
+    {"group": "temperature", "when": [("temperature", ">", 35)],
+     "append": {"advisory": "High temperature alert: Increase irrigation frequency and provide shade for sensitive crops"}},
+    {"group": "temperature", "when": [("temperature", "<", 15)],
+     "append": {"advisory": "Low temperature warning: Protect crops from frost damage, consider row covers"}},
+    # Humidity advisories
+    {"group": "humidity", "when": [("humidity", ">", 80)],
+     "append": {"advisory": "High humidity: Monitor for fungal diseases, ensure good air circulation"}},
+    {"group": "humidity", "when": [("humidity", "<", 40)],
+     "append": {"advisory": "Low humidity: Increase irrigation and consider mulching to retain soil moisture"}},
+    # Rainfall advisories
+    {"group": "rainfall", "when": [("rainfall", ">", 10)],
+     "append": {"advisory": "Heavy rainfall expected: Ensure proper drainage, avoid field operations"}},
+    {"group": "rainfall", "when": [("rainfall", "==", 0), ("humidity", "<", 50)],
+     "append": {"advisory": "Dry conditions: Plan irrigation schedule, check soil moisture levels"}},
+    # Wind advisories
+    {"when": [("wind_speed", ">", 10)],
+     "append": {"advisory": "Strong winds: Secure tall crops, check for wind damage, avoid pesticide spraying"}},
+    # UV advisories
+    {"when": [("uv_index", ">", 7)],
+     "append": {"advisory": "High UV index: Protect workers, consider crop shading for sensitive plants"}},
+    # General advisories
+    {"when": [("advisory", "is_empty")],
+     "append": {"advisory": "Weather conditions are favorable for normal agricultural activities"}},
+]
+
+
+def _crop_advisory_rules() -> List[Dict[str, Any]]:
+    """Expand CROP_ADVISORIES into rules keyed on the (lowercase) crop column"""
+    rules = []
+    for crop, messages in CROP_ADVISORIES.items():
+        rules += [
+            {"group": f"{crop}_temperature",
+             "when": [("crop", "==", crop), ("temperature", ">", 30)],
+             "append": {"advisory": messages["temperature"]["high"]}},
+            {"group": f"{crop}_temperature",
+             "when": [("crop", "==", crop), ("temperature", "<", 20)],
+             "append": {"advisory": messages["temperature"]["low"]}},
+            {"group": f"{crop}_rainfall",
+             "when": [("crop", "==", crop), ("rainfall", ">", 5)],
+             "append": {"advisory": messages["rainfall"]["high"]}},
+            {"group": f"{crop}_rainfall",
+             "when": [("crop", "==", crop), ("rainfall", "==", 0)],
+             "append": {"advisory": messages["rainfall"]["low"]}},
+        ]
+    return rules
+
+
+WEATHER_ADVISORY_RULES = RuleSet(lists=["advisory"], rules=_GENERAL_ADVISORY_RULES)
+
+# General advisory followed by crop-specific lines; extra input column: crop
+CROP_ADVISORY_RULES = RuleSet(
+    lists=["advisory"], rules=_GENERAL_ADVISORY_RULES + _crop_advisory_rules()
+)
+
+# Soil/fertilizer recommendations from sensor readings
+# (api/routes/thingspeak.py::get_smart_recommendations).
+# Inputs: N, P, K, moisture, ph, temp, avg_nutrient. The fertilizer list is
+# joined with " + "; health_factors are joined into the reasoning text.
+SOIL_RULES = RuleSet(
+    defaults={"crop_suggestion": "", "reasoning": "", "soil_health": "Good"},
+    lists=["fertilizer", "actions", "health_factors"],
+    rules=[
+        # Fertilizer Recommendation Logic
+        {"group": "nitrogen", "when": [("N", "<", 30)],
+         "append": {"fertilizer": "High-Nitrogen Fertilizer (Urea or Ammonium Nitrate)",
+                    "actions": "Apply Urea at 50-75 kg/acre to boost nitrogen levels (Currently: {N:.1f} kg/ha)"}},
+        {"group": "nitrogen", "when": [("N", ">", 80)],
+         "append": {"fertilizer": "Reduce Nitrogen Application",
+                    "actions": "Nitrogen levels are high ({N:.1f} kg/ha). Skip nitrogen fertilizers this cycle"}},
+        {"group": "phosphorus", "when": [("P", "<", 15), ("fertilizer", "not_empty")],
+         "append": {"fertilizer": "High-Phosphorus Fertilizer (DAP or SSP)",
+                    "actions": "Apply DAP at 40-60 kg/acre for phosphorus boost (Currently: {P:.1f} kg/ha)"}},
+        {"group": "phosphorus", "when": [("P", "<", 15)],
+         "append": {"fertilizer": "High-Phosphorus Fertilizer (DAP or Single Super Phosphate)",
+                    "actions": "Apply DAP at 40-60 kg/acre for phosphorus boost (Currently: {P:.1f} kg/ha)"}},
+        {"group": "phosphorus", "when": [("P", ">", 60)],
+         "append": {"actions": "Phosphorus levels are optimal ({P:.1f} kg/ha). No additional P needed"}},
+        {"group": "potassium", "when": [("K", "<", 20), ("fertilizer", "not_empty")],
+         "append": {"fertilizer": "Potassium Fertilizer (MOP)",
+                    "actions": "Apply MOP at 30-50 kg/acre for potassium (Currently: {K:.1f} kg/ha)"}},
+        {"group": "potassium", "when": [("K", "<", 20)],
+         "append": {"fertilizer": "Potassium Fertilizer (Muriate of Potash)",
+                    "actions": "Apply MOP at 30-50 kg/acre for potassium (Currently: {K:.1f} kg/ha)"}},
+        {"group": "potassium", "when": [("K", ">", 70)],
+         "append": {"actions": "Potassium levels are excellent ({K:.1f} kg/ha). Maintain current practices"}},
+        {"when": [("fertilizer", "is_empty")],
+         "append": {"fertilizer": "Balanced NPK Fertilizer (10-26-26 or 15-15-15)",
+                    "actions": "All nutrient levels are optimal. Use balanced NPK for maintenance"}},
+        # Crop Recommendation Logic
+        {"group": "crop", "when": [("N", ">", 40), ("P", "<", 40), ("K", "<", 40)],
+         "set": {"crop_suggestion": "Leafy Vegetables (Spinach, Lettuce, Cabbage)",
+                 "reasoning": "High nitrogen supports vigorous leaf growth. Ideal for leafy crops."}},
+        {"group": "crop", "when": [("P", ">", 30), ("K", ">", 30)],
+         "set": {"crop_suggestion": "Fruiting Crops (Tomatoes, Peppers, Eggplant)",
+                 "reasoning": "High phosphorus and potassium promote flowering and fruit development."}},
+        {"group": "crop", "when": [("N", "<", 40), ("P", ">", 25)],
+         "set": {"crop_suggestion": "Root Vegetables (Potatoes, Carrots, Radish)",
+                 "reasoning": "Moderate nitrogen with good phosphorus supports root development."}},
+        {"group": "crop", "when": [("N", ">=", 30), ("N", "<=", 70), ("P", ">=", 15), ("P", "<=", 50),
+                                   ("K", ">=", 20), ("K", "<=", 60)],
+         "set": {"crop_suggestion": "Cereals (Wheat, Rice, Maize)",
+                 "reasoning": "Balanced nutrient profile is ideal for grain crops."}},
+        {"group": "crop", "when": [("N", ">", 60), ("P", ">", 40), ("K", ">", 50)],
+         "set": {"crop_suggestion": "Heavy Feeders (Pumpkin, Squash, Cucumber)",
+                 "reasoning": "Rich soil nutrients can support high-demand crops."}},
+        {"group": "crop", "when": [],
+         "set": {"crop_suggestion": "Legumes (Beans, Peas, Lentils)",
+                 "reasoning": "Legumes can fix nitrogen and improve soil health for future crops."}},
+        # Check pH
+        {"group": "ph", "when": [("ph", ">=", 6.0), ("ph", "<=", 7.5)],
+         "append": {"health_factors": "pH is optimal"}},
+        {"group": "ph", "when": [("ph", "<", 5.5)],
+         "set": {"soil_health": "Acidic - Needs Lime"},
+         "append": {"health_factors": "pH is too acidic ({ph:.1f}). Apply lime to raise pH",
+                    "actions": "Apply agricultural lime at 200-300 kg/acre to neutralize acidity"}},
+        {"group": "ph", "when": [("ph", ">", 8.0)],
+         "set": {"soil_health": "Alkaline - Needs Sulfur"},
+         "append": {"health_factors": "pH is too alkaline ({ph:.1f}). Apply sulfur to lower pH",
+                    "actions": "Apply elemental sulfur at 50-100 kg/acre to reduce alkalinity"}},
+        # Check moisture
+        {"group": "moisture", "when": [("moisture", "<", 30)],
+         "append": {"health_factors": "Soil moisture is low - Increase irrigation",
+                    "actions": "Increase irrigation frequency. Current moisture: {moisture:.1f}%"}},
+        {"group": "moisture", "when": [("moisture", ">", 80)],
+         "append": {"health_factors": "Soil moisture is high - Risk of waterlogging",
+                    "actions": "Reduce irrigation or improve drainage. Current moisture: {moisture:.1f}%"}},
+        {"group": "moisture", "when": [],
+         "append": {"health_factors": "Moisture levels are optimal"}},
+        # Check temperature
+        {"group": "temperature", "when": [("temp", "<", 15)],
+         "append": {"health_factors": "Soil temperature is low - Growth may be slow"}},
+        {"group": "temperature", "when": [("temp", ">", 35)],
+         "append": {"health_factors": "Soil temperature is high - Consider mulching",
+                    "actions": "Apply organic mulch to regulate soil temperature"}},
+        {"group": "temperature", "when": [],
+         "append": {"health_factors": "Temperature is favorable for crop growth"}},
+        # Overall nutrient status
+        {"group": "nutrients", "when": [("avg_nutrient", ">", 50)],
+         "append": {"health_factors": "Overall nutrient levels are rich"}},
+        {"group": "nutrients", "when": [("avg_nutrient", "<", 30)],
+         "set": {"soil_health": "Nutrient Deficient"},
+         "append": {"health_factors": "Overall nutrient levels are low"}},
+    ],
+)
+
+
+def soil_recommendations(N: Sequence[Optional[float]], P: Sequence[Optional[float]],
+                         K: Sequence[Optional[float]], moisture: Sequence[Optional[float]],
+                         ph: Sequence[Optional[float]], temp: Sequence[float]) -> List[Dict[str, Any]]:
+    """
+    Evaluate SOIL_RULES for many sensor readings in one pass.
+
+    Missing nutrient/moisture readings count as 0 and a missing pH as 7.0.
+    Returns one dict per reading with fertilizer_recommendation, crop_suggestion,
+    reasoning, soil_health and actions.
+    """
+    def filled(values: Sequence[Optional[float]], default: float) -> np.ndarray:
+        return np.array([default if v is None else v for v in values], dtype=np.float64)
+
+    n, p, k = filled(N, 0.0), filled(P, 0.0), filled(K, 0.0)
+    outputs, messages = SOIL_RULES.evaluate_columns({
+        "N": n,
+        "P": p,
+        "K": k,
+        "moisture": filled(moisture, 0.0),
+        "ph": filled(ph, 7.0),
+        "temp": filled(temp, 25.1),
+        "avg_nutrient": (n + p + k) / 3,
+    })
+    return [
+        {
+            "fertilizer_recommendation": " + ".join(fertilizer),
+            "crop_suggestion": crop_suggestion,
+            "reasoning": (reasoning + " " + ". ".join(health_factors) + ".").strip(),
+            "soil_health": soil_health,
+            "actions": actions if actions else ["Continue monitoring soil conditions"],
+        }
+        for fertilizer, crop_suggestion, reasoning, health_factors, soil_health, actions in zip(
+            messages["fertilizer"], outputs["crop_suggestion"], outputs["reasoning"],
+            messages["health_factors"], outputs["soil_health"], messages["actions"],
+        )
+    ]
+
+
+# Weather alerts for the next 24 hours (api/routes/weather.py::fetch_weather_alerts).
+# Inputs: max_temperature, rainfall_24h (mm), wind_speed (m/s), humidity.
+# Rules append alert types; WEATHER_ALERTS holds the alert shown for each type.
+WEATHER_ALERTS = {
+    "temperature": {
+        "type": "temperature",
+        "severity": "medium",
+        "message": "High temperature expected over the next 24 hours",
+        "action": "Increase irrigation frequency"
+    },
+    "rainfall": {
+        "type": "rainfall",
+        "severity": "high",
+        "message": "Heavy rainfall warning for next 24 hours",
+        "action": "Ensure field drainage and avoid harvesting"
+    },
+    "wind": {
+        "type": "wind",
+        "severity": "low",
+        "message": "Strong winds expected",
+        "action": "Secure tall crops and avoid spraying"
+    },
+    "drought": {
+        "type": "drought",
+        "severity": "medium",
+        "message": "No rainfall expected in the next 24 hours and the air is dry",
+        "action": "Plan irrigation schedule carefully"
+    },
+}
+
+WEATHER_ALERT_RULES = RuleSet(
+    lists=["alerts"],
+    rules=[
+        {"when": [("max_temperature", ">", 35)], "append": {"alerts": "temperature"}},
+        {"group": "rainfall", "when": [("rainfall_24h", ">", 20)], "append": {"alerts": "rainfall"}},
+        {"group": "rainfall", "when": [("rainfall_24h", "==", 0), ("humidity", "<", 40)],
+         "append": {"alerts": "drought"}},
+        {"when": [("wind_speed", ">", 10)], "append": {"alerts": "wind"}},
+    ],
+)
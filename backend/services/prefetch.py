@@ -0,0 +1,134 @@
+"""
+Background weather prefetcher for known farm locations
+"""
+import asyncio
+import os
+import re
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from services.resilience import BACKGROUND, RateLimitExceeded, CircuitOpenError
+
+_COORDINATES_RE = re.compile(r"^\s*(-?\d+(?:\.\d+)?)\s*,\s*(-?\d+(?:\.\d+)?)\s*$")
+
+
+def parse_coordinates(text: Optional[str]) -> Optional[Tuple[float, float]]:
+    """Parse a "lat,lng" string; returns None for free-text place names"""
+    match = _COORDINATES_RE.match(text or "")
+    if not match:
+        return None
+    lat, lng = float(match.group(1)), float(match.group(2))
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        return None
+    return lat, lng
+
+
+class WeatherPrefetcher:
+    """
+    Periodically refreshes current weather and forecasts for every known
+    location before the cache entries expire, so user-facing requests are
+    served from cache.
+
+    Calls are spread evenly over the refresh interval instead of being fired
+    in a burst, and use the BACKGROUND quota class so they never take tokens
+    reserved for interactive requests.
+    """
+
+    def __init__(self, weather_service, locations_provider: Callable[[], Iterable[str]],
+                 interval: Optional[float] = None):
+        self.weather_service = weather_service
+        self.locations_provider = locations_provider
+        # Refresh ahead of expiry: by default at 80% of the cache TTL
+        self.interval = interval or float(
+            os.getenv("WEATHER_PREFETCH_INTERVAL", weather_service.cache.ttl * 0.8)
+        )
+        self._task: Optional[asyncio.Task] = None
+        self.cycles = 0
+        self.refreshed = 0
+        self.skipped = 0
+        self.failures = 0
+        self.last_cycle_locations = 0
+        self.last_cycle_unresolved = 0
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _resolve(self, text: str) -> Optional[Tuple[float, float]]:
+        """Coordinates of a "lat,lng" string or a place name (geocoded, cached); None if unresolved"""
+        coordinates = parse_coordinates(text)
+        if coordinates is not None:
+            return coordinates
+        try:
+            return await self.weather_service.geocode_city(text, priority=BACKGROUND)
+        except (RateLimitExceeded, CircuitOpenError):
+            return None  # retried next cycle
+        except Exception as e:
+            print(f"Weather prefetch could not resolve {text!r}: {e}")
+            return None
+
+    async def _collect_locations(self) -> List[Tuple[float, float]]:
+        """Known locations as coordinates, deduplicated by weather cache grid cell"""
+        cells: Dict[Tuple[int, int], Tuple[float, float]] = {}
+        unresolved = 0
+        for text in self.locations_provider():
+            coordinates = await self._resolve(text)
+            if coordinates is None:
+                unresolved += 1
+                continue
+            cells.setdefault(self.weather_service.grid_cell(*coordinates), coordinates)
+        if unresolved:
+            print(f"⚠️ Weather prefetch skipped {unresolved} unresolved location(s)")
+        self.last_cycle_unresolved = unresolved
+        return list(cells.values())
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_cycle()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️ Weather prefetch cycle failed: {e}")
+                await asyncio.sleep(self.interval)
+
+    async def run_cycle(self) -> None:
+        """Refresh every known location once, spread across one interval"""
+        locations = await self._collect_locations()
+        self.cycles += 1
+        self.last_cycle_locations = len(locations)
+        if not locations:
+            await asyncio.sleep(self.interval)
+            return
+
+        spacing = self.interval / len(locations)
+        for lat, lng in locations:
+            try:
+                self.refreshed += await self.weather_service.prefetch_location(lat, lng)
+            except (RateLimitExceeded, CircuitOpenError):
+                # Quota reserved for users or provider unhealthy: try next cycle
+                self.skipped += 1
+            except Exception as e:
+                self.failures += 1
+                print(f"Weather prefetch failed for ({lat}, {lng}): {e}")
+            await asyncio.sleep(spacing)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "interval_seconds": self.interval,
+            "cycles": self.cycles,
+            "locations": self.last_cycle_locations,
+            "unresolved_locations": self.last_cycle_unresolved,
+            "upstream_refreshes": self.refreshed,
+            "skipped": self.skipped,
+            "failures": self.failures,
+        }
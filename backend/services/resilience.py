@@ -0,0 +1,226 @@
+"""
+Upstream protection: token-bucket quota governor, circuit breaker and
+per-endpoint latency tracking
+"""
+import asyncio
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Mapping, Optional
+
+# Priority classes for TokenBucket.acquire
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+
+
+def retry_after_seconds(headers: Mapping[str, str], default: float = 60.0) -> float:
+    """Parse a numeric Retry-After header, falling back to a full quota window"""
+    try:
+        return float(headers.get("Retry-After", default))
+    except (TypeError, ValueError):
+        return default
+
+
+class RateLimitExceeded(Exception):
+    """Raised when no quota token becomes available within the allowed wait"""
+
+
+class CircuitOpenError(Exception):
+    """Raised when the circuit breaker is rejecting calls to an unhealthy upstream"""
+
+
+class TokenBucket:
+    """
+    Process-wide token bucket for an upstream quota (e.g. 60 calls/minute).
+
+    Interactive callers may use every token and wait briefly for the next one.
+    Background callers (prefetching) only take a token while more than
+    `background_reserve` of the bucket is left, so they never starve
+    user-facing requests, and they may wait longer.
+    """
+
+    def __init__(self, rate_per_minute: float, burst: Optional[float] = None,
+                 background_reserve: float = 0.5, interactive_max_wait: float = 2.0,
+                 background_max_wait: float = 60.0):
+        self.rate = max(rate_per_minute, 0.001) / 60.0  # tokens per second
+        self.capacity = burst if burst is not None else max(rate_per_minute, 1.0)
+        self.background_reserve = background_reserve
+        self.max_wait = {INTERACTIVE: interactive_max_wait, BACKGROUND: background_max_wait}
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self.granted = {INTERACTIVE: 0, BACKGROUND: 0}
+        self.rejected = {INTERACTIVE: 0, BACKGROUND: 0}
+        self.penalties = 0
+
+    def _refill(self) -> float:
+        now = time.monotonic()
+        if now > self._blocked_until:
+            start = max(self._updated, self._blocked_until)
+            self.tokens = min(self.capacity, self.tokens + (now - start) * self.rate)
+        self._updated = now
+        return now
+
+    def _floor(self, priority: str) -> float:
+        """Tokens that must remain after the acquire for this priority"""
+        return self.capacity * self.background_reserve if priority == BACKGROUND else 0.0
+
+    def try_acquire(self, priority: str = INTERACTIVE, tokens: float = 1.0) -> bool:
+        """Take tokens without waiting; return False if the quota does not allow it"""
+        now = self._refill()
+        if now < self._blocked_until:
+            return False
+        if self.tokens - tokens >= self._floor(priority):
+            self.tokens -= tokens
+            self.granted[priority] = self.granted.get(priority, 0) + 1
+            return True
+        return False
+
+    async def acquire(self, priority: str = INTERACTIVE, tokens: float = 1.0,
+                      max_wait: Optional[float] = None) -> None:
+        """Wait for tokens, raising RateLimitExceeded after the priority's max wait"""
+        max_wait = self.max_wait.get(priority, 0.0) if max_wait is None else max_wait
+        deadline = time.monotonic() + max_wait
+        while not self.try_acquire(priority, tokens):
+            now = time.monotonic()
+            missing = tokens + self._floor(priority) - self.tokens
+            delay = max(self._blocked_until - now, missing / self.rate, 0.01)
+            if now + delay > deadline:
+                self.rejected[priority] = self.rejected.get(priority, 0) + 1
+                raise RateLimitExceeded(f"Weather API quota exhausted ({priority})")
+            await asyncio.sleep(delay)
+
+    def penalize(self, seconds: float) -> None:
+        """Drain the bucket and block it, e.g. after an upstream 429 with Retry-After"""
+        self._refill()
+        self.tokens = 0.0
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+        self.penalties += 1
+
+    def stats(self) -> Dict[str, Any]:
+        now = self._refill()
+        return {
+            "rate_per_minute": round(self.rate * 60, 2),
+            "capacity": self.capacity,
+            "tokens_available": round(self.tokens, 2),
+            "blocked_for_seconds": round(max(0.0, self._blocked_until - now), 1),
+            "granted": dict(self.granted),
+            "rejected": dict(self.rejected),
+            "penalties": self.penalties,
+        }
+
+
+class CircuitBreaker:
+    """
+    Classic closed/open/half-open breaker. After `failure_threshold` consecutive
+    failures calls fail fast for `reset_timeout` seconds, then a limited number
+    of trial calls decide whether to close again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 half_open_max_calls: int = 1):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = max(1, half_open_max_calls)
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.total_failures = 0
+        self.rejected = 0
+        self.opened_at: Optional[float] = None
+        self._half_open_in_flight = 0
+
+    def allow_request(self) -> bool:
+        """Return True if a call may go upstream now; every allowed call must be
+        followed by record_success, record_failure or release"""
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._half_open_in_flight = 0
+            else:
+                self.rejected += 1
+                return False
+        if self.state == self.HALF_OPEN:
+            if self._half_open_in_flight >= self.half_open_max_calls:
+                self.rejected += 1
+                return False
+            self._half_open_in_flight += 1
+        return True
+
+    def record_success(self) -> None:
+        self.consecutive_failures = 0
+        if self.state != self.CLOSED:
+            print(f"✅ Circuit '{self.name}' closed")
+        self.state = self.CLOSED
+        self._half_open_in_flight = 0
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        self.total_failures += 1
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                print(f"⚠️ Circuit '{self.name}' opened after {self.consecutive_failures} failures")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+            self._half_open_in_flight = 0
+
+    def release(self) -> None:
+        """Give back an allowed call that never reached upstream"""
+        if self.state == self.HALF_OPEN and self._half_open_in_flight > 0:
+            self._half_open_in_flight -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        retry_in = None
+        if self.state == self.OPEN and self.opened_at is not None:
+            retry_in = round(max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at)), 1)
+        return {
+            "name": self.name,
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "total_failures": self.total_failures,
+            "rejected_calls": self.rejected,
+            "retry_in_seconds": retry_in,
+        }
+
+
+class LatencyTracker:
+    """
+    Rolling latency window for one upstream endpoint. Every attempt is
+    counted by outcome; durations of successful attempts feed the
+    percentiles used to pick hedge delays.
+    """
+
+    def __init__(self, window: int = 256):
+        self._samples: Deque[float] = deque(maxlen=max(1, window))
+        self.outcomes: Dict[str, int] = {}
+
+    def record(self, seconds: float, outcome: str = "ok") -> None:
+        self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+        if outcome == "ok":
+            self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Latency below which `fraction` of recent successful attempts completed"""
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def stats(self) -> Dict[str, Any]:
+        def ms(value: Optional[float]) -> Optional[float]:
+            return round(value * 1000, 1) if value is not None else None
+
+        return {
+            "samples": len(self._samples),
+            "p50_ms": ms(self.percentile(0.5)),
+            "p95_ms": ms(self.percentile(0.95)),
+            "p99_ms": ms(self.percentile(0.99)),
+            "max_ms": ms(max(self._samples) if self._samples else None),
+            "attempts": dict(self.outcomes),
+        }
@@ -0,0 +1,197 @@
+"""
+Background ThingSpeak poller keeping the latest reading of each channel in memory
+"""
+import asyncio
+import math
+import os
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import thingspeak_client
+from services.sensor_store import FIELD_COUNT, get_sensor_store, parse_field, parse_timestamp
+from services.singleflight import SingleFlight
+
+# ThingSpeak channels accept at most one update per 15 s, so polling faster only repeats reads
+MIN_POLL_INTERVAL = 15.0
+
+# (channel_id, read_key, poll interval in seconds)
+Channel = Tuple[str, str, float]
+
+
+def configured_channels() -> List[Channel]:
+    """Every registered device's channel, at the shortest interval of the devices sharing it"""
+    return thingspeak_client.get_device_registry().channels()
+
+
+class SensorPoller:
+    """
+    Polls every configured channel at its update interval and keeps the
+    newest entry of each in memory, so sensor endpoints answer without
+    upstream I/O. With the sensor store enabled each poll is an incremental
+    sync, which also keeps /historical current.
+
+    Due channels are polled concurrently, at most THINGSPEAK_POLL_CONCURRENCY
+    at a time so a large fleet never queues more requests than the shared
+    connection pool serves; each channel is rescheduled from the time its
+    poll finished. When the poller is not running, latest() refreshes a
+    snapshot on demand once it is older than the minimum interval.
+    """
+
+    def __init__(self, channels_provider: Callable[[], Iterable[Channel]] = configured_channels,
+                 concurrency: Optional[int] = None):
+        self.channels_provider = channels_provider
+        self.concurrency = concurrency or int(os.getenv("THINGSPEAK_POLL_CONCURRENCY", "10"))
+        self._semaphore = asyncio.Semaphore(max(1, self.concurrency))
+        self.store = get_sensor_store()
+        self.snapshots: Dict[str, Dict[str, Any]] = {}
+        self._flights = SingleFlight("thingspeak-poller")
+        self._task: Optional[asyncio.Task] = None
+        self.polls = 0
+        self.failures = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _channels(self) -> Dict[str, Tuple[str, float]]:
+        return {
+            channel_id: (read_key, max(MIN_POLL_INTERVAL, interval))
+            for channel_id, read_key, interval in self.channels_provider()
+            if channel_id
+        }
+
+    async def _run(self) -> None:
+        next_due: Dict[str, float] = {}
+        while True:
+            try:
+                channels = self._channels()
+                now = time.monotonic()
+                due = [channel_id for channel_id in channels if next_due.get(channel_id, 0.0) <= now]
+                await asyncio.gather(*(self.poll(channel_id, channels[channel_id][0]) for channel_id in due))
+                finished = time.monotonic()
+                for channel_id in due:
+                    next_due[channel_id] = finished + channels[channel_id][1]
+                for channel_id in set(next_due) - set(channels):
+                    del next_due[channel_id]
+                wait = min(next_due.values(), default=finished + MIN_POLL_INTERVAL) - finished
+                await asyncio.sleep(max(wait, 1.0))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️ ThingSpeak poll cycle failed: {e}")
+                await asyncio.sleep(MIN_POLL_INTERVAL)
+
+    async def poll(self, channel_id: str, read_key: Optional[str] = None) -> Dict[str, Any]:
+        """Fetch a channel's newest entry now; on failure the previous snapshot is kept"""
+
+        async def run() -> Dict[str, Any]:
+            self.polls += 1
+            try:
+                async with self._semaphore:
+                    entry = await self._fetch_latest(channel_id, read_key)
+            except Exception as e:
+                self.failures += 1
+                print(f"ThingSpeak poll failed for channel {channel_id}: {e}")
+                previous = self.snapshots.get(channel_id)
+                if previous is not None:
+                    previous["error"] = str(e)
+                    return previous
+                entry = {"entry_id": None, "created_at": None, "fields": {}}
+                error = str(e)
+            else:
+                error = None
+            snapshot = {**entry, "channel_id": channel_id, "fetched_at": time.time(), "error": error}
+            self.snapshots[channel_id] = snapshot
+            return snapshot
+
+        return await self._flights.do(channel_id, run)
+
+    async def _fetch_latest(self, channel_id: str, read_key: Optional[str]) -> Dict[str, Any]:
+        if self.store is not None:
+            await thingspeak_client.sync_channel(self.store, channel_id, read_key)
+            latest = await asyncio.to_thread(self.store.read, channel_id, None, None, 1)
+            if latest["entry_id"].size == 0:
+                return {"entry_id": None, "created_at": None, "fields": {}}
+            values = latest["fields"][0].tolist()
+            return {
+                "entry_id": int(latest["entry_id"][0]),
+                "created_at": float(latest["created_at"][0]),
+                "fields": {i + 1: (None if math.isnan(value) else value) for i, value in enumerate(values)},
+            }
+
+        payload = await thingspeak_client.fetch_feeds(1, channel_id, read_key)
+        feeds = payload.get("feeds") or []
+        if not feeds:
+            return {"entry_id": None, "created_at": None, "fields": {}}
+        feed = feeds[-1]
+        return {
+            "entry_id": feed.get("entry_id"),
+            "created_at": parse_timestamp(feed["created_at"]) if feed.get("created_at") else None,
+            "fields": {
+                i: parse_field(feed.get(f"field{i}")) for i in range(1, FIELD_COUNT + 1)
+            },
+        }
+
+    async def latest(self, channel_id: Optional[str] = None,
+                     read_key: Optional[str] = None) -> Dict[str, Any]:
+        """
+        The newest known entry of a channel (the default channel if omitted):
+        {"channel_id", "entry_id", "created_at", "fields", "fetched_at", "error",
+        "data_age_seconds"}, where the age is measured from the entry's
+        created_at. Served from memory while the poller runs.
+        """
+        channel_id = channel_id or thingspeak_client.THINGSPEAK_CHANNEL_ID
+        read_key = read_key or thingspeak_client.THINGSPEAK_READ_API_KEY
+        if not channel_id:
+            return {"channel_id": None, "entry_id": None, "created_at": None, "fields": {},
+                    "fetched_at": None, "error": None, "data_age_seconds": None}
+        snapshot = self.snapshots.get(channel_id)
+        if snapshot is None or (
+            not self.running and time.time() - snapshot["fetched_at"] >= MIN_POLL_INTERVAL
+        ):
+            snapshot = await self.poll(channel_id, read_key)
+        now = time.time()
+        return {
+            **snapshot,
+            "fields": dict(snapshot["fields"]),
+            "data_age_seconds": round(now - snapshot["created_at"], 1) if snapshot["created_at"] else None,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.time()
+        return {
+            "running": self.running,
+            "channels": len(self.snapshots),
+            "concurrency": self.concurrency,
+            "polls": self.polls,
+            "failures": self.failures,
+            "snapshot_ages_seconds": {
+                channel_id: round(now - snapshot["fetched_at"], 1)
+                for channel_id, snapshot in self.snapshots.items()
+            },
+        }
+
+
+# Global sensor poller instance
+_sensor_poller: Optional[SensorPoller] = None
+
+
+def get_sensor_poller() -> SensorPoller:
+    """Get or create global sensor poller instance"""
+    global _sensor_poller
+    if _sensor_poller is None:
+        _sensor_poller = SensorPoller()
+    return _sensor_poller
@@ -0,0 +1,237 @@
+"""
+Local time-series store for ThingSpeak channel feeds.
+
+Entries are kept in SQLite (WAL) keyed by (channel, entry_id), with the
+eight ThingSpeak fields as numeric columns, so history endpoints read any
+time range locally instead of refetching from ThingSpeak. Ingestion is
+incremental: the highest stored entry_id is the cursor, and each sync only
+asks ThingSpeak for the entries created after it (see
+thingspeak_client.sync_channel). Reads return columnar NumPy arrays.
+"""
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+FIELD_COUNT = 8  # ThingSpeak channels have field1..field8
+_FIELD_COLUMNS = [f"field{i}" for i in range(1, FIELD_COUNT + 1)]
+
+_SCHEMA = [
+    f"""CREATE TABLE IF NOT EXISTS sensor_feeds (
+        channel_id TEXT NOT NULL,
+        entry_id INTEGER NOT NULL,
+        created_at REAL NOT NULL,
+        {", ".join(f"{column} REAL" for column in _FIELD_COLUMNS)},
+        PRIMARY KEY (channel_id, entry_id)
+    ) WITHOUT ROWID""",
+    """CREATE INDEX IF NOT EXISTS sensor_feeds_time
+        ON sensor_feeds (channel_id, created_at)""",
+    """CREATE TABLE IF NOT EXISTS sensor_sync (
+        channel_id TEXT PRIMARY KEY,
+        last_entry_id INTEGER NOT NULL,
+        synced_at REAL NOT NULL
+    )""",
+]
+
+_INSERT = (
+    f"INSERT OR IGNORE INTO sensor_feeds (channel_id, entry_id, created_at, {', '.join(_FIELD_COLUMNS)}) "
+    f"VALUES (?, ?, ?, {', '.join('?' for _ in _FIELD_COLUMNS)})"
+)
+
+
+def parse_timestamp(value: str) -> float:
+    """Epoch seconds for a ThingSpeak created_at ("2024-01-01T00:00:00Z" or with an offset)"""
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def format_timestamp(epoch: float) -> str:
+    """ThingSpeak-style UTC created_at for epoch seconds"""
+    return datetime.fromtimestamp(epoch, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def parse_field(value: Any) -> Optional[float]:
+    try:
+        if value is None or value == "":
+            return None
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class SensorStore:
+    def __init__(self, path: str, max_age: float = 0.0):
+        self.path = path
+        self.max_age = max_age  # seconds of history kept per channel; 0 keeps everything
+        self._local = threading.local()
+        # Every thread's connection, so close() can reach those opened in worker threads
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self.reads = 0
+        self.rows_read = 0
+        self.rows_ingested = 0
+        self.syncs = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread (sqlite3 connections are not thread-safe)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def open(self) -> None:
+        """Create the schema and drop entries older than max_age"""
+        conn = self._connection()
+        with conn:
+            for statement in _SCHEMA:
+                conn.execute(statement)
+            if self.max_age > 0:
+                conn.execute(
+                    "DELETE FROM sensor_feeds WHERE created_at < ?", (time.time() - self.max_age,)
+                )
+
+    def close(self) -> None:
+        """Close the connections of every thread that used the store"""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        # Threads reconnect on next use instead of reusing a closed connection
+        self._local = threading.local()
+
+    def cursor(self, channel_id: str) -> Optional[int]:
+        """Highest entry_id ingested for a channel, or None before the first sync"""
+        row = self._connection().execute(
+            "SELECT last_entry_id FROM sensor_sync WHERE channel_id = ?", (channel_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def last_synced(self, channel_id: str) -> Optional[float]:
+        row = self._connection().execute(
+            "SELECT synced_at FROM sensor_sync WHERE channel_id = ?", (channel_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def ingest(self, channel_id: str, feeds: Iterable[Dict[str, Any]],
+               last_entry_id: Optional[int] = None) -> int:
+        """
+        Store raw feeds.json entries and advance the channel cursor.
+
+        Entries at or below the cursor are skipped (and duplicates ignored), so
+        overlapping fetches are harmless. last_entry_id, when given, moves the
+        cursor even if the newest entries could not be stored. Returns the
+        number of new rows.
+        """
+        cursor = self.cursor(channel_id) or 0
+        rows = []
+        newest = cursor
+        for feed in feeds:
+            entry_id = feed.get("entry_id")
+            created_at = feed.get("created_at")
+            if entry_id is None or not created_at or int(entry_id) <= cursor:
+                continue
+            try:
+                timestamp = parse_timestamp(created_at)
+            except ValueError:
+                continue
+            rows.append((channel_id, int(entry_id), timestamp,
+                         *(parse_field(feed.get(column)) for column in _FIELD_COLUMNS)))
+            newest = max(newest, int(entry_id))
+        if last_entry_id is not None:
+            newest = max(newest, int(last_entry_id))
+
+        conn = self._connection()
+        with conn:
+            before = conn.total_changes
+            conn.executemany(_INSERT, rows)
+            added = conn.total_changes - before
+            conn.execute(
+                """INSERT INTO sensor_sync (channel_id, last_entry_id, synced_at) VALUES (?, ?, ?)
+                   ON CONFLICT(channel_id) DO UPDATE SET
+                       last_entry_id = MAX(last_entry_id, excluded.last_entry_id),
+                       synced_at = excluded.synced_at""",
+                (channel_id, newest, time.time()),
+            )
+        self.syncs += 1
+        self.rows_ingested += added
+        return added
+
+    def read(self, channel_id: str, start: Optional[float] = None, end: Optional[float] = None,
+             limit: Optional[int] = None, fields: Optional[Sequence[int]] = None) -> Dict[str, np.ndarray]:
+        """
+        Entries of a channel with start <= created_at <= end (epoch seconds),
+        oldest first. With limit, only the newest `limit` entries in the range.
+        `fields` selects field numbers (default all 8); reading fewer columns
+        is noticeably faster on long ranges.
+
+        Returns:
+            {"entry_id": int64 (n,), "created_at": float64 (n,),
+             "fields": float64 (n, len(fields)) with NaN for missing values}
+        """
+        columns = [f"field{i}" for i in fields] if fields else _FIELD_COLUMNS
+        sql = f"SELECT entry_id, created_at, {', '.join(columns)} FROM sensor_feeds WHERE channel_id = ?"
+        params: List[Any] = [channel_id]
+        if start is not None:
+            sql += " AND created_at >= ?"
+            params.append(start)
+        if end is not None:
+            sql += " AND created_at <= ?"
+            params.append(end)
+        sql += " ORDER BY entry_id DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        rows = self._connection().execute(sql, params).fetchall()
+        self.reads += 1
+        self.rows_read += len(rows)
+        # None -> NaN on conversion; reverse to oldest first
+        table = np.array(rows, dtype=np.float64).reshape(len(rows), len(columns) + 2)[::-1]
+        return {
+            "entry_id": table[:, 0].astype(np.int64),
+            "created_at": np.ascontiguousarray(table[:, 1]),
+            "fields": np.ascontiguousarray(table[:, 2:]),
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "reads": self.reads,
+            "rows_read": self.rows_read,
+            "rows_ingested": self.rows_ingested,
+            "syncs": self.syncs,
+        }
+
+
+# Global sensor store instance (None when THINGSPEAK_STORE_DB is empty or unusable)
+_sensor_store: Optional[SensorStore] = None
+_sensor_store_checked = False
+
+
+def get_sensor_store() -> Optional[SensorStore]:
+    """Get or create the global sensor store; opening it creates the schema"""
+    global _sensor_store, _sensor_store_checked
+    if not _sensor_store_checked:
+        _sensor_store_checked = True
+        path = os.getenv("THINGSPEAK_STORE_DB", "thingspeak_feeds.sqlite3")
+        if path:
+            store = SensorStore(
+                path, max_age=float(os.getenv("THINGSPEAK_STORE_MAX_AGE_DAYS", "0")) * 86400
+            )
+            try:
+                store.open()
+                _sensor_store = store
+            except Exception as e:
+                print(f"⚠️ Sensor history store disabled: {e}")
+    return _sensor_store
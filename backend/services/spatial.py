@@ -0,0 +1,149 @@
+"""
+Spatial lookups over cached weather: a bucketed lat/lng index and
+inverse-distance-weighted (IDW) interpolation of current-weather payloads.
+
+Nearby fields often fall in different cache cells a few hundred metres
+apart; when enough fresh neighbours are cached, their readings are
+interpolated instead of spending an upstream call on the new cell.
+"""
+import math
+from typing import Any, Dict, Hashable, List, Sequence, Set, Tuple
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = 111.32
+
+# (section, field) pairs of an OpenWeatherMap current-weather payload to interpolate;
+# a missing rain/snow section means none fell, other missing fields are skipped
+_NUMERIC_FIELDS = [
+    ("main", "temp"),
+    ("main", "feels_like"),
+    ("main", "temp_min"),
+    ("main", "temp_max"),
+    ("main", "humidity"),
+    ("main", "pressure"),
+    ("wind", "speed"),
+    ("wind", "gust"),
+    ("clouds", "all"),
+    ("rain", "1h"),
+    ("snow", "1h"),
+]
+_ZERO_IF_MISSING = {"rain", "snow"}
+_INTEGER_FIELDS = {("main", "humidity"), ("main", "pressure"), ("clouds", "all")}
+
+
+def haversine_km(lat: float, lng: float, lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+    """Great-circle distances from one point to many, in km"""
+    lat1, lng1 = np.radians(lat), np.radians(lng)
+    lat2, lng2 = np.radians(lats), np.radians(lngs)
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+class SpatialIndex:
+    """
+    Points bucketed on a coarse lat/lng grid. A radius query only visits the
+    few buckets overlapping the search box, so its cost depends on the local
+    point density rather than on the total number of indexed points.
+    """
+
+    def __init__(self, bucket_deg: float = 0.05):
+        self.bucket_deg = bucket_deg
+        self._points: Dict[Hashable, Tuple[float, float, Tuple[int, int]]] = {}
+        self._buckets: Dict[Tuple[int, int], Set[Hashable]] = {}
+
+    def _bucket(self, lat: float, lng: float) -> Tuple[int, int]:
+        return (math.floor(lat / self.bucket_deg), math.floor(lng / self.bucket_deg))
+
+    def add(self, key: Hashable, lat: float, lng: float) -> None:
+        self.discard(key)
+        bucket = self._bucket(lat, lng)
+        self._points[key] = (lat, lng, bucket)
+        self._buckets.setdefault(bucket, set()).add(key)
+
+    def discard(self, key: Hashable) -> None:
+        point = self._points.pop(key, None)
+        if point is not None:
+            members = self._buckets.get(point[2])
+            if members is not None:
+                members.discard(key)
+                if not members:
+                    del self._buckets[point[2]]
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def nearby(self, lat: float, lng: float, radius_km: float) -> List[Tuple[Hashable, float]]:
+        """Keys within radius_km of (lat, lng) with their distances, nearest first"""
+        lat_span = radius_km / KM_PER_DEGREE
+        lng_span = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(lat)), 0.01))
+        low = self._bucket(lat - lat_span, lng - lng_span)
+        high = self._bucket(lat + lat_span, lng + lng_span)
+
+        keys = []
+        for i in range(low[0], high[0] + 1):
+            for j in range(low[1], high[1] + 1):
+                keys.extend(self._buckets.get((i, j), ()))
+        if not keys:
+            return []
+
+        coords = np.array([self._points[key][:2] for key in keys], dtype=np.float64)
+        distances = haversine_km(lat, lng, coords[:, 0], coords[:, 1])
+        order = np.argsort(distances, kind="stable")
+        return [(keys[i], float(distances[i])) for i in order.tolist()
+                if distances[i] <= radius_km]
+
+
+def interpolate_current(lat: float, lng: float, payloads: Sequence[Dict[str, Any]],
+                        distances_km: Sequence[float], power: float = 2.0) -> Dict[str, Any]:
+    """
+    Inverse-distance-weighted current-weather payload for (lat, lng).
+
+    Numeric fields are weighted by 1 / distance**power, wind direction as a
+    weighted circular mean; conditions, place name and sun times come from the
+    nearest payload and `dt` is the oldest of the inputs. The result has the
+    same shape as an OpenWeatherMap /weather response.
+    """
+    distances = np.maximum(np.asarray(distances_km, dtype=np.float64), 1e-3)
+    weights = 1.0 / distances ** power
+    nearest = payloads[int(np.argmin(distances))]
+
+    result: Dict[str, Any] = {
+        key: value for key, value in nearest.items()
+        if key not in ("main", "wind", "clouds", "rain", "snow", "coord", "dt")
+    }
+    result["coord"] = {"lat": lat, "lon": lng}
+    result["dt"] = min(p.get("dt", 0) for p in payloads)
+
+    for section, name in _NUMERIC_FIELDS:
+        values, used = [], []
+        for payload, weight in zip(payloads, weights.tolist()):
+            value = (payload.get(section) or {}).get(name)
+            if value is None and section in _ZERO_IF_MISSING:
+                value = 0.0
+            if isinstance(value, (int, float)):
+                values.append(value)
+                used.append(weight)
+        if not used:
+            continue
+        value = float(np.dot(values, used) / np.sum(used))
+        if section in _ZERO_IF_MISSING and value == 0:
+            continue
+        value = round(value) if (section, name) in _INTEGER_FIELDS else round(value, 2)
+        result.setdefault(section, {})[name] = value
+
+    directions = [((p.get("wind") or {}).get("deg"), w) for p, w in zip(payloads, weights.tolist())]
+    directions = [(d, w) for d, w in directions if isinstance(d, (int, float))]
+    if directions:
+        radians = np.radians([d for d, _ in directions])
+        dir_weights = np.array([w for _, w in directions])
+        mean = math.degrees(math.atan2(np.dot(np.sin(radians), dir_weights),
+                                       np.dot(np.cos(radians), dir_weights)))
+        result.setdefault("wind", {})["deg"] = round(mean) % 360
+
+    visibility = [p.get("visibility") for p in payloads]
+    if all(isinstance(v, (int, float)) for v in visibility):
+        result["visibility"] = round(float(np.dot(visibility, weights) / weights.sum()))
+    return result
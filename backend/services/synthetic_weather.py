@@ -0,0 +1,301 @@
+"""
+Deterministic synthetic weather for demo mode and offline benchmarks.
+
+A year of hourly weather for a location is generated in one vectorized pass:
+seasonal and diurnal temperature cycles shaped by latitude and longitude,
+persistent day-to-day anomalies, monsoon-style wet seasons in the tropics,
+and rain events with plausible effects on humidity, cloud, wind and
+visibility. Every series is seeded from (seed, grid cell, year), so the same
+place and hour always get the same weather, and generated years are cached
+per location. Payload builders return the same shape as OpenWeatherMap's
+/weather and /forecast responses.
+"""
+import math
+import os
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+SECONDS_PER_HOUR = 3600
+FIELDS = ("temp", "humidity", "pressure", "wind_speed", "wind_deg", "wind_gust",
+          "clouds", "rain", "visibility")
+
+# Grid used to seed and cache series (about 1 km)
+GRID_DEG = 0.01
+
+
+def _smooth_noise(rng: np.random.Generator, size: int, scale: float) -> np.ndarray:
+    """Unit-variance noise with exponential autocorrelation over `scale` steps"""
+    taps = max(1, int(4 * scale))
+    kernel = np.exp(-np.arange(taps) / max(scale, 1e-6))
+    white = rng.standard_normal(size + taps - 1)
+    return np.convolve(white, kernel, mode="valid")[:size] / np.sqrt(np.sum(kernel ** 2))
+
+
+def _normal_cdf(values: np.ndarray) -> np.ndarray:
+    """Standard normal CDF via the Abramowitz-Stegun 7.1.26 erf (error below 1.5e-7)"""
+    x = np.abs(values) / math.sqrt(2)
+    t = 1 / (1 + 0.3275911 * x)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    erf = 1 - poly * np.exp(-x * x)
+    return 0.5 * (1 + np.sign(values) * erf)
+
+
+def _condition(rain: float, clouds: float) -> Tuple[int, str, str]:
+    """OpenWeatherMap condition (id, main, description) for an hour"""
+    if rain >= 4:
+        return 502, "Rain", "heavy intensity rain"
+    if rain >= 1:
+        return 501, "Rain", "moderate rain"
+    if rain > 0:
+        return 500, "Rain", "light rain"
+    if clouds > 84:
+        return 804, "Clouds", "overcast clouds"
+    if clouds > 50:
+        return 803, "Clouds", "broken clouds"
+    if clouds > 25:
+        return 802, "Clouds", "scattered clouds"
+    if clouds > 10:
+        return 801, "Clouds", "few clouds"
+    return 800, "Clear", "clear sky"
+
+
+class SyntheticWeather:
+    """Seeded generator of hourly weather years, cached per (grid cell, year)"""
+
+    def __init__(self, seed: int = 0, cache_size: int = 256):
+        self.seed = seed
+        self.cache_size = max(1, cache_size)
+        self._years: "OrderedDict[Tuple[int, int, int], Dict[str, np.ndarray]]" = OrderedDict()
+
+    @staticmethod
+    def _cell(lat: float, lng: float) -> Tuple[int, int]:
+        return (math.floor(lat / GRID_DEG), math.floor(lng / GRID_DEG))
+
+    def year(self, lat: float, lng: float, year: int) -> Dict[str, np.ndarray]:
+        """Hourly arrays (UTC, from 1 January 00:00) for every field in FIELDS"""
+        i, j = self._cell(lat, lng)
+        key = (i, j, year)
+        series = self._years.get(key)
+        if series is None:
+            series = self._generate((i + 0.5) * GRID_DEG, (j + 0.5) * GRID_DEG, year,
+                                    np.random.default_rng([self.seed, i & 0xFFFFFFFF, j & 0xFFFFFFFF, year]))
+            self._years[key] = series
+            while len(self._years) > self.cache_size:
+                self._years.popitem(last=False)
+        self._years.move_to_end(key)
+        return series
+
+    def hourly(self, lat: float, lng: float, start: int, hours: int) -> Dict[str, np.ndarray]:
+        """Hourly arrays for `hours` hours from the hour containing epoch second `start`"""
+        first = start // SECONDS_PER_HOUR
+        stamps = np.arange(first, first + hours, dtype=np.int64)
+        years = (np.datetime64(0, "h") + stamps).astype("datetime64[Y]")
+        result = {field: np.empty(hours) for field in FIELDS}
+        for year in np.unique(years):
+            mask = years == year
+            offset = stamps[mask] - (year.astype("datetime64[h]") - np.datetime64(0, "h")).astype(np.int64)
+            series = self.year(lat, lng, int(year.astype(int)) + 1970)
+            for field in FIELDS:
+                result[field][mask] = series[field][offset]
+        return result
+
+    def _generate(self, lat: float, lng: float, year: int,
+                  rng: np.random.Generator) -> Dict[str, np.ndarray]:
+        hours = int((np.datetime64(f"{year + 1}-01-01", "h") - np.datetime64(f"{year}-01-01", "h"))
+                    .astype(np.int64))
+        days = hours // 24
+        hour = np.arange(hours)
+        day_of_year = hour / 24.0
+        solar_hour = (hour + lng / 15.0) % 24
+        abs_lat = abs(lat)
+
+        # Seasonal cycle: warmest in late July (north) or mid January (south)
+        peak = 200 if lat >= 0 else 17
+        season = np.cos(2 * np.pi * (day_of_year - peak) / 365.25)
+        annual_mean = 27.0 - 0.35 * max(0.0, abs_lat - 10)
+        season_amplitude = min(15.0, 1.0 + 0.3 * abs_lat)
+
+        # Monsoon-style wet season between 5 and 30 degrees north
+        monsoon_weight = 1.0 if 5 <= lat <= 30 else 0.0
+        monsoon = monsoon_weight * np.exp(-((np.arange(days) + 0.5 - 215) / 40.0) ** 2)
+        wet_probability = np.clip(0.12 + 0.15 * (1 - min(abs_lat, 60) / 60) + 0.6 * monsoon, 0.03, 0.85)
+
+        # Persistent daily regimes: wet days where a smooth latent series is low
+        regime = _smooth_noise(rng, days, 2.0)
+        wet_day = _normal_cdf(regime) < wet_probability
+        amount = np.where(wet_day, rng.gamma(0.8, 6.0 + 14.0 * monsoon), 0.0)  # mm/day
+        start = np.clip(np.rint(rng.normal(15, 4, days)), 0, 23).astype(np.int64)
+        duration = rng.integers(2, 9, days)
+        # Events end by midnight, so each wet day gets its whole amount
+        start = np.minimum(start, 24 - duration)
+        hour_of_day = np.arange(24)
+        raining = (hour_of_day >= start[:, None]) & (hour_of_day < (start + duration)[:, None])
+        rain = np.round(np.where(raining, (amount / duration)[:, None], 0.0).ravel(), 2)
+
+        day_index = np.minimum(hour // 24, days - 1)
+        wet = wet_day.astype(np.float64)[day_index]
+        wetness = 1 - _normal_cdf(regime)[day_index]  # 0 dry .. 1 wet
+        rain_now = rain > 0
+
+        anomaly = np.interp(day_of_year, np.arange(days) + 0.5, 2.5 * _smooth_noise(rng, days, 3.0))
+        diurnal_amplitude = 5.5 - 2.5 * wet
+        diurnal = np.cos(2 * np.pi * (solar_hour - 15) / 24)
+        temp = (annual_mean + season_amplitude * season + anomaly
+                + diurnal_amplitude * diurnal - 1.5 * wet - 1.5 * rain_now)
+        temp += 0.3 * rng.standard_normal(hours)
+
+        humidity = (55 + 25 * wetness + 15 * monsoon[day_index]
+                    - 10 * diurnal + 12 * rain_now + 4 * rng.standard_normal(hours))
+        clouds = np.where(rain_now, 90 + 10 * rng.random(hours),
+                          100 * np.clip(0.1 + 0.8 * wetness + 0.15 * rng.standard_normal(hours), 0, 1))
+        pressure = 1013 - 0.25 * season_amplitude * season - 4 * wet + 4 * _smooth_noise(rng, hours, 48)
+        wind_speed = np.clip(
+            2.5 + 1.2 * np.abs(_smooth_noise(rng, hours, 12)) + 1.5 * np.maximum(diurnal, 0)
+            + 2.0 * rain_now, 0.3, None,
+        )
+        prevailing = rng.uniform(0, 360)
+        wind_deg = (prevailing + 60 * _smooth_noise(rng, hours, 24)) % 360
+        visibility = np.where(rain_now, 4000 - np.minimum(rain, 8) * 300, 10000)
+        visibility = np.where(~rain_now & (humidity > 90), 6000, visibility)
+
+        return {
+            "temp": np.round(temp, 2),
+            "humidity": np.clip(np.rint(humidity), 12, 100),
+            "pressure": np.rint(pressure),
+            "wind_speed": np.round(wind_speed, 2),
+            "wind_deg": np.rint(wind_deg) % 360,
+            "wind_gust": np.round(wind_speed * (1.3 + 0.3 * wet), 2),
+            "clouds": np.rint(clouds),
+            "rain": rain,
+            "visibility": visibility.astype(np.float64),
+        }
+
+    # Payloads in OpenWeatherMap's format
+
+    @staticmethod
+    def _timezone(lng: float) -> int:
+        return int(round(lng / 15.0)) * SECONDS_PER_HOUR
+
+    @staticmethod
+    def _sun_times(lat: float, lng: float, timestamp: int) -> Tuple[int, int]:
+        """Approximate sunrise and sunset (epoch seconds) for the UTC day of timestamp"""
+        day_start = timestamp - timestamp % 86400
+        day_of_year = datetime.fromtimestamp(timestamp, timezone.utc).timetuple().tm_yday
+        declination = math.radians(23.44) * math.sin(2 * math.pi * (284 + day_of_year) / 365)
+        cos_hour_angle = -math.tan(math.radians(lat)) * math.tan(declination)
+        half_day = math.degrees(math.acos(min(1.0, max(-1.0, cos_hour_angle)))) / 15.0
+        solar_noon = day_start + (12 - lng / 15.0) * SECONDS_PER_HOUR
+        return (int(solar_noon - half_day * SECONDS_PER_HOUR),
+                int(solar_noon + half_day * SECONDS_PER_HOUR))
+
+    def current_payload(self, lat: float, lng: float, timestamp: int,
+                        name: Optional[str] = None) -> Dict[str, Any]:
+        """A /weather response for the hour containing timestamp"""
+        values = {field: float(column[0]) for field, column in self.hourly(lat, lng, timestamp, 1).items()}
+        sunrise, sunset = self._sun_times(lat, lng, timestamp)
+        daytime = sunrise <= timestamp < sunset
+        data: Dict[str, Any] = {
+            "coord": {"lon": lng, "lat": lat},
+            "weather": [self._weather(values, daytime)],
+            "base": "stations",
+            "main": self._main(values),
+            "visibility": int(values["visibility"]),
+            "wind": {"speed": values["wind_speed"], "deg": int(values["wind_deg"]), "gust": values["wind_gust"]},
+            "clouds": {"all": int(values["clouds"])},
+            "dt": int(timestamp),
+            "sys": {"country": "", "sunrise": sunrise, "sunset": sunset},
+            "timezone": self._timezone(lng),
+            "id": 0,
+            "name": name or "",
+            "cod": 200,
+        }
+        if values["rain"] > 0:
+            data["rain"] = {"1h": round(values["rain"], 2)}
+        return data
+
+    def forecast_payload(self, lat: float, lng: float, start: int, cnt: int = 40,
+                         name: Optional[str] = None) -> Dict[str, Any]:
+        """A /forecast response with `cnt` 3-hour slots, the first starting at `start`"""
+        series = self.hourly(lat, lng, start, cnt * 3)
+        slots = {field: column.reshape(cnt, 3) for field, column in series.items()}
+        first = start - start % SECONDS_PER_HOUR
+        items: List[Dict[str, Any]] = []
+        for k in range(cnt):
+            dt = first + k * 3 * SECONDS_PER_HOUR
+            values = {field: float(column[k, 0]) for field, column in slots.items()}
+            rain = float(slots["rain"][k].sum())
+            sunrise, sunset = self._sun_times(lat, lng, dt)
+            main = self._main(values)
+            main["temp_min"] = float(slots["temp"][k].min())
+            main["temp_max"] = float(slots["temp"][k].max())
+            main["temp_kf"] = 0
+            item: Dict[str, Any] = {
+                "dt": dt,
+                "main": main,
+                "weather": [self._weather({**values, "rain": rain / 3}, sunrise <= dt < sunset)],
+                "clouds": {"all": int(values["clouds"])},
+                "wind": {"speed": values["wind_speed"], "deg": int(values["wind_deg"]), "gust": values["wind_gust"]},
+                "visibility": int(values["visibility"]),
+                "pop": round(float((slots["rain"][k] > 0).mean()), 2),
+                "sys": {"pod": "d" if sunrise <= dt < sunset else "n"},
+                "dt_txt": datetime.fromtimestamp(dt, timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
+            }
+            if rain > 0:
+                item["rain"] = {"3h": round(rain, 2)}
+            items.append(item)
+
+        sunrise, sunset = self._sun_times(lat, lng, start)
+        return {
+            "cod": "200",
+            "message": 0,
+            "cnt": cnt,
+            "list": items,
+            "city": {
+                "id": 0,
+                "name": name or "",
+                "coord": {"lat": lat, "lon": lng},
+                "country": "",
+                "population": 0,
+                "timezone": self._timezone(lng),
+                "sunrise": sunrise,
+                "sunset": sunset,
+            },
+        }
+
+    @staticmethod
+    def _main(values: Dict[str, float]) -> Dict[str, Any]:
+        temp, humidity = values["temp"], values["humidity"]
+        # Simple heat-index style adjustment for warm, humid hours
+        feels_like = temp + (0.05 * (humidity - 40) * max(temp - 26, 0) / 4 if temp > 26 else 0)
+        return {
+            "temp": temp,
+            "feels_like": round(feels_like, 2),
+            "temp_min": temp,
+            "temp_max": temp,
+            "pressure": int(values["pressure"]),
+            "humidity": int(humidity),
+            "sea_level": int(values["pressure"]),
+            "grnd_level": int(values["pressure"]) - 25,
+        }
+
+    @staticmethod
+    def _weather(values: Dict[str, float], daytime: bool) -> Dict[str, Any]:
+        condition_id, main, description = _condition(values["rain"], values["clouds"])
+        icon = {800: "01", 801: "02", 802: "03", 803: "04", 804: "04"}.get(condition_id, "10")
+        return {"id": condition_id, "main": main, "description": description,
+                "icon": icon + ("d" if daytime else "n")}
+
+
+# Global synthetic weather instance (seeded from SYNTHETIC_WEATHER_SEED)
+_synthetic_weather: Optional[SyntheticWeather] = None
+
+
+def get_synthetic_weather() -> SyntheticWeather:
+    """Get or create global synthetic weather generator"""
+    global _synthetic_weather
+    if _synthetic_weather is None:
+        _synthetic_weather = SyntheticWeather(seed=int(os.getenv("SYNTHETIC_WEATHER_SEED", "0")))
+    return _synthetic_weather
@@ -2,14 +2,78 @@
 Weather service for agricultural applications using OpenWeatherMap API
 """
 import os
-from typing import Dict, Any, List, Optional
-from datetime import datetime, timedelta, timezone
+import time
+import random
+import asyncio
+from typing import Dict, Any, List, Optional, Tuple, AsyncIterator
+from datetime import date, datetime, timedelta, timezone
 import httpx
+import numpy as np
 
 from dotenv import load_dotenv
 
+from services.http_client import create_async_client
+from services.cache import TTLCache, FRESH, STALE
+from services.singleflight import SingleFlight
+from services.weather_store import WeatherStore
+from services.forecast_aggregation import aggregate_daily
+from services.insight_rules import WEATHER_INSIGHT_RULES
+from services.spatial import SpatialIndex, interpolate_current
+from services.weather_history import WeatherHistory, CROP_BASE_TEMPERATURES
+from services.climatology import build_climatology, daily_statistics, day_of_year, extended_forecast
+from services.resilience import (
+    TokenBucket,
+    CircuitBreaker,
+    CircuitOpenError,
+    LatencyTracker,
+    RateLimitExceeded,
+    INTERACTIVE,
+    BACKGROUND,
+    retry_after_seconds,
+)
+
 load_dotenv()
 
+# Process-wide OpenWeatherMap quota governor and breaker, shared by every
+# caller of the provider (WeatherService and api/routes/weather.py)
+_weather_rate_limiter: Optional[TokenBucket] = None
+_weather_circuit_breaker: Optional[CircuitBreaker] = None
+
+
+def get_weather_rate_limiter() -> TokenBucket:
+    """Get or create the OpenWeatherMap token bucket (WEATHER_API_RATE_LIMIT calls/minute)"""
+    global _weather_rate_limiter
+    if _weather_rate_limiter is None:
+        _weather_rate_limiter = TokenBucket(
+            rate_per_minute=float(os.getenv("WEATHER_API_RATE_LIMIT", "60")),
+            background_reserve=float(os.getenv("WEATHER_API_BACKGROUND_RESERVE", "0.5")),
+            interactive_max_wait=float(os.getenv("WEATHER_API_INTERACTIVE_MAX_WAIT", "2")),
+            background_max_wait=float(os.getenv("WEATHER_API_BACKGROUND_MAX_WAIT", "10")),
+        )
+    return _weather_rate_limiter
+
+
+def get_weather_circuit_breaker() -> CircuitBreaker:
+    """Get or create the OpenWeatherMap circuit breaker"""
+    global _weather_circuit_breaker
+    if _weather_circuit_breaker is None:
+        _weather_circuit_breaker = CircuitBreaker(
+            "openweathermap",
+            failure_threshold=int(os.getenv("WEATHER_BREAKER_FAILURES", "5")),
+            reset_timeout=float(os.getenv("WEATHER_BREAKER_RESET_SECONDS", "30")),
+        )
+    return _weather_circuit_breaker
+
+
+class CityNotFoundError(Exception):
+    """Raised when OpenWeatherMap does not know a city name"""
+
+
+def normalize_city(city: str) -> str:
+    """Cache key for a city query, ignoring case and spacing ("Pune , IN" -> "pune,in")"""
+    return ",".join(" ".join(part.split()) for part in city.split(",")).casefold().strip(",")
+
+
 class WeatherService:
     def __init__(self):
         """Initialize weather service with OpenWeatherMap API"""
@@ -17,42 +81,646 @@ class WeatherService:
         if not self.api_key:
             raise ValueError("OPENWEATHER_API_KEY environment variable is required")
         
-        self.base_url = "https://api.openweathermap.org/data/2.5"
+        # Override to point at a proxy or the local stand-in (benchmarks/owm_standin.py)
+        self.base_url = os.getenv(
+            "OPENWEATHER_BASE_URL", "https://api.openweathermap.org/data/2.5"
+        ).rstrip("/")
         self.timeout = 10.0
+        self._client: Optional[httpx.AsyncClient] = None
+
+        # Responses are cached per grid cell; 0.01 degrees is roughly a 1 km cell.
+        # OpenWeatherMap refreshes its models about every 10 minutes.
+        self.cache_grid = float(os.getenv("WEATHER_CACHE_GRID_DEG", "0.01"))
+        self.cache = TTLCache(
+            max_size=int(os.getenv("WEATHER_CACHE_MAX_ENTRIES", "5000")),
+            ttl=float(os.getenv("WEATHER_CACHE_TTL", "600")),
+            stale_ttl=float(os.getenv("WEATHER_CACHE_STALE_TTL", "300")),
+        )
+        self._refresh_tasks: Dict[Tuple, asyncio.Task] = {}
+        # Concurrent misses for the same cell share one upstream request
+        self._flights = SingleFlight("openweathermap")
+
+        # Batch lookups fan out cache misses under a process-wide cap sized to the quota
+        self.batch_concurrency = int(os.getenv("WEATHER_BATCH_CONCURRENCY", "10"))
+        self.batch_max_locations = int(os.getenv("WEATHER_BATCH_MAX_LOCATIONS", "500"))
+        self._batch_semaphore = asyncio.Semaphore(max(1, self.batch_concurrency))
+
+        # Second-tier cache on disk (SQLite, WAL) shared by workers and restarts;
+        # set WEATHER_CACHE_DB to an empty string to disable it
+        store_path = os.getenv("WEATHER_CACHE_DB", "weather_cache.sqlite3")
+        self.store: Optional[WeatherStore] = None
+        if store_path:
+            self.store = WeatherStore(
+                store_path, max_age=float(os.getenv("WEATHER_CACHE_DB_MAX_AGE", "86400"))
+            )
+
+        # City name -> coordinates (persisted in the store), plus a short-lived
+        # negative cache so repeated unknown names never reach the API
+        self.geocodes = TTLCache(
+            max_size=int(os.getenv("WEATHER_GEOCODE_MAX_ENTRIES", "5000")),
+            ttl=float(os.getenv("WEATHER_GEOCODE_TTL", "2592000")),
+            stale_ttl=0,
+        )
+        self.unknown_cities = TTLCache(
+            max_size=int(os.getenv("WEATHER_GEOCODE_MAX_ENTRIES", "5000")),
+            ttl=float(os.getenv("WEATHER_GEOCODE_NEGATIVE_TTL", "600")),
+            stale_ttl=0,
+        )
+
+        # A miss in a cell with enough fresh cached neighbours nearby is served by
+        # inverse-distance-weighted interpolation instead of an upstream call
+        self.interpolation_enabled = os.getenv("WEATHER_INTERPOLATION_ENABLED", "true").lower() == "true"
+        self.interpolation_radius_km = float(os.getenv("WEATHER_INTERPOLATION_RADIUS_KM", "3"))
+        self.interpolation_min_points = int(os.getenv("WEATHER_INTERPOLATION_MIN_POINTS", "3"))
+        self.interpolation_max_points = int(os.getenv("WEATHER_INTERPOLATION_MAX_POINTS", "8"))
+        self.spatial = SpatialIndex(
+            bucket_deg=max(self.cache_grid, self.interpolation_radius_km / 111.32)
+        )
+        self.interpolations_served = 0
+
+        # Every cached current/forecast payload also feeds an hourly per-cell
+        # history with incremental growing-degree-day and rainfall accumulators
+        self.history_enabled = os.getenv("WEATHER_HISTORY_ENABLED", "true").lower() == "true"
+        self.history = WeatherHistory(
+            max_locations=int(os.getenv("WEATHER_HISTORY_MAX_LOCATIONS", "1000")),
+            max_hours=int(os.getenv("WEATHER_HISTORY_MAX_HOURS", "9600")),
+        )
+
+        # Extended-range forecasts blend the 5-day forecast into day-of-year
+        # climatology built from that history; both are kept per grid cell
+        self.climatologies = TTLCache(
+            max_size=int(os.getenv("WEATHER_HISTORY_MAX_LOCATIONS", "1000")),
+            ttl=float(os.getenv("WEATHER_CLIMATOLOGY_TTL", "21600")),
+            stale_ttl=0,
+        )
+        self.extended_forecasts = TTLCache(
+            max_size=int(os.getenv("WEATHER_CACHE_MAX_ENTRIES", "5000")),
+            ttl=self.cache.ttl,
+            stale_ttl=0,
+        )
+        self.extended_forecast_days = 14
+        self.climatology_decay_days = float(os.getenv("WEATHER_CLIMATOLOGY_DECAY_DAYS", "3"))
+
+        self.rate_limiter = get_weather_rate_limiter()
+        self.circuit_breaker = get_weather_circuit_breaker()
+        self.last_known_good_served = 0
+
+        # Tail latency: bounded retries with jittered backoff, optional hedging
+        # after the endpoint's recent p95, and per-attempt latency per endpoint
+        self.retry_attempts = int(os.getenv("WEATHER_RETRY_ATTEMPTS", "2"))
+        self.retry_backoff = float(os.getenv("WEATHER_RETRY_BACKOFF", "0.2"))
+        self.retry_max_backoff = float(os.getenv("WEATHER_RETRY_MAX_BACKOFF", "2"))
+        self.hedge_enabled = os.getenv("WEATHER_HEDGE_ENABLED", "false").lower() == "true"
+        self.hedge_quantile = float(os.getenv("WEATHER_HEDGE_QUANTILE", "0.95"))
+        self.hedge_min_delay = float(os.getenv("WEATHER_HEDGE_MIN_DELAY", "0.05"))
+        self.hedge_default_delay = float(os.getenv("WEATHER_HEDGE_DEFAULT_DELAY", "1.0"))
+        self.hedge_min_samples = 20
+        self.latency: Dict[str, LatencyTracker] = {}
+        self.retries = 0
+        self.hedges_sent = 0
+        self.hedge_wins = 0
+
+    async def start(self) -> None:
+        """Open the shared keep-alive connection pool and the persistent cache (app lifespan)"""
+        if self._client is None or self._client.is_closed:
+            self._client = create_async_client("WEATHER_HTTP", timeout=self.timeout)
+        if self.store is not None:
+            try:
+                await asyncio.to_thread(self.store.open)
+            except Exception as e:
+                print(f"⚠️ Persistent weather cache disabled: {e}")
+                self.store = None
+
+    async def aclose(self) -> None:
+        """Close the shared connection pool and flush the persistent cache (app shutdown)"""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+        if self.store is not None:
+            await asyncio.to_thread(self.store.close)
+
+    async def _get_client(self) -> httpx.AsyncClient:
+        """Return the pooled client, opening it lazily if lifespan has not run"""
+        if self._client is None or self._client.is_closed:
+            await self.start()
+        return self._client
+
+    async def _get_json(self, path: str, params: Dict[str, Any],
+                        priority: str = INTERACTIVE) -> Dict[str, Any]:
+        """
+        GET an OpenWeatherMap endpoint over the pooled client and decode JSON.
+        Fails fast with CircuitOpenError while the provider is unhealthy and
+        with RateLimitExceeded when no quota token is available in time.
+
+        Network errors and 5xx responses are retried up to WEATHER_RETRY_ATTEMPTS
+        times with jittered exponential backoff (all calls here are idempotent
+        GETs); with WEATHER_HEDGE_ENABLED a slow attempt is hedged (see
+        _hedged_get).
+        """
+        attempts = 1 + max(0, self.retry_attempts)
+        for attempt in range(attempts):
+            last = attempt == attempts - 1
+            if attempt:
+                self.retries += 1
+                # "Full jitter" backoff: spread retries so they do not arrive in waves
+                await asyncio.sleep(random.uniform(
+                    0, min(self.retry_max_backoff, self.retry_backoff * 2 ** (attempt - 1))
+                ))
+            try:
+                response = await self._hedged_get(path, params, priority)
+            except httpx.RequestError:
+                if last:
+                    raise
+                continue
+            if response.status_code >= 500 and not last:
+                continue
+            response.raise_for_status()
+            return response.json()
+
+    async def _hedged_get(self, path: str, params: Dict[str, Any],
+                          priority: str = INTERACTIVE) -> httpx.Response:
+        """
+        One logical request. If hedging is enabled and the first attempt has not
+        answered within the endpoint's recent p95 latency, a second identical
+        request is sent (only when spare, non-reserved quota is available) and
+        the first successful answer wins; the loser is cancelled.
+        """
+        if not self.hedge_enabled:
+            return await self._attempt(path, params, priority)
+
+        primary = asyncio.ensure_future(self._attempt(path, params, priority))
+        tasks = [primary]
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=self._hedge_delay(path))
+            if done or not self.rate_limiter.try_acquire(BACKGROUND):
+                return await primary
+
+            self.hedges_sent += 1
+            hedge = asyncio.ensure_future(self._attempt(path, params, priority, acquired=True))
+            tasks.append(hedge)
+            pending = {primary, hedge}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None and task.result().status_code < 500:
+                        if task is hedge:
+                            self.hedge_wins += 1
+                        return task.result()
+            # Neither attempt succeeded: surface the primary's outcome
+            return primary.result()
+        finally:
+            # The losing attempt, or both if the caller was cancelled while waiting
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def _hedge_delay(self, path: str) -> float:
+        """Hedge after the endpoint's recent p95 latency (a fixed default until warmed up)"""
+        tracker = self.latency.get(path)
+        if tracker is None or len(tracker) < self.hedge_min_samples:
+            return self.hedge_default_delay
+        return max(self.hedge_min_delay, tracker.percentile(self.hedge_quantile))
+
+    async def _attempt(self, path: str, params: Dict[str, Any],
+                       priority: str = INTERACTIVE, acquired: bool = False) -> httpx.Response:
+        """
+        A single upstream call with breaker, quota and latency accounting.
+        `acquired` means the caller already holds a quota token.
+        """
+        if not self.circuit_breaker.allow_request():
+            raise CircuitOpenError("Weather API unavailable - circuit open")
+
+        tracker = self.latency.setdefault(path, LatencyTracker())
+        outcome_recorded = False
+        started = None
+        try:
+            if not acquired:
+                await self.rate_limiter.acquire(priority)
+            client = await self._get_client()
+            started = time.perf_counter()
+            try:
+                response = await client.get(
+                    f"{self.base_url}{path}",
+                    params={**params, "appid": self.api_key, "units": "metric"},
+                )
+            except httpx.RequestError:
+                tracker.record(time.perf_counter() - started, "network_error")
+                self.circuit_breaker.record_failure()
+                outcome_recorded = True
+                raise
+
+            elapsed = time.perf_counter() - started
+            if response.status_code == 429:
+                tracker.record(elapsed, "rate_limited")
+                self.rate_limiter.penalize(retry_after_seconds(response.headers))
+                self.circuit_breaker.record_failure()
+            elif response.status_code >= 500:
+                tracker.record(elapsed, "server_error")
+                self.circuit_breaker.record_failure()
+            else:
+                tracker.record(elapsed, "ok" if response.status_code < 400 else "client_error")
+                self.circuit_breaker.record_success()
+            outcome_recorded = True
+            return response
+        finally:
+            if not outcome_recorded:
+                if started is not None:
+                    # Cancelled while in flight, e.g. the losing side of a hedge
+                    tracker.record(time.perf_counter() - started, "cancelled")
+                self.circuit_breaker.release()
+
+    def grid_cell(self, lat: float, lng: float) -> Tuple[int, int]:
+        """Snap coordinates to the integer index of their cache grid cell"""
+        return (round(lat / self.cache_grid), round(lng / self.cache_grid))
+
+    def _cell_coordinates(self, cell: Tuple[int, int]) -> Tuple[float, float]:
+        """Centre coordinates of a grid cell, used for the upstream query"""
+        return (round(cell[0] * self.cache_grid, 6), round(cell[1] * self.cache_grid, 6))
+
+    async def _get_cached(self, kind: str, path: str, lat: float, lng: float,
+                          params: Optional[Dict[str, Any]] = None,
+                          semaphore: Optional[asyncio.Semaphore] = None,
+                          priority: str = INTERACTIVE) -> Tuple[Dict[str, Any], Optional[float]]:
+        """
+        Return the raw upstream payload for a grid cell, serving from cache when
+        possible. Stale entries are returned immediately and refreshed in the
+        background (stale-while-revalidate). If a semaphore is given, only the
+        upstream fetch on a miss is bounded by it.
+
+        When the upstream call fails (breaker open, quota exhausted, provider
+        error) the last-known-good entry is served if one exists.
+
+        Returns:
+            (payload, age in seconds if last-known-good data was served, else None)
+        """
+        cell = self.grid_cell(lat, lng)
+        key = (kind,) + cell
+        data, state = self.cache.get(key)
+        if state == FRESH:
+            return data, None
+        if state == STALE:
+            self._schedule_refresh(key, path, cell, params)
+            return data, None
+
+        # Memory miss: lazily consult the persistent tier before going upstream
+        persisted = await self._load_persisted(key)
+        if persisted is not None:
+            data, stored_at = persisted
+            self._cache_put(key, data, stored_at)
+            age = time.time() - stored_at
+            if age < self.cache.ttl:
+                return data, None
+            if age < self.cache.ttl + self.cache.stale_ttl:
+                self._schedule_refresh(key, path, cell, params)
+                return data, None
+
+        try:
+            if semaphore is not None:
+                async with semaphore:
+                    return await self._fetch_cell(key, path, cell, params, priority), None
+            return await self._fetch_cell(key, path, cell, params, priority), None
+        except (CircuitOpenError, RateLimitExceeded, httpx.RequestError, httpx.HTTPStatusError):
+            entry = self.cache.peek(key)
+            if entry is None:
+                raise
+            self.last_known_good_served += 1
+            data, stored_at = entry
+            return data, time.time() - stored_at
+
+    async def _fetch_cell(self, key: Tuple, path: str, cell: Tuple[int, int],
+                          params: Optional[Dict[str, Any]] = None,
+                          priority: str = INTERACTIVE,
+                          max_store_age: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Fetch a grid cell from upstream (coalescing concurrent fetches) and cache
+        it in memory and on disk. If max_store_age is given, a persisted entry
+        younger than that (e.g. written by another worker) is used instead.
+        """
+        lat, lng = self._cell_coordinates(cell)
+
+        async def fetch():
+            if max_store_age is not None:
+                persisted = await self._load_persisted(key)
+                if persisted is not None and time.time() - persisted[1] < max_store_age:
+                    self._cache_put(key, persisted[0], persisted[1])
+                    return persisted[0]
+
+            data = await self._get_json(
+                path, {"lat": lat, "lon": lng, **(params or {})}, priority
+            )
+            stored_at = time.time()
+            self._cache_put(key, data, stored_at)
+            if self.store is not None:
+                self.store.put(self._store_key(key), data, stored_at)
+            return data
+
+        return await self._flights.do(key, fetch)
+
+    def _cache_put(self, key: Tuple, data: Dict[str, Any], stored_at: float) -> None:
+        """Insert into the memory cache; current-weather cells are also spatially indexed"""
+        self.cache.set(key, data, stored_at)
+        if key[0] == "current":
+            self.spatial.add(key, *self._cell_coordinates(key[1:]))
+        if self.history_enabled:
+            if key[0] == "current":
+                self.history.record_current(key[1:], data)
+            else:
+                self.history.record_forecast(key[1:], data)
+
+    def _interpolate_current(self, lat: float, lng: float) -> Optional[Dict[str, Any]]:
+        """
+        Formatted current weather interpolated from fresh cached neighbours, or
+        None if the location's own cell is cached or too few neighbours are.
+        Interpolated results are never cached, so they cannot feed further
+        interpolation.
+        """
+        if not self.interpolation_enabled:
+            return None
+        now = time.time()
+        own = self.cache.peek(("current",) + self.grid_cell(lat, lng))
+        if own is not None and now - own[1] < self.cache.ttl + self.cache.stale_ttl:
+            return None
+
+        payloads, distances = [], []
+        for key, distance in self.spatial.nearby(lat, lng, self.interpolation_radius_km):
+            entry = self.cache.peek(key)
+            if entry is None:
+                # Evicted from the cache since it was indexed
+                self.spatial.discard(key)
+                continue
+            if now - entry[1] >= self.cache.ttl:
+                continue
+            payloads.append(entry[0])
+            distances.append(distance)
+            if len(payloads) >= self.interpolation_max_points:
+                break
+        if len(payloads) < max(1, self.interpolation_min_points):
+            return None
+
+        self.interpolations_served += 1
+        result = self._format_current_weather(interpolate_current(lat, lng, payloads, distances))
+        result["interpolated"] = {
+            "method": "inverse_distance_weighting",
+            "points": len(payloads),
+            "max_distance_km": round(max(distances), 2),
+        }
+        return result
+
+    def _store_key(self, key: Tuple) -> str:
+        """Persistent key; includes the grid size so a config change never mixes cells"""
+        return ":".join([str(key[0]), str(self.cache_grid)] + [str(part) for part in key[1:]])
+
+    async def _load_persisted(self, key: Tuple) -> Optional[Tuple[Dict[str, Any], float]]:
+        """Read an entry from the persistent tier without blocking the event loop"""
+        if self.store is None:
+            return None
+        try:
+            return await asyncio.to_thread(self.store.get, self._store_key(key))
+        except Exception as e:
+            print(f"Weather store read failed for {key}: {e}")
+            return None
+
+    @staticmethod
+    def _mark_last_known_good(result: Dict[str, Any], age: Optional[float]) -> Dict[str, Any]:
+        """Flag a formatted response built from last-known-good data"""
+        if age is not None:
+            result["last_known_good"] = True
+            result["data_age_seconds"] = round(age)
+        return result
+
+    def _schedule_refresh(self, key: Tuple, path: str, cell: Tuple[int, int],
+                          params: Optional[Dict[str, Any]] = None) -> None:
+        """Refresh a stale entry in the background, at most once per key"""
+        if key in self._refresh_tasks:
+            return
+
+        async def refresh():
+            try:
+                await self._fetch_cell(
+                    key, path, cell, params, BACKGROUND, max_store_age=self.cache.ttl
+                )
+            except Exception as e:
+                print(f"Background weather refresh failed for {key}: {e}")
+            finally:
+                self._refresh_tasks.pop(key, None)
+
+        self._refresh_tasks[key] = asyncio.create_task(refresh())
+
+    async def get_agro_metrics(self, lat: float, lng: float, crop: Optional[str] = None,
+                               base_temperature: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Accumulated growing degree days, chill hours and rainfall for a location.
+
+        Refreshes the location's current weather and forecast first (usually
+        from cache) so the latest hour is included; the accumulators only
+        cover hours recorded since the location was first requested.
+        """
+        if not self.history_enabled:
+            raise ValueError("Weather history is disabled (WEATHER_HISTORY_ENABLED=false)")
+        if crop is not None and crop.lower() not in CROP_BASE_TEMPERATURES:
+            raise ValueError(
+                f"Unknown crop '{crop}'; known crops: {', '.join(sorted(CROP_BASE_TEMPERATURES))}"
+            )
+
+        await self.get_weather_payloads(lat, lng)
+        if base_temperature is None and crop is not None:
+            base_temperature = CROP_BASE_TEMPERATURES[crop.lower()]
+        bases = [] if base_temperature is None else [float(base_temperature)]
+
+        metrics = self.history.metrics(self.grid_cell(lat, lng), bases)
+        if bases:
+            metrics["gdd"] = {
+                "base_temperature": bases[0],
+                "value": metrics["growing_degree_days"][str(bases[0])],
+            }
+        return {
+            "location": {"lat": lat, "lng": lng},
+            "crop": crop.lower() if crop else None,
+            **metrics,
+        }
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Cache counters for monitoring"""
+        return {
+            **self.cache.stats(),
+            "grid_degrees": self.cache_grid,
+            "refreshes_in_flight": len(self._refresh_tasks),
+            "persistent": self.store.stats() if self.store is not None else None,
+            "interpolation": {
+                "enabled": self.interpolation_enabled,
+                "radius_km": self.interpolation_radius_km,
+                "indexed_cells": len(self.spatial),
+                "served": self.interpolations_served,
+            },
+            "history": {"enabled": self.history_enabled, **self.history.stats()},
+            "climatology": {
+                "entries": len(self.climatologies),
+                "extended_forecasts": len(self.extended_forecasts),
+            },
+            "geocode": {
+                "entries": len(self.geocodes),
+                "hits": self.geocodes.hits,
+                "misses": self.geocodes.misses,
+                "negative_entries": len(self.unknown_cities),
+                "negative_hits": self.unknown_cities.hits,
+            },
+        }
+
+    def flight_stats(self) -> Dict[str, Any]:
+        """Request coalescing counters for monitoring"""
+        return self._flights.stats()
+
+    def upstream_stats(self) -> Dict[str, Any]:
+        """Quota governor and circuit breaker state for /health"""
+        return {
+            "rate_limiter": self.rate_limiter.stats(),
+            "circuit_breaker": self.circuit_breaker.stats(),
+            "last_known_good_served": self.last_known_good_served,
+            "retries": self.retries,
+            "hedging": {
+                "enabled": self.hedge_enabled,
+                "sent": self.hedges_sent,
+                "won": self.hedge_wins,
+            },
+            "latency": {path: tracker.stats() for path, tracker in self.latency.items()},
+        }
     
-    async def get_current_weather(self, lat: float, lng: float) -> Dict[str, Any]:
+    async def get_current_weather(self, lat: float, lng: float,
+                                  priority: str = INTERACTIVE) -> Dict[str, Any]:
         """
         Get current weather conditions for given coordinates
         
         Args:
             lat: Latitude
             lng: Longitude
+            priority: Quota class, INTERACTIVE or BACKGROUND
         
         Returns:
             Dict with current weather data
         """
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(
-                    f"{self.base_url}/weather",
-                    params={
-                        "lat": lat,
-                        "lon": lng,
-                        "appid": self.api_key,
-                        "units": "metric"
-                    }
-                )
-                response.raise_for_status()
-                data = response.json()
-                
-                return self._format_current_weather(data)
-                
+            interpolated = self._interpolate_current(lat, lng)
+            if interpolated is not None:
+                return interpolated
+            data, lkg_age = await self._get_cached(
+                "current", "/weather", lat, lng, priority=priority
+            )
+            return self._mark_last_known_good(self._format_current_weather(data), lkg_age)
+
         except httpx.RequestError as e:
             raise Exception(f"Weather API request failed: {str(e)}")
         except httpx.HTTPStatusError as e:
             raise Exception(f"Weather API error: {e.response.status_code}")
     
-    async def get_weather_forecast(self, lat: float, lng: float, days: int = 5) -> Dict[str, Any]:
+    async def prefetch_location(self, lat: float, lng: float,
+                                min_age: Optional[float] = None) -> int:
+        """
+        Refresh current weather and forecast for a location ahead of expiry,
+        using the BACKGROUND quota class. Entries younger than `min_age`
+        seconds (default: half the cache TTL) are left alone.
+
+        Returns:
+            Number of cache entries refreshed
+        """
+        min_age = self.cache.ttl * 0.5 if min_age is None else min_age
+        cell = self.grid_cell(lat, lng)
+        fetched = 0
+        for kind, path, params in (("current", "/weather", None),
+                                   ("forecast", "/forecast", {"cnt": 40})):
+            key = (kind,) + cell
+            entry = self.cache.peek(key)
+            if entry is not None and time.time() - entry[1] < min_age:
+                continue
+            await self._fetch_cell(key, path, cell, params, BACKGROUND, max_store_age=min_age)
+            fetched += 1
+        return fetched
+
+    async def iter_current_weather_batch(
+        self, locations: List[Tuple[float, float]]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Get current weather for many coordinates, yielding one result per input
+        location as soon as its grid cell completes.
+
+        Locations in the same grid cell share one lookup; cache misses are
+        fetched concurrently, bounded by WEATHER_BATCH_CONCURRENCY.
+
+        Args:
+            locations: List of (lat, lng) tuples
+
+        Yields:
+            Dicts with index, lat, lng, status and either weather or error
+        """
+        if len(locations) > self.batch_max_locations:
+            raise ValueError(f"Maximum {self.batch_max_locations} locations per batch")
+
+        # Group input indexes by grid cell so each cell is looked up once
+        cells: Dict[Tuple[int, int], List[int]] = {}
+        for index, (lat, lng) in enumerate(locations):
+            cells.setdefault(self.grid_cell(lat, lng), []).append(index)
+
+        async def load(cell: Tuple[int, int]):
+            lat, lng = self._cell_coordinates(cell)
+            try:
+                interpolated = self._interpolate_current(lat, lng)
+                if interpolated is not None:
+                    return cell, interpolated, None
+                data, lkg_age = await self._get_cached(
+                    "current", "/weather", lat, lng, semaphore=self._batch_semaphore
+                )
+                weather = self._mark_last_known_good(self._format_current_weather(data), lkg_age)
+                return cell, weather, None
+            except httpx.RequestError as e:
+                return cell, None, f"Weather API request failed: {str(e)}"
+            except httpx.HTTPStatusError as e:
+                return cell, None, f"Weather API error: {e.response.status_code}"
+            except Exception as e:
+                return cell, None, str(e)
+
+        tasks = [asyncio.ensure_future(load(cell)) for cell in cells]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                cell, weather, error = await next_done
+                for index in cells[cell]:
+                    lat, lng = locations[index]
+                    result = {"index": index, "lat": lat, "lng": lng}
+                    if error is None:
+                        result.update({"status": "ok", "weather": weather})
+                    else:
+                        result.update({"status": "error", "error": error})
+                    yield result
+        finally:
+            # Stop outstanding lookups if the consumer goes away (e.g. client disconnect)
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def get_current_weather_batch(
+        self, locations: List[Tuple[float, float]]
+    ) -> Dict[str, Any]:
+        """
+        Get current weather for many coordinates in one call
+
+        Args:
+            locations: List of (lat, lng) tuples
+
+        Returns:
+            Dict with results in input order
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(locations)
+        async for result in self.iter_current_weather_batch(locations):
+            results[result["index"]] = result
+
+        return {
+            "results": results,
+            "count": len(results),
+            "unique_locations": len({self.grid_cell(lat, lng) for lat, lng in locations}),
+            "errors": sum(1 for r in results if r and r["status"] == "error"),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        }
+
+    async def get_weather_forecast(self, lat: float, lng: float, days: int = 5,
+                                   priority: str = INTERACTIVE) -> Dict[str, Any]:
         """
         Get weather forecast for given coordinates
         
@@ -60,61 +728,233 @@ class WeatherService:
             lat: Latitude
             lng: Longitude
             days: Number of days (max 5 for free tier)
+            priority: Quota class, INTERACTIVE or BACKGROUND
         
         Returns:
             Dict with forecast data
         """
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(
-                    f"{self.base_url}/forecast",
-                    params={
-                        "lat": lat,
-                        "lon": lng,
-                        "appid": self.api_key,
-                        "units": "metric",
-                        "cnt": min(days * 8, 40)  # 8 forecasts per day, max 40
-                    }
-                )
-                response.raise_for_status()
-                data = response.json()
-                
-                return self._format_forecast(data, days)
-                
+            # Always fetch the full 40 slots (8 per day) so one cache entry
+            # serves every `days` value; formatting trims to the requested days
+            data, lkg_age = await self._get_cached(
+                "forecast", "/forecast", lat, lng, {"cnt": 40}, priority=priority
+            )
+            return self._mark_last_known_good(self._format_forecast(data, days), lkg_age)
+
         except httpx.RequestError as e:
             raise Exception(f"Weather forecast API request failed: {str(e)}")
         except httpx.HTTPStatusError as e:
             raise Exception(f"Weather forecast API error: {e.response.status_code}")
-    
+
+    async def get_extended_forecast(self, lat: float, lng: float, days: int,
+                                    priority: str = INTERACTIVE) -> List[Dict[str, Any]]:
+        """
+        Daily forecast up to 14 days ahead for given coordinates.
+
+        The first days come from the 5-day forecast; later days blend its last
+        days into the cell's day-of-year climatology (see services/climatology).
+        The full horizon is built once per cell and local date and served from
+        memory until the forecast cache entry would expire.
+
+        Returns:
+            List of daily dicts with date, temperature_max/min, humidity,
+            weather, rainfall (mm), wind_speed (km/h) and source
+        """
+        _, _, built = await self._extended_horizon(lat, lng, priority)
+        return built[:days]
+
+    async def _extended_horizon(self, lat: float, lng: float,
+                                priority: str = INTERACTIVE) -> Tuple[date, int, List[Dict[str, Any]]]:
+        """(local date, UTC offset in seconds, full extended forecast) for a cell"""
+        cell = self.grid_cell(lat, lng)
+        cached, state = self.extended_forecasts.get(cell)
+        if state == FRESH:
+            built_for, tz_offset, built = cached
+            if self._local_date(tz_offset) == built_for:
+                return cached
+
+        data, lkg_age = await self._get_cached(
+            "forecast", "/forecast", lat, lng, {"cnt": 40}, priority=priority
+        )
+        tz_offset = data.get("city", {}).get("timezone", 0)
+        today = self._local_date(tz_offset)
+        daily = [day for day in aggregate_daily([data], 6)[0] if day["date"] >= today.isoformat()]
+
+        built = extended_forecast(
+            daily, self._climatology(cell, tz_offset), today,
+            self.extended_forecast_days, self.climatology_decay_days,
+        )
+        if lkg_age is None:
+            self.extended_forecasts.set(cell, (today, tz_offset, built))
+        return today, tz_offset, built
+
+    async def get_daily_temperatures(self, lat: float, lng: float, start: date, days: int,
+                                     priority: str = INTERACTIVE) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Daily mean temperatures for `days` days from `start`.
+
+        Past days come from the recorded history, the next 14 from the
+        extended forecast and anything else from the cell's climatology.
+        If the forecast is unavailable, history and climatology are used alone.
+
+        Returns:
+            (temperatures in °C with NaN where nothing is known, source per day:
+            "history", "forecast", "blended", "persistence", "climatology" or "")
+        """
+        cell = self.grid_cell(lat, lng)
+        temperatures = np.full(days, np.nan)
+        sources = np.full(days, "", dtype=object)
+        try:
+            today, tz_offset, outlook = await self._extended_horizon(lat, lng, priority)
+        except Exception as e:
+            print(f"Extended forecast unavailable for {cell}, using history only: {e}")
+            tz_offset, outlook = 0, []
+            today = self._local_date(0)
+        start_day = (np.datetime64(start, "D") - np.datetime64(0, "D")).astype(np.int64)
+        today_day = (np.datetime64(today, "D") - np.datetime64(0, "D")).astype(np.int64)
+
+        series = self.history.series(cell) if self.history_enabled else None
+        if series is not None and len(series):
+            recorded, daily = daily_statistics(*series.arrays(), tz_offset=tz_offset)
+            index = recorded - start_day
+            keep = (index >= 0) & (index < days) & (recorded < today_day)
+            temperatures[index[keep]] = daily["temperature_mean"][keep]
+            sources[index[keep]] = "history"
+
+        for day in outlook:
+            index = (date.fromisoformat(day["date"]) - start).days
+            if 0 <= index < days and np.isnan(temperatures[index]):
+                temperatures[index] = (day["temperature_max"] + day["temperature_min"]) / 2
+                sources[index] = day["source"]
+
+        missing = np.flatnonzero(np.isnan(temperatures))
+        climatology = self._climatology(cell, tz_offset) if missing.size else None
+        if climatology is not None:
+            rows = day_of_year(np.datetime64(start, "D") + missing)
+            known = climatology.days_observed[rows] > 0
+            temperatures[missing[known]] = climatology.normals["temperature_mean"][rows[known]]
+            sources[missing[known]] = "climatology"
+        return temperatures, sources
+
+    @staticmethod
+    def _local_date(tz_offset: int):
+        return (datetime.now(timezone.utc) + timedelta(seconds=tz_offset)).date()
+
+    def _climatology(self, cell: Tuple[int, int], tz_offset: int):
+        """Day-of-year climatology for a cell, rebuilt from its history when expired"""
+        climatology, state = self.climatologies.get((cell, tz_offset))
+        if state == FRESH:
+            return climatology
+        series = self.history.series(cell) if self.history_enabled else None
+        if series is None or len(series) == 0:
+            return None
+        climatology = build_climatology(*series.arrays(), tz_offset=tz_offset)
+        self.climatologies.set((cell, tz_offset), climatology)
+        return climatology
+
+    async def get_weather_payloads(self, lat: float, lng: float,
+                                   priority: str = INTERACTIVE) -> Dict[str, Any]:
+        """
+        Get the raw current-weather and 5-day forecast payloads for a location,
+        fetched concurrently through the shared cache (for callers that format
+        OpenWeatherMap data themselves, e.g. api/routes/weather.py).
+
+        Returns:
+            Dict with `current` and `forecast` payloads and `data_age_seconds`
+            (age of the oldest last-known-good payload served, else None)
+
+        Raises:
+            CircuitOpenError, RateLimitExceeded, httpx errors: if either payload
+            is unavailable and nothing cached can stand in
+        """
+        (current, current_age), (forecast, forecast_age) = await asyncio.gather(
+            self._get_cached("current", "/weather", lat, lng, priority=priority),
+            self._get_cached("forecast", "/forecast", lat, lng, {"cnt": 40}, priority=priority),
+        )
+        ages = [age for age in (current_age, forecast_age) if age is not None]
+        return {
+            "current": current,
+            "forecast": forecast,
+            "data_age_seconds": round(max(ages)) if ages else None,
+        }
+
     async def get_weather_by_city(self, city: str) -> Dict[str, Any]:
         """
-        Get current weather by city name
+        Get current weather by city name. The name is resolved to coordinates
+        once (cached in memory and on disk), then served from the same grid-cell
+        cache as coordinate lookups.
         
         Args:
-            city: City name
+            city: City name, optionally with state/country code ("Pune,IN")
         
         Returns:
             Dict with current weather data
+
+        Raises:
+            CityNotFoundError: If OpenWeatherMap does not know the city
+        """
+        lat, lng = await self.geocode_city(city)
+        return await self.get_current_weather(lat, lng)
+
+    async def geocode_city(self, city: str, priority: str = INTERACTIVE) -> Tuple[float, float]:
+        """
+        Resolve a city name to (lat, lng). Unknown names are remembered for
+        WEATHER_GEOCODE_NEGATIVE_TTL seconds and fail fast with CityNotFoundError.
+        A lookup that needs the API uses the `priority` quota class.
+        """
+        query = normalize_city(city)
+        if not query:
+            raise CityNotFoundError("City name is empty")
+
+        coordinates, state = self.geocodes.get(query)
+        if state == FRESH:
+            return coordinates
+        if self.unknown_cities.get(query)[1] == FRESH:
+            raise CityNotFoundError(f"City not found: {city}")
+
+        if self.store is not None:
+            try:
+                persisted = await asyncio.to_thread(self.store.get_geocode, query)
+            except Exception as e:
+                print(f"Weather store read failed for geocode {query!r}: {e}")
+                persisted = None
+            if persisted is not None:
+                coordinates = (persisted[0], persisted[1])
+                self.geocodes.set(query, coordinates)
+                return coordinates
+
+        return await self._flights.do(("geocode", query), lambda: self._lookup_city(query, priority))
+
+    async def _lookup_city(self, query: str, priority: str = INTERACTIVE) -> Tuple[float, float]:
+        """
+        Resolve a city with one /weather?q= call. The response carries the
+        coordinates and is also a current-weather payload, so it seeds the
+        grid-cell cache and the follow-up lookup costs no extra API call.
         """
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(
-                    f"{self.base_url}/weather",
-                    params={
-                        "q": city,
-                        "appid": self.api_key,
-                        "units": "metric"
-                    }
-                )
-                response.raise_for_status()
-                data = response.json()
-                
-                return self._format_current_weather(data)
-                
-        except httpx.RequestError as e:
-            raise Exception(f"Weather API request failed: {str(e)}")
+            data = await self._get_json("/weather", {"q": query}, priority)
         except httpx.HTTPStatusError as e:
+            if e.response.status_code in (400, 404):
+                self.unknown_cities.set(query, True)
+                raise CityNotFoundError(f"City not found: {query}") from e
             raise Exception(f"Weather API error: {e.response.status_code}")
+        except httpx.RequestError as e:
+            raise Exception(f"Weather API request failed: {str(e)}")
+
+        coord = data.get("coord", {})
+        if coord.get("lat") is None or coord.get("lon") is None:
+            self.unknown_cities.set(query, True)
+            raise CityNotFoundError(f"City not found: {query}")
+        coordinates = (coord["lat"], coord["lon"])
+        self.geocodes.set(query, coordinates)
+
+        stored_at = time.time()
+        key = ("current",) + self.grid_cell(*coordinates)
+        self._cache_put(key, data, stored_at)
+        if self.store is not None:
+            self.store.put_geocode(query, coordinates[0], coordinates[1], data.get("name"))
+            self.store.put(self._store_key(key), data, stored_at)
+        return coordinates
     
     def _format_current_weather(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Format current weather data for agricultural use"""
@@ -129,8 +969,7 @@ class WeatherService:
             temperature=main.get("temp", 0),
             humidity=main.get("humidity", 0),
             wind_speed=wind.get("speed", 0),
-            weather_condition=weather.get("main", "").lower(),
-            pressure=main.get("pressure", 0)
+            weather_condition=weather.get("main", "").lower()
         )
         
         # Convert wind speed from m/s to km/h for friendlier display
@@ -182,138 +1021,57 @@ class WeatherService:
     
     def _format_forecast(self, data: Dict[str, Any], days: int) -> Dict[str, Any]:
         """Format forecast data for agricultural use"""
-        forecasts = []
-        tz_offset = data.get("city", {}).get("timezone", 0)  # seconds offset from UTC
-        
-        # Group forecasts by day
-        daily_forecasts = {}
-        for item in data.get("list", []):
-            # Apply city timezone offset then convert to local (date only)
-            date = datetime.utcfromtimestamp(item["dt"] + tz_offset).date()
-            if date not in daily_forecasts:
-                daily_forecasts[date] = []
-            daily_forecasts[date].append(item)
-        
-        # Process each day
-        for date, day_forecasts in list(daily_forecasts.items())[:days]:
-            # Calculate daily aggregates
-            temps = [item["main"]["temp"] for item in day_forecasts]
-            humidity_vals = [item["main"]["humidity"] for item in day_forecasts]
-            
-            # Most common weather condition
-            conditions = [item["weather"][0]["main"] for item in day_forecasts]
-            main_condition = max(set(conditions), key=conditions.count)
-            
-            # Check for precipitation
-            precipitation = sum(item.get("rain", {}).get("3h", 0) + 
-                             item.get("snow", {}).get("3h", 0) for item in day_forecasts)
-            
-            # Average wind speed in km/h (values are m/s in API)
-            avg_wind_ms = sum(item["wind"]["speed"] for item in day_forecasts) / len(day_forecasts)
-            avg_wind_kmh = round(avg_wind_ms * 3.6, 1)
-
-            daily_forecast = {
-                "date": date.isoformat(),
-                "temperature": {
-                    "min": min(temps),
-                    "max": max(temps),
-                    "avg": sum(temps) / len(temps)
-                },
-                "humidity": {
-                    "min": min(humidity_vals),
-                    "max": max(humidity_vals),
-                    "avg": sum(humidity_vals) / len(humidity_vals)
+        return self.format_forecasts([data], days)[0]
+
+    def format_forecasts(self, payloads: List[Dict[str, Any]], days: int) -> List[Dict[str, Any]]:
+        """
+        Format many forecast payloads at once. Daily aggregation for all
+        locations is done in one vectorized pass (see forecast_aggregation).
+        """
+        timestamp = datetime.now(timezone.utc).isoformat()
+        formatted = []
+        daily = aggregate_daily(payloads, days)
+
+        # Agricultural insights for every day of every location in one rule pass
+        days_flat = [day for forecasts in daily for day in forecasts]
+        insights = WEATHER_INSIGHT_RULES.evaluate({
+            "temperature": [day["temperature"]["avg"] for day in days_flat],
+            "humidity": [day["humidity"]["avg"] for day in days_flat],
+            "wind_speed": [day["wind_speed"] for day in days_flat],
+            "weather_condition": [day["condition"].lower() for day in days_flat],
+            "precipitation": [day["precipitation"] for day in days_flat],
+        })
+        for daily_forecast, day_insights in zip(days_flat, insights):
+            daily_forecast["agricultural_insights"] = day_insights
+
+        for data, forecasts in zip(payloads, daily):
+            city = data.get("city", {})
+            formatted.append({
+                "location": {
+                    "name": city.get("name", "Unknown"),
+                    "country": city.get("country", ""),
+                    "coordinates": {
+                        "lat": city.get("coord", {}).get("lat"),
+                        "lng": city.get("coord", {}).get("lon")
+                    }
                 },
-                "condition": main_condition,
-                "description": day_forecasts[0]["weather"][0]["description"],
-                "precipitation": precipitation,
-                "wind_speed": avg_wind_kmh  # km/h
-            }
-            
-            # Add agricultural insights for the day
-            daily_forecast["agricultural_insights"] = self._get_agricultural_insights(
-                temperature=daily_forecast["temperature"]["avg"],
-                humidity=daily_forecast["humidity"]["avg"],
-                wind_speed=daily_forecast["wind_speed"],
-                weather_condition=main_condition.lower(),
-                precipitation=precipitation
-            )
-            
-            forecasts.append(daily_forecast)
-        
-        return {
-            "location": {
-                "name": data.get("city", {}).get("name", "Unknown"),
-                "country": data.get("city", {}).get("country", ""),
-                "coordinates": {
-                    "lat": data.get("city", {}).get("coord", {}).get("lat"),
-                    "lng": data.get("city", {}).get("coord", {}).get("lon")
-                }
-            },
-            "forecast": forecasts,
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-            "data_source": "OpenWeatherMap"
-        }
+                "forecast": forecasts,
+                "timestamp": timestamp,
+                "data_source": "OpenWeatherMap"
+            })
+        return formatted
     
     def _get_agricultural_insights(self, temperature: float, humidity: float, 
                                  wind_speed: float, weather_condition: str,
-                                 pressure: float = None, precipitation: float = 0) -> Dict[str, Any]:
-        """Generate agricultural insights based on weather conditions"""
-        insights = {
-            "irrigation_recommendation": "normal",
-            "field_work_suitability": "suitable",
-            "disease_risk": "low",
-            "recommendations": [],
-            "alerts": []
-        }
-        
-        # Temperature-based recommendations
-        if temperature < 5:
-            insights["alerts"].append("Frost risk - protect sensitive crops")
-            insights["field_work_suitability"] = "poor"
-        elif temperature > 35:
-            insights["alerts"].append("Heat stress risk - ensure adequate irrigation")
-            insights["irrigation_recommendation"] = "high"
-        elif temperature > 30:
-            insights["irrigation_recommendation"] = "increased"
-        
-        # Humidity-based recommendations
-        if humidity > 80:
-            insights["disease_risk"] = "high"
-            insights["recommendations"].append("High humidity increases fungal disease risk")
-        elif humidity < 30:
-            insights["irrigation_recommendation"] = "increased"
-            insights["recommendations"].append("Low humidity may require additional watering")
-        
-        # Wind-based recommendations
-        if wind_speed > 10:
-            insights["field_work_suitability"] = "poor"
-            insights["recommendations"].append("Strong winds - avoid spraying operations")
-        elif wind_speed > 5:
-            insights["recommendations"].append("Moderate winds - good for drying conditions")
-        
-        # Weather condition based recommendations
-        if "rain" in weather_condition:
-            insights["irrigation_recommendation"] = "reduced"
-            insights["field_work_suitability"] = "poor"
-            if precipitation > 10:
-                insights["alerts"].append("Heavy rainfall - check for waterlogging")
-        elif "snow" in weather_condition:
-            insights["field_work_suitability"] = "unsuitable"
-            insights["alerts"].append("Snow conditions - protect crops if needed")
-        elif "clear" in weather_condition or "sun" in weather_condition:
-            insights["recommendations"].append("Clear weather - good for field operations")
-        
-        # Combined conditions
-        if temperature > 25 and humidity > 70:
-            insights["disease_risk"] = "high"
-            insights["recommendations"].append("Hot and humid - monitor for pest and disease activity")
-        
-        if temperature < 10 and humidity > 80:
-            insights["disease_risk"] = "medium"
-            insights["recommendations"].append("Cool and humid - watch for fungal diseases")
-        
-        return insights
+                                 precipitation: float = 0) -> Dict[str, Any]:
+        """Generate agricultural insights based on weather conditions (see insight_rules)"""
+        return WEATHER_INSIGHT_RULES.evaluate_one(
+            temperature=temperature,
+            humidity=humidity,
+            wind_speed=wind_speed,
+            weather_condition=weather_condition,
+            precipitation=precipitation,
+        )
 
 # Global weather service instance
 weather_service = None
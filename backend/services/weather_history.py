@@ -0,0 +1,242 @@
+"""
+Per-location hourly weather history with incremental agronomic accumulators.
+
+Every current-weather and forecast payload that passes through the weather
+cache is folded into an hourly series for its grid cell. Observations
+override forecast values for the same hour; an hour becomes final once it is
+in the past and is then appended to NumPy-backed arrays. Accumulators
+(growing degree days per base temperature, chill hours, rolling and total
+rainfall) are updated once per finalized hour, so reading them never rescans
+the history.
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional, Tuple
+
+import numpy as np
+
+SECONDS_PER_HOUR = 3600
+
+# Base temperatures (°C) for growing degree days
+CROP_BASE_TEMPERATURES = {
+    "wheat": 0.0,
+    "barley": 0.0,
+    "potato": 7.0,
+    "rice": 10.0,
+    "maize": 10.0,
+    "soybean": 10.0,
+    "tomato": 10.0,
+    "sugarcane": 12.0,
+    "cotton": 15.5,
+}
+
+# Rolling rainfall windows in hours
+RAIN_WINDOWS = {"24h": 24, "7d": 168, "30d": 720}
+
+# Chill hours: hours spent between 0 and 7.2 °C
+CHILL_MIN, CHILL_MAX = 0.0, 7.2
+
+# Pending-sample priority: observations always replace forecast values
+_FORECAST, _OBSERVED = 0, 1
+
+
+class HourlySeries:
+    """Append-only hourly series for one location, with O(1) accumulator updates"""
+
+    def __init__(self, base_temperatures: Iterable[float] = (), max_hours: int = 24 * 400):
+        self.max_hours = max_hours
+        self._hours = np.empty(256, dtype=np.int64)
+        self._values = np.empty((256, 4), dtype=np.float64)  # temp, humidity, rain, wind
+        self._size = 0
+        # hour -> (priority, temp, humidity, rain, wind) for hours not yet final
+        self._pending: Dict[int, Tuple[int, float, float, float, float]] = {}
+
+        self.gdd: Dict[float, float] = {float(base): 0.0 for base in base_temperatures}
+        self.chill_hours = 0
+        self.rain_total = 0.0
+        self.rain_window = {name: 0.0 for name in RAIN_WINDOWS}
+        self._window_start = {name: 0 for name in RAIN_WINDOWS}  # oldest index in each window
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def last_hour(self) -> Optional[int]:
+        return int(self._hours[self._size - 1]) if self._size else None
+
+    def add(self, hour: int, temperature: float, humidity: Optional[float] = None,
+            rain: float = 0.0, wind: Optional[float] = None, observed: bool = True) -> None:
+        """Record a value for an hour that is not final yet"""
+        last = self.last_hour
+        if last is not None and hour <= last:
+            return
+        priority = _OBSERVED if observed else _FORECAST
+        existing = self._pending.get(hour)
+        if existing is not None and existing[0] > priority:
+            return
+        humidity = float("nan") if humidity is None else float(humidity)
+        wind = float("nan") if wind is None else float(wind)
+        self._pending[hour] = (priority, float(temperature), humidity, float(rain or 0.0), wind)
+
+    def finalize(self, now_hour: int) -> int:
+        """Append every pending hour before now_hour, in order; returns how many"""
+        ready = sorted(hour for hour in self._pending if hour < now_hour)
+        for hour in ready:
+            _, temperature, humidity, rain, wind = self._pending.pop(hour)
+            self._append(hour, temperature, humidity, rain, wind)
+        return len(ready)
+
+    def _append(self, hour: int, temperature: float, humidity: float, rain: float,
+                wind: float) -> None:
+        if self._size == len(self._hours):
+            self._grow()
+        index = self._size
+        self._hours[index] = hour
+        self._values[index] = (temperature, humidity, rain, wind)
+        self._size += 1
+
+        # Hourly degree-hours / 24 = growing degree days
+        for base in self.gdd:
+            if temperature > base:
+                self.gdd[base] += (temperature - base) / 24.0
+        if CHILL_MIN <= temperature <= CHILL_MAX:
+            self.chill_hours += 1
+        self.rain_total += rain
+        for name, hours in RAIN_WINDOWS.items():
+            self.rain_window[name] += rain
+            start = self._window_start[name]
+            while self._hours[start] <= hour - hours:
+                self.rain_window[name] -= float(self._values[start, 2])
+                start += 1
+            self._window_start[name] = start
+
+    def _grow(self) -> None:
+        """Double capacity, first dropping samples older than max_hours and no window needs"""
+        keep_from = min(min(self._window_start.values()),
+                        max(0, self._size - self.max_hours))
+        if keep_from > 0:
+            self._hours[:self._size - keep_from] = self._hours[keep_from:self._size]
+            self._values[:self._size - keep_from] = self._values[keep_from:self._size]
+            self._size -= keep_from
+            for name in self._window_start:
+                self._window_start[name] -= keep_from
+        if self._size == len(self._hours):
+            self._hours = np.resize(self._hours, len(self._hours) * 2)
+            self._values = np.resize(self._values, (len(self._values) * 2, 4))
+
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Retained hours and their (temp, humidity, rain, wind) rows; read-only views"""
+        hours = self._hours[:self._size].view()
+        values = self._values[:self._size].view()
+        hours.flags.writeable = values.flags.writeable = False
+        return hours, values
+
+    def growing_degree_days(self, base: float) -> float:
+        """
+        GDD for a base temperature: the accumulator if the base is tracked,
+        otherwise computed from the retained history without being stored
+        """
+        base = float(base)
+        if base in self.gdd:
+            return self.gdd[base]
+        temperatures = self._values[:self._size, 0]
+        return float(np.clip(temperatures - base, 0, None).sum() / 24.0)
+
+    def metrics(self, base_temperatures: Iterable[float] = ()) -> Dict[str, Any]:
+        """Accumulated metrics; base_temperatures adds GDD for untracked bases to this result only"""
+        first = int(self._hours[0]) if self._size else None
+        gdd = dict(self.gdd)
+        for base in base_temperatures:
+            gdd[float(base)] = self.growing_degree_days(base)
+        return {
+            "hours_recorded": self._size,
+            "first_hour": _iso_hour(first),
+            "last_hour": _iso_hour(self.last_hour),
+            "growing_degree_days": {
+                str(base): round(value, 2) for base, value in sorted(gdd.items())
+            },
+            "chill_hours": self.chill_hours,
+            "rainfall_mm": {
+                **{name: round(max(float(value), 0.0), 2) for name, value in self.rain_window.items()},
+                "total": round(self.rain_total, 2),
+            },
+            "pending_hours": len(self._pending),
+        }
+
+
+def _iso_hour(hour: Optional[int]) -> Optional[str]:
+    if hour is None:
+        return None
+    return np.datetime64(hour * SECONDS_PER_HOUR, "s").astype(str) + "Z"
+
+
+class WeatherHistory:
+    """Hourly series per location (grid cell), bounded to the most recently updated ones"""
+
+    def __init__(self, max_locations: int = 1000, max_hours: int = 24 * 400):
+        self.max_locations = max(1, max_locations)
+        self.max_hours = max_hours
+        self._series: "OrderedDict[Hashable, HourlySeries]" = OrderedDict()
+
+    def _get(self, location: Hashable) -> HourlySeries:
+        series = self._series.get(location)
+        if series is None:
+            series = HourlySeries(set(CROP_BASE_TEMPERATURES.values()), self.max_hours)
+            self._series[location] = series
+            while len(self._series) > self.max_locations:
+                self._series.popitem(last=False)
+        self._series.move_to_end(location)
+        return series
+
+    def record_current(self, location: Hashable, data: Dict[str, Any]) -> None:
+        """Fold an OpenWeatherMap /weather payload in as an observation"""
+        main = data.get("main") or {}
+        if "dt" not in data or not isinstance(main.get("temp"), (int, float)):
+            return
+        series = self._get(location)
+        series.add(
+            int(data["dt"]) // SECONDS_PER_HOUR,
+            main["temp"],
+            main.get("humidity"),
+            (data.get("rain") or {}).get("1h", 0) + (data.get("snow") or {}).get("1h", 0),
+            (data.get("wind") or {}).get("speed"),
+            observed=True,
+        )
+        series.finalize(int(time.time()) // SECONDS_PER_HOUR)
+
+    def record_forecast(self, location: Hashable, data: Dict[str, Any]) -> None:
+        """Fold a /forecast payload in; each 3-hour slot fills three hours until observed"""
+        series = self._get(location)
+        for item in data.get("list", []):
+            main = item.get("main") or {}
+            if "dt" not in item or not isinstance(main.get("temp"), (int, float)):
+                continue
+            hour = int(item["dt"]) // SECONDS_PER_HOUR
+            rain = ((item.get("rain") or {}).get("3h", 0) + (item.get("snow") or {}).get("3h", 0)) / 3
+            for offset in range(3):
+                series.add(hour + offset, main["temp"], main.get("humidity"), rain,
+                           (item.get("wind") or {}).get("speed"), observed=False)
+        series.finalize(int(time.time()) // SECONDS_PER_HOUR)
+
+    def metrics(self, location: Hashable,
+                base_temperatures: Iterable[float] = ()) -> Dict[str, Any]:
+        """Accumulated metrics for a location (all zero if nothing was recorded there)"""
+        series = self._series.get(location)
+        if series is None:
+            series = HourlySeries(set(CROP_BASE_TEMPERATURES.values()), self.max_hours)
+        series.finalize(int(time.time()) // SECONDS_PER_HOUR)
+        return series.metrics(base_temperatures)
+
+    def series(self, location: Hashable) -> Optional[HourlySeries]:
+        """The location's series, finalized up to the current hour, if any"""
+        series = self._series.get(location)
+        if series is not None:
+            series.finalize(int(time.time()) // SECONDS_PER_HOUR)
+        return series
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "locations": len(self._series),
+            "max_locations": self.max_locations,
+            "hours_recorded": sum(len(series) for series in self._series.values()),
+        }
@@ -0,0 +1,191 @@
+"""
+SQLite-backed persistent tier for the weather cache and geocoded place names.
+
+The file is opened in WAL mode so several worker processes can read and
+write it concurrently, and entries survive restarts. Reads happen lazily on
+an in-memory miss (in a worker thread); writes are queued and applied in
+batches by a single background writer thread so request handlers never wait
+on disk.
+"""
+import json
+import queue
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS weather_cache (
+        key TEXT PRIMARY KEY,
+        payload TEXT NOT NULL,
+        stored_at REAL NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS geocode (
+        query TEXT PRIMARY KEY,
+        lat REAL NOT NULL,
+        lng REAL NOT NULL,
+        name TEXT,
+        stored_at REAL NOT NULL
+    )""",
+]
+
+_UPSERTS = {
+    # Never let an older payload (e.g. from another worker) replace a newer one
+    "weather_cache": """INSERT INTO weather_cache (key, payload, stored_at) VALUES (?, ?, ?)
+                        ON CONFLICT(key) DO UPDATE SET
+                            payload = excluded.payload, stored_at = excluded.stored_at
+                        WHERE excluded.stored_at > weather_cache.stored_at""",
+    "geocode": """INSERT INTO geocode (query, lat, lng, name, stored_at) VALUES (?, ?, ?, ?, ?)
+                  ON CONFLICT(query) DO UPDATE SET
+                      lat = excluded.lat, lng = excluded.lng, name = excluded.name,
+                      stored_at = excluded.stored_at
+                  WHERE excluded.stored_at > geocode.stored_at""",
+}
+
+_STOP = object()
+
+
+class WeatherStore:
+    def __init__(self, path: str, max_age: float = 86400.0, batch_size: int = 100):
+        self.path = path
+        self.max_age = max_age
+        self.batch_size = batch_size
+        self._local = threading.local()
+        # Every thread's connection, so close() can reach those opened in worker threads
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._queue: "queue.Queue" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._closed = False
+        self.reads = 0
+        self.read_hits = 0
+        self.writes = 0
+        self.write_errors = 0
+        self.dropped_writes = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread (sqlite3 connections are not thread-safe)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def open(self) -> None:
+        """Create the schema, drop entries older than max_age and start the writer"""
+        self._closed = False
+        conn = self._connection()
+        with conn:
+            for statement in _SCHEMA:
+                conn.execute(statement)
+            conn.execute(
+                "DELETE FROM weather_cache WHERE stored_at < ?", (time.time() - self.max_age,)
+            )
+        if self._writer is None or not self._writer.is_alive():
+            self._writer = threading.Thread(
+                target=self._write_loop, name="weather-store-writer", daemon=True
+            )
+            self._writer.start()
+
+    def close(self) -> None:
+        """Flush queued writes, stop the writer thread and close every thread's connection"""
+        self._closed = True
+        if self._writer is not None and self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join(timeout=10)
+        self._writer = None
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        # Threads reconnect on next use instead of reusing a closed connection
+        self._local = threading.local()
+
+    def get(self, key: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        """Return (payload, stored_at) for a key, or None (blocking; call from a thread)"""
+        self.reads += 1
+        row = self._connection().execute(
+            "SELECT payload, stored_at FROM weather_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        self.read_hits += 1
+        return json.loads(row[0]), row[1]
+
+    def put(self, key: str, payload: Dict[str, Any], stored_at: float) -> None:
+        """Queue a write; returns immediately"""
+        self._enqueue("weather_cache", (key, payload, stored_at))
+
+    def get_geocode(self, query: str) -> Optional[Tuple[float, float, Optional[str]]]:
+        """Return (lat, lng, name) for a normalized place query, or None (blocking)"""
+        self.reads += 1
+        row = self._connection().execute(
+            "SELECT lat, lng, name FROM geocode WHERE query = ?", (query,)
+        ).fetchone()
+        if row is None:
+            return None
+        self.read_hits += 1
+        return row[0], row[1], row[2]
+
+    def put_geocode(self, query: str, lat: float, lng: float, name: Optional[str]) -> None:
+        """Queue a geocode write; places do not move, so these are never pruned"""
+        self._enqueue("geocode", (query, lat, lng, name, time.time()))
+
+    def _enqueue(self, table: str, row: Tuple) -> None:
+        if self._closed:
+            # No writer after close(); count the write instead of queueing it forever
+            self.dropped_writes += 1
+            if self.dropped_writes == 1:
+                print("⚠️ Weather store is closed; dropping writes")
+            return
+        self._queue.put((table, row))
+
+    def _write_loop(self) -> None:
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            batches: Dict[str, List[Tuple]] = {}
+            queued = 0
+            while True:
+                if item is _STOP:
+                    stopping = True
+                else:
+                    table, row = item
+                    if table == "weather_cache":
+                        key, payload, stored_at = row
+                        row = (key, json.dumps(payload), stored_at)
+                    batches.setdefault(table, []).append(row)
+                    queued += 1
+                if stopping or queued >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            for table, batch in batches.items():
+                self._write_batch(table, batch)
+
+    def _write_batch(self, table: str, batch: List[Tuple]) -> None:
+        try:
+            conn = self._connection()
+            with conn:
+                conn.executemany(_UPSERTS[table], batch)
+            self.writes += len(batch)
+        except sqlite3.Error as e:
+            self.write_errors += 1
+            print(f"⚠️ Weather store write failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "reads": self.reads,
+            "read_hits": self.read_hits,
+            "writes": self.writes,
+            "write_errors": self.write_errors,
+            "dropped_writes": self.dropped_writes,
+            "pending_writes": self._queue.qsize(),
+        }
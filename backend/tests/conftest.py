@@ -0,0 +1,46 @@
+import os
+import sys
+
+import httpx
+import pytest
+
+# Tests import backend modules the way main.py does (services.*, api.*)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def current_payload(temp: float = 20.0, **extra):
+    """A minimal OpenWeatherMap /weather payload"""
+    return {
+        "weather": [{"main": "Clear", "description": "clear sky", "icon": "01d"}],
+        "main": {"temp": temp, "feels_like": temp, "humidity": 50, "pressure": 1012},
+        "wind": {"speed": 2.0, "deg": 90},
+        "dt": 1700000000,
+        "timezone": 0,
+        "name": "Test",
+        **extra,
+    }
+
+
+@pytest.fixture
+def make_weather_service(monkeypatch):
+    """
+    Build WeatherServices whose upstream is an httpx.MockTransport handler,
+    with no disk tier, interpolation or history, and fresh quota/breaker singletons.
+    """
+    monkeypatch.setenv("OPENWEATHER_API_KEY", "test-key")
+    monkeypatch.setenv("WEATHER_CACHE_DB", "")
+    monkeypatch.setenv("WEATHER_INTERPOLATION_ENABLED", "false")
+    monkeypatch.setenv("WEATHER_HISTORY_ENABLED", "false")
+    from services import weather
+
+    monkeypatch.setattr(weather, "_weather_rate_limiter", None)
+    monkeypatch.setattr(weather, "_weather_circuit_breaker", None)
+
+    def make(handler, **attributes):
+        service = weather.WeatherService()
+        service._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        for name, value in attributes.items():
+            setattr(service, name, value)
+        return service
+
+    return make
@@ -0,0 +1,95 @@
+import asyncio
+import time
+
+import httpx
+
+from conftest import current_payload
+from services.cache import FRESH, MISS, STALE, TTLCache
+
+
+def test_entry_is_fresh_then_stale_then_missing():
+    cache = TTLCache(ttl=10, stale_ttl=5)
+    now = time.time()
+
+    cache.set("fresh", 1, stored_at=now - 9)
+    cache.set("stale", 2, stored_at=now - 11)
+    cache.set("expired", 3, stored_at=now - 16)
+
+    assert cache.get("fresh") == (1, FRESH)
+    assert cache.get("stale") == (2, STALE)
+    assert cache.get("expired") == (None, MISS)
+    assert cache.get("absent") == (None, MISS)
+    assert (cache.hits, cache.stale_hits, cache.misses) == (1, 1, 2)
+
+
+def test_expired_entries_stay_readable_with_peek():
+    cache = TTLCache(ttl=10, stale_ttl=5)
+    stored_at = time.time() - 3600
+    cache.set("key", "last known good", stored_at=stored_at)
+
+    assert cache.get("key") == (None, MISS)
+    assert cache.peek("key") == ("last known good", stored_at)
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.peek("b") is None
+    assert cache.peek("a") is not None and cache.peek("c") is not None
+    assert cache.evictions == 1
+
+
+def test_stale_weather_is_served_while_refreshed_in_background(make_weather_service):
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path.rsplit("/", 1)[-1])
+        return httpx.Response(200, json=current_payload(temp=30.0))
+
+    async def scenario():
+        service = make_weather_service(handler)
+        key = ("current",) + service.grid_cell(10.0, 20.0)
+        service.cache.set(key, current_payload(temp=10.0),
+                          stored_at=time.time() - service.cache.ttl - 1)
+
+        stale = await service.get_current_weather(10.0, 20.0)
+        assert stale["current"]["temperature"] == 10.0
+        assert calls == []  # answered from cache; the refresh has not run yet
+        assert key in service._refresh_tasks
+
+        # A second stale read while the refresh is pending does not start another
+        await service.get_current_weather(10.0, 20.0)
+        await asyncio.gather(*service._refresh_tasks.values())
+        assert calls == ["weather"]
+        assert service.cache.get(key)[1] == FRESH
+
+        fresh = await service.get_current_weather(10.0, 20.0)
+        assert fresh["current"]["temperature"] == 30.0
+        assert calls == ["weather"]
+
+    asyncio.run(scenario())
+
+
+def test_weather_past_the_stale_window_is_fetched_before_answering(make_weather_service):
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path.rsplit("/", 1)[-1])
+        return httpx.Response(200, json=current_payload(temp=30.0))
+
+    async def scenario():
+        service = make_weather_service(handler)
+        key = ("current",) + service.grid_cell(10.0, 20.0)
+        service.cache.set(key, current_payload(temp=10.0),
+                          stored_at=time.time() - service.cache.ttl - service.cache.stale_ttl - 1)
+
+        result = await service.get_current_weather(10.0, 20.0)
+        assert result["current"]["temperature"] == 30.0
+        assert calls == ["weather"]
+        assert not service._refresh_tasks
+
+    asyncio.run(scenario())
@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+
+from services.downsampling import downsample
+
+
+@pytest.mark.parametrize("method", ["lttb", "minmax"])
+@pytest.mark.parametrize("points", [3, 7, 14, 15, 100])
+def test_downsample_keeps_at_most_points_rows(method, points):
+    rng = np.random.default_rng(0)
+    x = np.arange(1000, dtype=np.float64)
+    columns = {name: rng.normal(size=x.size) for name in ("N", "P", "K", "moisture", "pH")}
+
+    rows = downsample(x, columns, points, method)
+
+    assert 0 < rows.size <= points
+    assert np.all(np.diff(rows) > 0)
+
+
+def test_lttb_union_keeps_both_ends_when_thinned():
+    x = np.arange(500, dtype=np.float64)
+    columns = {str(i): np.sin(x / (i + 1)) for i in range(5)}
+
+    rows = downsample(x, columns, 4)
+
+    assert rows[0] == 0 and rows[-1] == 499
@@ -0,0 +1,129 @@
+import asyncio
+
+import httpx
+import pytest
+
+from conftest import current_payload
+
+
+def slow_first_handler(first_delay, later_delay=0.0, log=None):
+    """First request answers after first_delay, later ones after later_delay"""
+    calls = []
+
+    async def handler(request):
+        index = len(calls)
+        calls.append(request)
+        try:
+            await asyncio.sleep(first_delay if index == 0 else later_delay)
+        except asyncio.CancelledError:
+            if log is not None:
+                log.append(index)
+            raise
+        return httpx.Response(200, json=current_payload(temp=float(index)))
+
+    handler.calls = calls
+    return handler
+
+
+def hedging(**overrides):
+    return {"hedge_enabled": True, "hedge_default_delay": 0.05, **overrides}
+
+
+def test_slow_attempt_is_hedged_and_the_loser_cancelled(make_weather_service):
+    cancelled = []
+    handler = slow_first_handler(1.0, log=cancelled)
+
+    async def scenario():
+        service = make_weather_service(handler, **hedging())
+        response = await service._hedged_get("/weather", {"lat": 1, "lon": 2})
+        await asyncio.sleep(0)
+
+        assert response.json()["main"]["temp"] == 1.0  # the hedge answered
+        assert len(handler.calls) == 2
+        assert cancelled == [0]
+        assert (service.hedges_sent, service.hedge_wins) == (1, 1)
+        assert service.latency["/weather"].outcomes == {"ok": 1, "cancelled": 1}
+
+    asyncio.run(scenario())
+
+
+def test_fast_attempt_is_not_hedged(make_weather_service):
+    handler = slow_first_handler(0.0)
+
+    async def scenario():
+        service = make_weather_service(handler, **hedging())
+        await service._hedged_get("/weather", {})
+        assert len(handler.calls) == 1
+        assert service.hedges_sent == 0
+
+    asyncio.run(scenario())
+
+
+def test_no_hedge_without_spare_quota(make_weather_service):
+    handler = slow_first_handler(0.2)
+
+    async def scenario():
+        service = make_weather_service(handler, **hedging())
+        service.rate_limiter.tokens = service.rate_limiter.capacity * service.rate_limiter.background_reserve
+        response = await service._hedged_get("/weather", {})
+        assert response.json()["main"]["temp"] == 0.0
+        assert len(handler.calls) == 1
+        assert service.hedges_sent == 0
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_caller_cancels_every_attempt(make_weather_service):
+    cancelled = []
+    handler = slow_first_handler(1.0, later_delay=1.0, log=cancelled)
+
+    async def scenario():
+        service = make_weather_service(handler, **hedging())
+        caller = asyncio.ensure_future(service._hedged_get("/weather", {}))
+        await asyncio.sleep(0.15)  # past the hedge delay: both attempts in flight
+        assert len(handler.calls) == 2
+
+        caller.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await caller
+        await asyncio.sleep(0)
+
+        assert sorted(cancelled) == [0, 1]
+        assert service.latency["/weather"].outcomes == {"cancelled": 2}
+
+    asyncio.run(scenario())
+
+
+def test_server_errors_are_retried_with_backoff(make_weather_service):
+    statuses = [503, 502, 200]
+
+    def handler(request):
+        return httpx.Response(statuses.pop(0), json=current_payload())
+
+    async def scenario():
+        service = make_weather_service(handler, retry_attempts=2, retry_backoff=0.001)
+        assert (await service._get_json("/weather", {}))["main"]["temp"] == 20.0
+        assert service.retries == 2
+        assert service.latency["/weather"].outcomes == {"server_error": 2, "ok": 1}
+
+    asyncio.run(scenario())
+
+
+def test_caller_cancelled_before_the_hedge_cancels_the_primary(make_weather_service):
+    cancelled = []
+    handler = slow_first_handler(1.0, log=cancelled)
+
+    async def scenario():
+        service = make_weather_service(handler, **hedging(hedge_default_delay=0.5))
+        caller = asyncio.ensure_future(service._hedged_get("/weather", {}))
+        await asyncio.sleep(0.05)
+
+        caller.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await caller
+        await asyncio.sleep(0)
+
+        assert cancelled == [0]
+        assert service.hedges_sent == 0
+
+    asyncio.run(scenario())
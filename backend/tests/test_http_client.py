@@ -0,0 +1,55 @@
+import asyncio
+
+import httpx
+
+from conftest import current_payload
+from services import weather
+from services.http_client import create_async_client
+
+
+def test_pool_limits_and_timeouts_come_from_the_environment(monkeypatch):
+    monkeypatch.setenv("TEST_HTTP_TIMEOUT", "4")
+    monkeypatch.setenv("TEST_HTTP_MAX_CONNECTIONS", "7")
+    monkeypatch.setenv("TEST_HTTP_MAX_KEEPALIVE", "not a number")
+
+    async def scenario():
+        client = create_async_client("TEST_HTTP", max_keepalive_connections=3)
+        try:
+            pool = client._transport._pool
+            assert pool._max_connections == 7
+            assert pool._max_keepalive_connections == 3  # invalid values fall back
+            assert client.timeout.read == 4.0
+            assert client.timeout.connect == 4.0  # capped at the total timeout
+        finally:
+            await client.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_weather_service_reuses_one_client_until_closed(make_weather_service, monkeypatch):
+    created = []
+
+    def handler(request):
+        return httpx.Response(200, json=current_payload())
+
+    def create(env_prefix, timeout):
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        created.append(client)
+        return client
+
+    monkeypatch.setattr(weather, "create_async_client", create)
+
+    async def scenario():
+        service = make_weather_service(handler, _client=None)
+        for lat in (1.0, 2.0, 3.0):
+            await service.get_current_weather(lat, 0.0)
+        assert len(created) == 1
+
+        await service.aclose()
+        assert created[0].is_closed
+        # Opened lazily again if used after shutdown
+        await service.get_current_weather(4.0, 0.0)
+        assert len(created) == 2
+        await service.aclose()
+
+    asyncio.run(scenario())
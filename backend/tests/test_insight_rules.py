@@ -0,0 +1,356 @@
+"""
+The declarative rule tables must give the same results as the if/elif
+chains they replaced. The legacy_* functions below are those chains,
+copied verbatim from the handlers, and are checked against the RuleSets on
+a grid of inputs that straddles every threshold.
+"""
+import itertools
+
+from services.insight_rules import (
+    CROP_ADVISORY_RULES,
+    WEATHER_ADVISORY_RULES,
+    WEATHER_INSIGHT_RULES,
+    soil_recommendations,
+)
+
+
+def legacy_agricultural_insights(temperature, humidity, wind_speed, weather_condition, precipitation=0):
+    insights = {
+        "irrigation_recommendation": "normal",
+        "field_work_suitability": "suitable",
+        "disease_risk": "low",
+        "recommendations": [],
+        "alerts": []
+    }
+
+    if temperature < 5:
+        insights["alerts"].append("Frost risk - protect sensitive crops")
+        insights["field_work_suitability"] = "poor"
+    elif temperature > 35:
+        insights["alerts"].append("Heat stress risk - ensure adequate irrigation")
+        insights["irrigation_recommendation"] = "high"
+    elif temperature > 30:
+        insights["irrigation_recommendation"] = "increased"
+
+    if humidity > 80:
+        insights["disease_risk"] = "high"
+        insights["recommendations"].append("High humidity increases fungal disease risk")
+    elif humidity < 30:
+        insights["irrigation_recommendation"] = "increased"
+        insights["recommendations"].append("Low humidity may require additional watering")
+
+    if wind_speed > 10:
+        insights["field_work_suitability"] = "poor"
+        insights["recommendations"].append("Strong winds - avoid spraying operations")
+    elif wind_speed > 5:
+        insights["recommendations"].append("Moderate winds - good for drying conditions")
+
+    if "rain" in weather_condition:
+        insights["irrigation_recommendation"] = "reduced"
+        insights["field_work_suitability"] = "poor"
+        if precipitation > 10:
+            insights["alerts"].append("Heavy rainfall - check for waterlogging")
+    elif "snow" in weather_condition:
+        insights["field_work_suitability"] = "unsuitable"
+        insights["alerts"].append("Snow conditions - protect crops if needed")
+    elif "clear" in weather_condition or "sun" in weather_condition:
+        insights["recommendations"].append("Clear weather - good for field operations")
+
+    if temperature > 25 and humidity > 70:
+        insights["disease_risk"] = "high"
+        insights["recommendations"].append("Hot and humid - monitor for pest and disease activity")
+
+    if temperature < 10 and humidity > 80:
+        insights["disease_risk"] = "medium"
+        insights["recommendations"].append("Cool and humid - watch for fungal diseases")
+
+    return insights
+
+
+def legacy_agricultural_advisory(current):
+    advisory = []
+
+    if current['temperature'] > 35:
+        advisory.append("High temperature alert: Increase irrigation frequency and provide shade for sensitive crops")
+    elif current['temperature'] < 15:
+        advisory.append("Low temperature warning: Protect crops from frost damage, consider row covers")
+
+    if current['humidity'] > 80:
+        advisory.append("High humidity: Monitor for fungal diseases, ensure good air circulation")
+    elif current['humidity'] < 40:
+        advisory.append("Low humidity: Increase irrigation and consider mulching to retain soil moisture")
+
+    if current['rainfall'] > 10:
+        advisory.append("Heavy rainfall expected: Ensure proper drainage, avoid field operations")
+    elif current['rainfall'] == 0 and current['humidity'] < 50:
+        advisory.append("Dry conditions: Plan irrigation schedule, check soil moisture levels")
+
+    if current['wind_speed'] > 10:
+        advisory.append("Strong winds: Secure tall crops, check for wind damage, avoid pesticide spraying")
+
+    if current['uv_index'] > 7:
+        advisory.append("High UV index: Protect workers, consider crop shading for sensitive plants")
+
+    if not advisory:
+        advisory.append("Weather conditions are favorable for normal agricultural activities")
+
+    return advisory
+
+
+LEGACY_CROP_SPECIFIC = {
+    "rice": {
+        "temperature": {
+            "high": "High temperature may affect grain filling - ensure adequate water supply",
+            "low": "Cool weather may slow growth - monitor for diseases"
+        },
+        "rainfall": {
+            "high": "Excess water may cause lodging - improve drainage",
+            "low": "Maintain standing water in fields"
+        }
+    },
+    "wheat": {
+        "temperature": {
+            "high": "Heat stress during grain filling - irrigate frequently",
+            "low": "Favorable for wheat growth - monitor for rust diseases"
+        },
+        "rainfall": {
+            "high": "Excess moisture may cause fungal diseases",
+            "low": "Supplemental irrigation may be needed"
+        }
+    },
+    "cotton": {
+        "temperature": {
+            "high": "Optimal temperature for cotton growth",
+            "low": "Cool weather may delay flowering"
+        },
+        "rainfall": {
+            "high": "Excess moisture may affect fiber quality",
+            "low": "Cotton is drought tolerant but monitor soil moisture"
+        }
+    }
+}
+
+
+def legacy_crop_specific_advisory(current, crop_type):
+    advisory = legacy_agricultural_advisory(current)
+
+    crop_lower = crop_type.lower()
+    if crop_lower in LEGACY_CROP_SPECIFIC:
+        if current['temperature'] > 30:
+            advisory.append(LEGACY_CROP_SPECIFIC[crop_lower]['temperature']['high'])
+        elif current['temperature'] < 20:
+            advisory.append(LEGACY_CROP_SPECIFIC[crop_lower]['temperature']['low'])
+
+        if current['rainfall'] > 5:
+            advisory.append(LEGACY_CROP_SPECIFIC[crop_lower]['rainfall']['high'])
+        elif current['rainfall'] == 0:
+            advisory.append(LEGACY_CROP_SPECIFIC[crop_lower]['rainfall']['low'])
+
+    return advisory
+
+
+def legacy_smart_recommendations(N, P, K, moisture, ph, temp):
+    N = N if N is not None else 0
+    P = P if P is not None else 0
+    K = K if K is not None else 0
+    moisture = moisture if moisture is not None else 0
+    ph = ph if ph is not None else 7.0
+
+    fertilizer_rec = ""
+    actions = []
+
+    if N < 30:
+        fertilizer_rec = "High-Nitrogen Fertilizer (Urea or Ammonium Nitrate)"
+        actions.append(
+            f"Apply Urea at 50-75 kg/acre to boost nitrogen levels (Currently: {N:.1f} kg/ha)"
+        )
+    elif N > 80:
+        fertilizer_rec = "Reduce Nitrogen Application"
+        actions.append(
+            f"Nitrogen levels are high ({N:.1f} kg/ha). Skip nitrogen fertilizers this cycle"
+        )
+
+    if P < 15:
+        if fertilizer_rec:
+            fertilizer_rec += " + High-Phosphorus Fertilizer (DAP or SSP)"
+        else:
+            fertilizer_rec = (
+                "High-Phosphorus Fertilizer (DAP or Single Super Phosphate)"
+            )
+        actions.append(
+            f"Apply DAP at 40-60 kg/acre for phosphorus boost (Currently: {P:.1f} kg/ha)"
+        )
+    elif P > 60:
+        actions.append(
+            f"Phosphorus levels are optimal ({P:.1f} kg/ha). No additional P needed"
+        )
+
+    if K < 20:
+        if fertilizer_rec:
+            fertilizer_rec += " + Potassium Fertilizer (MOP)"
+        else:
+            fertilizer_rec = "Potassium Fertilizer (Muriate of Potash)"
+        actions.append(
+            f"Apply MOP at 30-50 kg/acre for potassium (Currently: {K:.1f} kg/ha)"
+        )
+    elif K > 70:
+        actions.append(
+            f"Potassium levels are excellent ({K:.1f} kg/ha). Maintain current practices"
+        )
+
+    if not fertilizer_rec:
+        fertilizer_rec = "Balanced NPK Fertilizer (10-26-26 or 15-15-15)"
+        actions.append(
+            "All nutrient levels are optimal. Use balanced NPK for maintenance"
+        )
+
+    if N > 40 and P < 40 and K < 40:
+        crop_suggestion = "Leafy Vegetables (Spinach, Lettuce, Cabbage)"
+        reasoning = (
+            "High nitrogen supports vigorous leaf growth. Ideal for leafy crops."
+        )
+    elif P > 30 and K > 30:
+        crop_suggestion = "Fruiting Crops (Tomatoes, Peppers, Eggplant)"
+        reasoning = (
+            "High phosphorus and potassium promote flowering and fruit development."
+        )
+    elif N < 40 and P > 25:
+        crop_suggestion = "Root Vegetables (Potatoes, Carrots, Radish)"
+        reasoning = (
+            "Moderate nitrogen with good phosphorus supports root development."
+        )
+    elif 30 <= N <= 70 and 15 <= P <= 50 and 20 <= K <= 60:
+        crop_suggestion = "Cereals (Wheat, Rice, Maize)"
+        reasoning = "Balanced nutrient profile is ideal for grain crops."
+    elif N > 60 and P > 40 and K > 50:
+        crop_suggestion = "Heavy Feeders (Pumpkin, Squash, Cucumber)"
+        reasoning = "Rich soil nutrients can support high-demand crops."
+    else:
+        crop_suggestion = "Legumes (Beans, Peas, Lentils)"
+        reasoning = (
+            "Legumes can fix nitrogen and improve soil health for future crops."
+        )
+
+    soil_health = "Good"
+    health_factors = []
+
+    if 6.0 <= ph <= 7.5:
+        health_factors.append("pH is optimal")
+    elif ph < 5.5:
+        soil_health = "Acidic - Needs Lime"
+        health_factors.append(
+            f"pH is too acidic ({ph:.1f}). Apply lime to raise pH"
+        )
+        actions.append(
+            "Apply agricultural lime at 200-300 kg/acre to neutralize acidity"
+        )
+    elif ph > 8.0:
+        soil_health = "Alkaline - Needs Sulfur"
+        health_factors.append(
+            f"pH is too alkaline ({ph:.1f}). Apply sulfur to lower pH"
+        )
+        actions.append(
+            "Apply elemental sulfur at 50-100 kg/acre to reduce alkalinity"
+        )
+
+    if moisture < 30:
+        health_factors.append("Soil moisture is low - Increase irrigation")
+        actions.append(
+            f"Increase irrigation frequency. Current moisture: {moisture:.1f}%"
+        )
+    elif moisture > 80:
+        health_factors.append("Soil moisture is high - Risk of waterlogging")
+        actions.append(
+            f"Reduce irrigation or improve drainage. Current moisture: {moisture:.1f}%"
+        )
+    else:
+        health_factors.append("Moisture levels are optimal")
+
+    if temp < 15:
+        health_factors.append("Soil temperature is low - Growth may be slow")
+    elif temp > 35:
+        health_factors.append("Soil temperature is high - Consider mulching")
+        actions.append("Apply organic mulch to regulate soil temperature")
+    else:
+        health_factors.append("Temperature is favorable for crop growth")
+
+    avg_nutrient = (N + P + K) / 3
+    if avg_nutrient > 50:
+        health_factors.append("Overall nutrient levels are rich")
+    elif avg_nutrient < 30:
+        soil_health = "Nutrient Deficient"
+        health_factors.append("Overall nutrient levels are low")
+
+    reasoning += " " + ". ".join(health_factors) + "."
+
+    return {
+        "fertilizer_recommendation": fertilizer_rec,
+        "crop_suggestion": crop_suggestion,
+        "reasoning": reasoning.strip(),
+        "soil_health": soil_health,
+        "actions": actions if actions else ["Continue monitoring soil conditions"],
+    }
+
+
+def _columns(grid, names):
+    return {name: [row[i] for row in grid] for i, name in enumerate(names)}
+
+
+def test_weather_insight_rules_match_legacy_chain():
+    names = ("temperature", "humidity", "wind_speed", "weather_condition", "precipitation")
+    grid = list(itertools.product(
+        [-2, 5, 9.5, 10, 25, 26, 30, 30.5, 35, 36],
+        [20, 30, 50, 70, 71, 80, 81],
+        [0, 5, 5.5, 10, 12],
+        ["light rain", "snow", "clear sky", "sunny", "overcast clouds", "thunderstorm with rain"],
+        [0, 10, 10.5],
+    ))
+    results = WEATHER_INSIGHT_RULES.evaluate(_columns(grid, names))
+    assert len(results) == len(grid)
+    for row, result in zip(grid, results):
+        assert result == legacy_agricultural_insights(*row), row
+
+
+def test_weather_advisory_rules_match_legacy_chain():
+    names = ("temperature", "humidity", "rainfall", "wind_speed", "uv_index")
+    grid = list(itertools.product(
+        [10, 15, 20, 35, 36],
+        [30, 40, 49, 50, 80, 81],
+        [0, 0.5, 10, 11],
+        [5, 10, 11],
+        [3, 7, 8],
+    ))
+    results = WEATHER_ADVISORY_RULES.evaluate(_columns(grid, names))
+    for row, result in zip(grid, results):
+        assert result["advisory"] == legacy_agricultural_advisory(dict(zip(names, row))), row
+
+
+def test_crop_advisory_rules_match_legacy_chain():
+    names = ("temperature", "humidity", "rainfall", "wind_speed", "uv_index", "crop")
+    grid = list(itertools.product(
+        [14, 19, 20, 30, 31, 36],
+        [45, 85],
+        [0, 3, 5, 6, 12],
+        [4, 11],
+        [8],
+        ["rice", "wheat", "cotton", "maize"],
+    ))
+    results = CROP_ADVISORY_RULES.evaluate(_columns(grid, names))
+    for row, result in zip(grid, results):
+        current = dict(zip(names, row))
+        assert result["advisory"] == legacy_crop_specific_advisory(current, current["crop"]), row
+
+
+def test_soil_rules_match_legacy_chain():
+    grid = list(itertools.product(
+        [None, 10, 30, 40, 41, 61, 70, 81],
+        [None, 10, 15, 25, 26, 31, 40, 41, 50, 61],
+        [None, 10, 20, 31, 40, 51, 60, 71],
+        [None, 29.5, 30, 80, 81],
+        [None, 5.4, 5.5, 6.0, 7.5, 7.8, 8.1],
+        [14, 15, 35, 36],
+    ))
+    results = soil_recommendations(*(list(column) for column in zip(*grid)))
+    assert len(results) == len(grid)
+    for row, result in zip(grid, results):
+        assert result == legacy_smart_recommendations(*row), row
@@ -0,0 +1,133 @@
+import asyncio
+import types
+
+import pytest
+
+from services import resilience
+from services.resilience import (
+    BACKGROUND,
+    INTERACTIVE,
+    CircuitBreaker,
+    RateLimitExceeded,
+    TokenBucket,
+)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Manual monotonic clock for the resilience module only (asyncio keeps the real one)"""
+    now = [1000.0]
+    monkeypatch.setattr(resilience, "time", types.SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+def test_background_callers_leave_the_reserve_to_interactive_ones(clock):
+    bucket = TokenBucket(rate_per_minute=10, background_reserve=0.5)
+
+    granted = [bucket.try_acquire(BACKGROUND) for _ in range(10)]
+    assert granted == [True] * 5 + [False] * 5
+
+    assert [bucket.try_acquire(INTERACTIVE) for _ in range(6)] == [True] * 5 + [False]
+    assert bucket.granted == {INTERACTIVE: 5, BACKGROUND: 5}
+
+
+def test_refill_serves_interactive_before_background(clock):
+    bucket = TokenBucket(rate_per_minute=60, background_reserve=0.5)
+    while bucket.try_acquire(INTERACTIVE):
+        pass
+
+    clock[0] += 3  # three tokens back, all below the background reserve
+    assert not bucket.try_acquire(BACKGROUND)
+    assert [bucket.try_acquire(INTERACTIVE) for _ in range(4)] == [True] * 3 + [False]
+
+    clock[0] += 60  # full again
+    assert bucket.try_acquire(BACKGROUND)
+
+
+def test_acquire_gives_up_after_the_priority_wait():
+    async def scenario():
+        bucket = TokenBucket(rate_per_minute=60, interactive_max_wait=0.0,
+                             background_max_wait=0.0)
+        while bucket.try_acquire(INTERACTIVE):
+            pass
+        with pytest.raises(RateLimitExceeded):
+            await bucket.acquire(INTERACTIVE)
+        with pytest.raises(RateLimitExceeded):
+            await bucket.acquire(BACKGROUND)
+        assert bucket.rejected == {INTERACTIVE: 1, BACKGROUND: 1}
+
+    asyncio.run(scenario())
+
+
+def test_penalty_blocks_every_priority_until_it_expires(clock):
+    bucket = TokenBucket(rate_per_minute=60)
+    bucket.penalize(30)
+
+    assert not bucket.try_acquire(INTERACTIVE)
+    clock[0] += 29
+    assert not bucket.try_acquire(INTERACTIVE)
+    clock[0] += 2  # refill only counts time after the block
+    assert bucket.try_acquire(INTERACTIVE)
+    assert not bucket.try_acquire(INTERACTIVE)
+
+
+def test_breaker_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_timeout=30)
+    for _ in range(2):
+        assert breaker.allow_request()
+        breaker.record_failure()
+    assert breaker.allow_request()
+    breaker.record_success()  # a success resets the streak
+    for _ in range(3):
+        assert breaker.allow_request()
+        breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+    assert breaker.rejected == 1
+
+
+def test_half_open_admits_one_trial_and_closes_on_success(clock):
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=30)
+    breaker.allow_request()
+    breaker.record_failure()
+
+    clock[0] += 29
+    assert not breaker.allow_request()
+    clock[0] += 1
+    assert breaker.allow_request()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow_request()  # only one trial in flight
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow_request() and breaker.allow_request()
+
+
+def test_failed_trial_reopens_for_a_full_timeout(clock):
+    breaker = CircuitBreaker("test", failure_threshold=5, reset_timeout=30)
+    for _ in range(5):
+        breaker.allow_request()
+        breaker.record_failure()
+
+    clock[0] += 30
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    clock[0] += 29
+    assert not breaker.allow_request()
+    clock[0] += 1
+    assert breaker.allow_request()
+
+
+def test_released_trial_lets_another_through(clock):
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=30)
+    breaker.allow_request()
+    breaker.record_failure()
+    clock[0] += 30
+
+    assert breaker.allow_request()
+    breaker.release()  # e.g. cancelled before reaching upstream
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request()
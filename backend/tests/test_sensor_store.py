@@ -0,0 +1,101 @@
+import asyncio
+
+import httpx
+import numpy as np
+import pytest
+
+import thingspeak_client
+from services.sensor_store import SensorStore, parse_timestamp
+
+
+def feed(entry_id, minute=None, **fields):
+    minute = entry_id if minute is None else minute
+    return {"entry_id": entry_id, "created_at": f"2024-01-01T00:{minute:02d}:00Z",
+            **{f"field{number}": value for number, value in fields.items()}}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SensorStore(str(tmp_path / "feeds.sqlite3"))
+    store.open()
+    yield store
+    store.close()
+
+
+def test_cursor_starts_empty_and_follows_ingest(store):
+    assert store.cursor("1") is None
+
+    assert store.ingest("1", [feed(1), feed(2), feed(3)]) == 3
+    assert store.cursor("1") == 3
+    assert store.cursor("2") is None
+
+
+def test_ingest_is_idempotent_for_overlapping_fetches(store):
+    store.ingest("1", [feed(1, **{"1": "10"}), feed(2, **{"1": "20"})])
+
+    assert store.ingest("1", [feed(1), feed(2)]) == 0
+    assert store.ingest("1", [feed(2), feed(3, **{"1": "30"})]) == 1
+    history = store.read("1")
+    assert history["entry_id"].tolist() == [1, 2, 3]
+    assert history["fields"][:, 0].tolist() == [10.0, 20.0, 30.0]
+    assert store.rows_ingested == 3
+
+
+def test_cursor_never_moves_back(store):
+    store.ingest("1", [feed(5)])
+    assert store.ingest("1", [feed(4), feed(3)]) == 0
+    assert store.cursor("1") == 5
+    assert store.read("1")["entry_id"].tolist() == [5]
+
+
+def test_last_entry_id_advances_cursor_past_unstored_entries(store):
+    store.ingest("1", [feed(1), {"entry_id": 2, "created_at": "not a time"}], last_entry_id=2)
+
+    assert store.cursor("1") == 2
+    assert store.read("1")["entry_id"].tolist() == [1]
+
+
+def test_read_filters_range_limit_and_fields(store):
+    store.ingest("1", [feed(i, **{"1": str(i), "3": "" if i == 2 else str(i * 10)})
+                       for i in range(1, 6)])
+
+    history = store.read("1", start=parse_timestamp("2024-01-01T00:02:00Z"),
+                         end=parse_timestamp("2024-01-01T00:04:00Z"), fields=[1, 3])
+    assert history["entry_id"].tolist() == [2, 3, 4]
+    assert history["fields"].shape == (3, 2)
+    assert np.isnan(history["fields"][0, 1])
+
+    newest = store.read("1", limit=2, fields=[1])
+    assert newest["entry_id"].tolist() == [4, 5]  # newest two, oldest first
+    assert newest["fields"][:, 0].tolist() == [4.0, 5.0]
+
+
+def test_sync_fetches_only_entries_after_the_cursor(store, monkeypatch):
+    channel = {"feeds": [feed(i) for i in range(1, 11)], "last": 10}
+    requested = []
+
+    def handler(request):
+        results = int(request.url.params["results"])
+        requested.append(results)
+        feeds = channel["feeds"][-results:]
+        return httpx.Response(200, json={"channel": {"last_entry_id": channel["last"]}, "feeds": feeds})
+
+    async def scenario():
+        monkeypatch.setattr(thingspeak_client, "_client", httpx.AsyncClient(
+            base_url="https://api.thingspeak.com", transport=httpx.MockTransport(handler)))
+
+        assert await thingspeak_client.sync_channel(store, "1") == min(
+            10, thingspeak_client.THINGSPEAK_STORE_BACKFILL)
+        first = list(requested)
+
+        channel["feeds"] += [feed(11), feed(12), feed(13)]
+        channel["last"] = 13
+        assert await thingspeak_client.sync_channel(store, "1") == 3
+        assert requested[len(first):] == [1, 3]  # probe, then only the missing entries
+
+        assert await thingspeak_client.sync_channel(store, "1") == 0
+        assert requested[-1] == 1  # up to date after the probe
+
+    asyncio.run(scenario())
+    assert store.cursor("1") == 13
+    assert store.read("1")["entry_id"].tolist()[-3:] == [11, 12, 13]
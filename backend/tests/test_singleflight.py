@@ -0,0 +1,117 @@
+import asyncio
+
+import pytest
+
+from services.singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    async def scenario():
+        flights = SingleFlight("test")
+        calls = 0
+        release = asyncio.Event()
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return {"value": 42}
+
+        waiters = [asyncio.ensure_future(flights.do("key", fetch)) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*waiters)
+
+        assert calls == 1
+        assert all(result is results[0] for result in results)
+        assert flights.stats() == {
+            "name": "test", "calls": 5, "upstream_calls": 1, "coalesced": 4, "in_flight": 0,
+        }
+
+    asyncio.run(scenario())
+
+
+def test_different_keys_and_later_calls_run_separately():
+    async def scenario():
+        flights = SingleFlight()
+        calls = []
+
+        async def fetch(key):
+            calls.append(key)
+            return key
+
+        assert await asyncio.gather(flights.do("a", lambda: fetch("a")),
+                                    flights.do("b", lambda: fetch("b"))) == ["a", "b"]
+        assert await flights.do("a", lambda: fetch("a")) == "a"
+        assert calls == ["a", "b", "a"]
+
+    asyncio.run(scenario())
+
+
+def test_errors_reach_every_waiter():
+    async def scenario():
+        flights = SingleFlight()
+
+        async def fetch():
+            await asyncio.sleep(0)
+            raise ValueError("upstream failed")
+
+        results = await asyncio.gather(*(flights.do("key", fetch) for _ in range(3)),
+                                       return_exceptions=True)
+        assert all(isinstance(result, ValueError) for result in results)
+        assert flights.stats()["in_flight"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_call():
+    async def scenario():
+        flights = SingleFlight()
+        release = asyncio.Event()
+        finished = []
+
+        async def fetch():
+            await release.wait()
+            finished.append(True)
+            return "done"
+
+        first = asyncio.ensure_future(flights.do("key", fetch))
+        second = asyncio.ensure_future(flights.do("key", fetch))
+        await asyncio.sleep(0)
+
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        release.set()
+
+        assert await second == "done"
+        assert finished == [True]
+
+    asyncio.run(scenario())
+
+
+def test_call_completes_even_if_every_caller_is_cancelled():
+    async def scenario():
+        flights = SingleFlight()
+        release = asyncio.Event()
+        finished = []
+
+        async def fetch():
+            await release.wait()
+            finished.append(True)
+            return "cached for the next caller"
+
+        waiter = asyncio.ensure_future(flights.do("key", fetch))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        assert flights.stats()["in_flight"] == 1
+        release.set()
+        for _ in range(3):
+            await asyncio.sleep(0)
+        assert finished == [True]
+        assert flights.stats()["in_flight"] == 0
+
+    asyncio.run(scenario())
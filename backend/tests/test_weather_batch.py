@@ -0,0 +1,62 @@
+import asyncio
+
+import httpx
+import pytest
+
+from conftest import current_payload
+
+
+def test_batch_dedupes_cells_and_keeps_input_order(make_weather_service):
+    requested = []
+
+    def handler(request):
+        lat = float(request.url.params["lat"])
+        requested.append(lat)
+        if lat == 3.0:
+            return httpx.Response(404, json={"message": "not found"})
+        return httpx.Response(200, json=current_payload(temp=lat * 10))
+
+    async def scenario():
+        service = make_weather_service(handler)
+        # 1.0 and 1.001 fall in the same 0.01-degree cell
+        batch = await service.get_current_weather_batch([(2.0, 0.0), (1.0, 0.0), (3.0, 0.0), (1.001, 0.0)])
+
+        assert sorted(requested) == [1.0, 2.0, 3.0]
+        assert [result["index"] for result in batch["results"]] == [0, 1, 2, 3]
+        assert [result["status"] for result in batch["results"]] == ["ok", "ok", "error", "ok"]
+        assert batch["results"][0]["weather"]["current"]["temperature"] == 20.0
+        assert batch["results"][3]["lat"] == 1.001
+        assert batch["results"][3]["weather"] == batch["results"][1]["weather"]
+        assert batch["results"][2]["error"] == "Weather API error: 404"
+        assert (batch["count"], batch["unique_locations"], batch["errors"]) == (4, 3, 1)
+
+    asyncio.run(scenario())
+
+
+def test_batch_misses_are_bounded_by_the_concurrency_limit(make_weather_service, monkeypatch):
+    monkeypatch.setenv("WEATHER_BATCH_CONCURRENCY", "2")
+    in_flight = [0, 0]  # current, peak
+
+    async def handler(request):
+        in_flight[0] += 1
+        in_flight[1] = max(in_flight)
+        await asyncio.sleep(0.01)
+        in_flight[0] -= 1
+        return httpx.Response(200, json=current_payload())
+
+    async def scenario():
+        service = make_weather_service(handler)
+        batch = await service.get_current_weather_batch([(float(i), 0.0) for i in range(8)])
+        assert batch["errors"] == 0
+        assert in_flight[1] == 2
+
+    asyncio.run(scenario())
+
+
+def test_batch_rejects_too_many_locations(make_weather_service):
+    async def scenario():
+        service = make_weather_service(lambda request: httpx.Response(500), batch_max_locations=2)
+        with pytest.raises(ValueError):
+            await service.get_current_weather_batch([(0.0, 0.0)] * 3)
+
+    asyncio.run(scenario())
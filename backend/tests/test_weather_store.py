@@ -0,0 +1,71 @@
+import threading
+import time
+
+import pytest
+
+from services.weather_store import WeatherStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = WeatherStore(str(tmp_path / "weather.sqlite3"))
+    store.open()
+    yield store
+    store.close()
+
+
+def test_queued_writes_are_flushed_by_close(tmp_path):
+    path = str(tmp_path / "weather.sqlite3")
+    store = WeatherStore(path)
+    store.open()
+    now = time.time()
+    store.put("current:1:2", {"main": {"temp": 21.5}}, now)
+    store.put_geocode("delhi", 28.61, 77.21, "Delhi")
+    store.close()
+
+    reopened = WeatherStore(path)
+    reopened.open()
+    try:
+        assert reopened.get("current:1:2") == ({"main": {"temp": 21.5}}, now)
+        assert reopened.get_geocode("delhi") == (28.61, 77.21, "Delhi")
+    finally:
+        reopened.close()
+
+
+def test_older_payload_never_replaces_a_newer_one(store):
+    now = time.time()
+    store.put("key", {"version": 2}, now)
+    store.put("key", {"version": 1}, now - 60)
+    store.close()
+    store.open()
+
+    assert store.get("key") == ({"version": 2}, now)
+
+
+def test_close_closes_connections_from_every_thread(store):
+    threads = [threading.Thread(target=store.get, args=("missing",)) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    connections = list(store._connections)
+    assert len(connections) >= 4  # opener, writer and worker threads
+
+    store.close()
+
+    assert store._connections == []
+    for conn in connections:
+        with pytest.raises(Exception):
+            conn.execute("SELECT 1")
+    # The closing thread reconnects on next use
+    store.open()
+    assert store.get("missing") is None
+
+
+def test_writes_after_close_are_counted_not_queued(store):
+    store.close()
+    store.put("key", {}, time.time())
+    store.put_geocode("delhi", 0.0, 0.0, None)
+
+    assert store.dropped_writes == 2
+    assert store.stats()["pending_writes"] == 0
@@ -1,19 +1,68 @@
+import asyncio
+import json
 import os
+import time
 import requests
-from typing import Dict, Any, List, Optional
+import httpx
+from datetime import datetime, timezone
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+from services.http_client import create_async_client
+from services.singleflight import SingleFlight
 
 # Simple ThingSpeak client for reading latest feed fields
+# Override to point at a proxy or a local stand-in (benchmarks/thingspeak_load.py)
+THINGSPEAK_BASE_URL = os.getenv("THINGSPEAK_BASE_URL", "https://api.thingspeak.com").rstrip("/")
 THINGSPEAK_CHANNEL_ID = os.getenv("THINGSPEAK_CHANNEL_ID")
 THINGSPEAK_READ_API_KEY = os.getenv("THINGSPEAK_READ_API_KEY", "")
 # Only 5 fields: N, P, K, Moisture, pH (temperature comes from weather API)
 MODEL_FIELD_STR = os.getenv("THINGSPEAK_MODEL_FIELDS", "1,2,3,4,5")
 MODEL_FIELDS = [int(x) for x in MODEL_FIELD_STR.split(",") if x.strip().isdigit()]
+MODEL_KEYS = ["N", "P", "K", "Moisture", "pH"]
+# Sensor nodes beyond the single channel above: a JSON list inline or in a file (see DeviceRegistry)
+THINGSPEAK_DEVICES = os.getenv("THINGSPEAK_DEVICES", "")
+THINGSPEAK_DEVICES_FILE = os.getenv("THINGSPEAK_DEVICES_FILE", "")
+# feeds.json returns at most this many entries per request
+THINGSPEAK_MAX_RESULTS = 8000
+# Entries fetched on a channel's first sync into the local store
+THINGSPEAK_STORE_BACKFILL = min(
+    THINGSPEAK_MAX_RESULTS, int(os.getenv("THINGSPEAK_STORE_BACKFILL", str(THINGSPEAK_MAX_RESULTS)))
+)
 THINGSPEAK_RECOMMENDATION_CHANNEL_ID = os.getenv("THINGSPEAK_RECOMMENDATION_CHANNEL_ID")
 THINGSPEAK_RECOMMENDATION_WRITE_API_KEY = os.getenv(
     "THINGSPEAK_RECOMMENDATION_WRITE_API_KEY", ""
 )
 
 
+# Concurrent identical reads (same channel, same query) share one request
+_flights = SingleFlight("thingspeak")
+
+# Shared keep-alive pool for the async API (THINGSPEAK_HTTP_* overrides its limits)
+_client: Optional[httpx.AsyncClient] = None
+
+
+async def start() -> None:
+    """Open the shared ThingSpeak connection pool (app lifespan)"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = create_async_client("THINGSPEAK_HTTP", timeout=10.0, base_url=THINGSPEAK_BASE_URL)
+
+
+async def aclose() -> None:
+    """Close the shared ThingSpeak connection pool (app shutdown)"""
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
+
+
+async def _get_client() -> httpx.AsyncClient:
+    """Return the pooled client, opening it lazily if lifespan has not run"""
+    if _client is None or _client.is_closed:
+        await start()
+    return _client
+
+
 def _safe_float(x: Any) -> Optional[float]:
     try:
         if x is None or x == "":
@@ -40,21 +89,13 @@ def get_latest_feed(
     if not channel_id:
         return result
 
-    url = f"https://api.thingspeak.com/channels/{channel_id}/feeds.json?results=1"
+    url = f"{THINGSPEAK_BASE_URL}/channels/{channel_id}/feeds.json?results=1"
     if read_key:
         url += f"&api_key={read_key}"
     try:
         r = requests.get(url, timeout=10)
         r.raise_for_status()
-        j = r.json()
-        feeds = j.get("feeds") or []
-        if not feeds:
-            return result
-        feed = feeds[0]
-        for f in fields:
-            key = f"field{f}"
-            if key in feed:
-                result[f] = _safe_float(feed.get(key))
+        result = _parse_latest(r.json(), fields)
     except requests.HTTPError as he:
         # keep logging minimal here; let caller decide what to do
         print(f"ThingSpeak HTTP error: {he}")
@@ -63,22 +104,345 @@ def get_latest_feed(
     return result
 
 
+def _parse_latest(payload: Dict[str, Any], fields: List[int]) -> Dict[int, Optional[float]]:
+    """Field number -> value from the newest entry of a feeds.json payload"""
+    result = {f: None for f in fields}
+    feeds = payload.get("feeds") or []
+    if not feeds:
+        return result
+    feed = feeds[-1]
+    for f in fields:
+        key = f"field{f}"
+        if key in feed:
+            result[f] = _safe_float(feed.get(key))
+    return result
+
+
 def get_model_input_dict() -> Dict[str, Any]:
     """
     Return a normalized dictionary suitable for your model/prediction code.
     Keys: 'N','P','K','Moisture','pH' (temperature from weather API, not sensor)
     """
-    feed = get_latest_feed()
+    return to_model_input(get_latest_feed())
+
+
+def to_model_input(
+    feed: Dict[int, Optional[float]], fields: Optional[Dict[str, int]] = None
+) -> Dict[str, Any]:
+    """
+    Field number -> value mapping to the model keys 'N','P','K','Moisture','pH',
+    using a device's field mapping if given, else THINGSPEAK_MODEL_FIELDS
+    """
+    if fields is not None:
+        return {name: feed.get(field_num) for name, field_num in fields.items()}
+
     mapping = {}
     # map MODEL_FIELDS in order to semantic names (5 fields only)
-    names = ["N", "P", "K", "Moisture", "pH"]
     for idx, field_num in enumerate(MODEL_FIELDS):
-        name = names[idx] if idx < len(names) else f"field{field_num}"
+        name = MODEL_KEYS[idx] if idx < len(MODEL_KEYS) else f"field{field_num}"
         mapping[name] = feed.get(field_num)
 
     return mapping
 
 
+def default_field_mapping() -> Dict[str, int]:
+    """Model key -> field number from THINGSPEAK_MODEL_FIELDS"""
+    return {name: field_num for name, field_num in zip(MODEL_KEYS, MODEL_FIELDS)}
+
+
+class Device:
+    """A sensor node: one ThingSpeak channel, its field mapping and where it is"""
+
+    def __init__(
+        self,
+        device_id: str,
+        channel_id: str,
+        read_key: str = "",
+        name: Optional[str] = None,
+        fields: Optional[Dict[str, int]] = None,
+        latitude: Optional[float] = None,
+        longitude: Optional[float] = None,
+        update_interval: float = 15.0,
+    ):
+        self.device_id = str(device_id)
+        self.channel_id = str(channel_id)
+        self.read_key = read_key or ""
+        self.name = name or f"Sensor node {self.device_id}"
+        # Keys the device does not map keep their THINGSPEAK_MODEL_FIELDS field
+        self.fields = {key: int(num) for key, num in {**default_field_mapping(), **(fields or {})}.items()}
+        self.latitude = latitude
+        self.longitude = longitude
+        # How often the node posts, in seconds (ThingSpeak allows at most one update per 15 s)
+        self.update_interval = max(15.0, float(update_interval))
+
+    @property
+    def location(self) -> Optional[Tuple[float, float]]:
+        if self.latitude is None or self.longitude is None:
+            return None
+        return self.latitude, self.longitude
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Public description (the read key is never exposed)"""
+        return {
+            "device_id": self.device_id,
+            "name": self.name,
+            "channel_id": self.channel_id,
+            "fields": dict(self.fields),
+            "latitude": self.latitude,
+            "longitude": self.longitude,
+            "update_interval": self.update_interval,
+        }
+
+
+class DeviceRegistry:
+    """
+    Known sensor nodes by device id. Loaded from THINGSPEAK_DEVICES (a JSON
+    list) or THINGSPEAK_DEVICES_FILE (a JSON file holding the list), e.g.
+
+        [{"id": "north-field", "channel_id": "123456", "read_key": "...",
+          "name": "North field", "fields": {"N": 1, "P": 2, "K": 3, "Moisture": 4, "pH": 5},
+          "latitude": 28.61, "longitude": 77.21, "update_interval": 60}]
+
+    The THINGSPEAK_CHANNEL_ID channel is always registered as well, with its
+    channel id as device id, and is the default device unless
+    THINGSPEAK_DEFAULT_DEVICE names another one.
+    """
+
+    def __init__(self, devices: Iterable[Device] = (), default_id: Optional[str] = None):
+        self._devices: Dict[str, Device] = {}
+        for device in devices:
+            self.register(device)
+        self.default_id = default_id
+
+    @classmethod
+    def from_env(cls) -> "DeviceRegistry":
+        entries: List[Dict[str, Any]] = []
+        try:
+            if THINGSPEAK_DEVICES_FILE:
+                with open(THINGSPEAK_DEVICES_FILE) as f:
+                    entries = json.load(f)
+            elif THINGSPEAK_DEVICES:
+                entries = json.loads(THINGSPEAK_DEVICES)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Could not load ThingSpeak devices: {e}")
+
+        devices = []
+        for entry in entries:
+            try:
+                devices.append(Device(
+                    device_id=entry.get("id") or entry["channel_id"],
+                    channel_id=entry["channel_id"],
+                    read_key=entry.get("read_key", ""),
+                    name=entry.get("name"),
+                    fields=entry.get("fields"),
+                    latitude=entry.get("latitude"),
+                    longitude=entry.get("longitude"),
+                    update_interval=entry.get("update_interval", 15.0),
+                ))
+            except (KeyError, TypeError, ValueError) as e:
+                print(f"⚠️ Skipping invalid ThingSpeak device {entry!r}: {e}")
+
+        default_id = os.getenv("THINGSPEAK_DEFAULT_DEVICE")
+        if THINGSPEAK_CHANNEL_ID and THINGSPEAK_CHANNEL_ID not in {d.device_id for d in devices}:
+            devices.insert(0, Device(
+                device_id=THINGSPEAK_CHANNEL_ID,
+                channel_id=THINGSPEAK_CHANNEL_ID,
+                read_key=THINGSPEAK_READ_API_KEY,
+                name="AgroTech Sensor Node #1",
+                update_interval=float(os.getenv("THINGSPEAK_POLL_INTERVAL", "15")),
+            ))
+        return cls(devices, default_id or (devices[0].device_id if devices else None))
+
+    def register(self, device: Device) -> None:
+        self._devices[device.device_id] = device
+
+    def get(self, device_id: str) -> Optional[Device]:
+        return self._devices.get(device_id)
+
+    def default(self) -> Optional[Device]:
+        return self._devices.get(self.default_id) if self.default_id else None
+
+    def all(self) -> List[Device]:
+        return list(self._devices.values())
+
+    def channels(self) -> List[Tuple[str, str, float]]:
+        """(channel_id, read_key, interval) per distinct channel, for the poller"""
+        channels: Dict[str, Tuple[str, str, float]] = {}
+        for device in self._devices.values():
+            current = channels.get(device.channel_id)
+            if current is None or device.update_interval < current[2]:
+                channels[device.channel_id] = (device.channel_id, device.read_key, device.update_interval)
+        return list(channels.values())
+
+
+_device_registry: Optional[DeviceRegistry] = None
+
+
+def get_device_registry() -> DeviceRegistry:
+    """Get or create the global device registry"""
+    global _device_registry
+    if _device_registry is None:
+        _device_registry = DeviceRegistry.from_env()
+    return _device_registry
+
+
+def _thingspeak_time(epoch: float) -> str:
+    """feeds.json start/end parameter format (UTC, ThingSpeak's default timezone)"""
+    return datetime.fromtimestamp(epoch, timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+async def _fetch_feeds_json(
+    results: int,
+    channel_id: Optional[str],
+    read_key: Optional[str],
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    GET feeds.json over the pooled client, optionally limited to entries
+    between start and end (epoch seconds); raises httpx.HTTPStatusError on
+    upstream errors
+    """
+    params: Dict[str, Any] = {"results": results}
+    if read_key:
+        params["api_key"] = read_key
+    if start is not None:
+        params["start"] = _thingspeak_time(start)
+    if end is not None:
+        params["end"] = _thingspeak_time(end)
+    client = await _get_client()
+    r = await client.get(f"/channels/{channel_id}/feeds.json", params=params)
+    r.raise_for_status()
+    return r.json()
+
+
+async def fetch_latest_feed(
+    channel_id: Optional[str] = None,
+    read_key: Optional[str] = None,
+    fields: Optional[List[int]] = None,
+) -> Dict[int, Optional[float]]:
+    """
+    Async variant of get_latest_feed for use from route handlers, on the
+    pooled client. Concurrent callers for the same channel share one request.
+    """
+    channel_id = channel_id or THINGSPEAK_CHANNEL_ID
+    read_key = read_key or THINGSPEAK_READ_API_KEY
+    fields = fields or MODEL_FIELDS
+    if not channel_id:
+        return {f: None for f in fields}
+
+    async def fetch():
+        try:
+            return _parse_latest(await _fetch_feeds_json(1, channel_id, read_key), fields)
+        except httpx.HTTPStatusError as he:
+            print(f"ThingSpeak HTTP error: {he}")
+        except Exception as e:
+            print(f"Error fetching ThingSpeak feed: {e}")
+        return {f: None for f in fields}
+
+    return await _flights.do(("latest", channel_id, tuple(fields)), fetch)
+
+
+async def fetch_model_input_dict() -> Dict[str, Any]:
+    """Async variant of get_model_input_dict"""
+    return to_model_input(await fetch_latest_feed())
+
+
+async def fetch_feeds(
+    results: int,
+    channel_id: Optional[str] = None,
+    read_key: Optional[str] = None,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    The raw feeds.json payload with the last `results` entries, on the
+    pooled client, optionally limited to [start, end] in epoch seconds;
+    concurrent identical reads share one request. Raises
+    httpx.HTTPStatusError on upstream errors.
+    """
+    channel_id = channel_id or THINGSPEAK_CHANNEL_ID
+    read_key = read_key or THINGSPEAK_READ_API_KEY
+    return await _flights.do(
+        ("feeds", channel_id, results, start, end),
+        lambda: _fetch_feeds_json(results, channel_id, read_key, start, end),
+    )
+
+
+async def fetch_last_entry(
+    channel_id: Optional[str] = None,
+    read_key: Optional[str] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    A channel's newest entry from feeds/last.json (one small entry, no
+    channel metadata), or None if the channel has no entries. Concurrent
+    callers for the same channel share one request. Raises
+    httpx.HTTPStatusError on upstream errors.
+    """
+    channel_id = channel_id or THINGSPEAK_CHANNEL_ID
+    read_key = read_key or THINGSPEAK_READ_API_KEY
+
+    async def fetch() -> Optional[Dict[str, Any]]:
+        params = {"api_key": read_key} if read_key else None
+        client = await _get_client()
+        r = await client.get(f"/channels/{channel_id}/feeds/last.json", params=params)
+        r.raise_for_status()
+        entry = r.json()
+        # An empty channel answers -1
+        return entry if isinstance(entry, dict) and entry.get("created_at") else None
+
+    return await _flights.do(("last", channel_id), fetch)
+
+
+async def sync_channel(
+    store,
+    channel_id: Optional[str] = None,
+    read_key: Optional[str] = None,
+    min_interval: float = 0.0,
+) -> int:
+    """
+    Bring a channel's entries in the local SensorStore up to date.
+
+    The store's highest entry_id is the cursor: a one-entry probe reads the
+    channel's last_entry_id, and only the entries after the cursor are then
+    requested (up to THINGSPEAK_MAX_RESULTS; older gaps are skipped). The
+    first sync backfills THINGSPEAK_STORE_BACKFILL entries. Skipped if the
+    channel was synced less than min_interval seconds ago. Returns the
+    number of new entries; raises httpx.HTTPStatusError on upstream errors.
+    """
+    channel_id = channel_id or THINGSPEAK_CHANNEL_ID
+    read_key = read_key or THINGSPEAK_READ_API_KEY
+    if not channel_id:
+        return 0
+
+    async def run() -> int:
+        if min_interval > 0:
+            synced_at = await asyncio.to_thread(store.last_synced, channel_id)
+            if synced_at is not None and time.time() - synced_at < min_interval:
+                return 0
+        cursor = await asyncio.to_thread(store.cursor, channel_id)
+        if cursor is None:
+            payload = await _fetch_feeds_json(THINGSPEAK_STORE_BACKFILL, channel_id, read_key)
+        else:
+            payload = await _fetch_feeds_json(1, channel_id, read_key)
+            missing = ((payload.get("channel") or {}).get("last_entry_id") or 0) - cursor
+            if missing > 1:
+                payload = await _fetch_feeds_json(
+                    min(missing, THINGSPEAK_MAX_RESULTS), channel_id, read_key
+                )
+        last_entry_id = (payload.get("channel") or {}).get("last_entry_id")
+        return await asyncio.to_thread(
+            store.ingest, channel_id, payload.get("feeds") or [], last_entry_id
+        )
+
+    return await _flights.do(("sync", channel_id), run)
+
+
+def flight_stats() -> Dict[str, Any]:
+    """Request coalescing counters for monitoring"""
+    return _flights.stats()
+
+
 def get_recommendations(write_back: bool = False) -> Dict[str, Any]:
     """
     Compute fertilizer and crop recommendations from latest ThingSpeak feed.